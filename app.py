@@ -15,11 +15,22 @@ from plotly.subplots import make_subplots
 # Configurar path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.airbnb_scraper import AirbnbScraper
-from src.booking_scraper import BookingScraper
 from src.data_manager import DataManager
+from src.metrics import get_metrics
+from src.parallel_streams import iter_parallel
+from src.platforms import SCRAPERS
+from src.progress import ProgressTracker, format_eta
+from src.result_cache import get_result_cache
+from src.run_budget import RunBudget
+from src.scrape_cells import as_list, build_cells, prioritize_cells
+from src.structured_log import get_logger, set_run_id, setup_logging
+from src.timing import phase_rows, profile_rerun, timed
 from src.visualizer import PriceVisualizer
 
+# Logs estructurados en data/logs/ (idempotente: Streamlit re-ejecuta el script)
+setup_logging()
+profile_log = get_logger('ui.profiler')
+
 # Configuración de la página
 st.set_page_config(
     page_title="Price Monitor",
@@ -233,6 +244,7 @@ def get_platform_icon(platform):
 
 # ==================== COMPONENTES DE UI ====================
 
+@timed('UI:render_sidebar', profile_only=True)
 def render_sidebar():
     """Renderiza la barra lateral con navegación y configuración"""
     with st.sidebar:
@@ -269,9 +281,15 @@ def render_sidebar():
         st.markdown("[📝 Ejemplos](EXAMPLES.md)")
         
         st.markdown("---")
+        st.checkbox(
+            "🐢 Perfilar reruns",
+            key='profile_reruns',
+            help="Mide cada sección, llamada al DataManager y gráfico en cada rerun (también con PRICE_MONITOR_PROFILE=1)"
+        )
         st.caption("v2.0 - Sistema de Monitoreo de Precios")
 
 
+@timed('UI:render_dashboard', profile_only=True)
 def render_dashboard():
     """Renderiza el dashboard principal con métricas y resumen"""
     st.markdown("## 📊 Dashboard General")
@@ -340,70 +358,72 @@ def render_dashboard():
     with col1:
         st.markdown("### 📈 Evolución de Precios")
         
-        # Gráfico de líneas por propiedad
-        fig = go.Figure()
+        with timed('Plotly:dashboard_evolucion', profile_only=True):
+            # Gráfico de líneas por propiedad
+            fig = go.Figure()
         
-        for prop in df['property_name'].unique():
-            prop_df = df[df['property_name'] == prop]
-            prop_df = prop_df[prop_df['price_usd'].notna()].sort_values('checkin')
+            for prop in df['property_name'].unique():
+                prop_df = df[df['property_name'] == prop]
+                prop_df = prop_df[prop_df['price_usd'].notna()].sort_values('checkin')
             
-            if not prop_df.empty:
-                fig.add_trace(go.Scatter(
-                    x=prop_df['checkin'],
-                    y=prop_df['price_usd'],
-                    mode='lines+markers',
-                    name=prop,
-                    hovertemplate='<b>%{fullData.name}</b><br>' +
-                                 'Fecha: %{x|%d/%m/%Y}<br>' +
-                                 'Precio: $%{y:,.2f}<br>' +
-                                 '<extra></extra>'
-                ))
-        
-        fig.update_layout(
-            height=350,
-            margin=dict(l=0, r=0, t=20, b=0),
-            hovermode='x unified',
-            template='plotly_white',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.25,
-                xanchor="center",
-                x=0.5
+                if not prop_df.empty:
+                    fig.add_trace(go.Scatter(
+                        x=prop_df['checkin'],
+                        y=prop_df['price_usd'],
+                        mode='lines+markers',
+                        name=prop,
+                        hovertemplate='<b>%{fullData.name}</b><br>' +
+                                     'Fecha: %{x|%d/%m/%Y}<br>' +
+                                     'Precio: $%{y:,.2f}<br>' +
+                                     '<extra></extra>'
+                    ))
+        
+            fig.update_layout(
+                height=350,
+                margin=dict(l=0, r=0, t=20, b=0),
+                hovermode='x unified',
+                template='plotly_white',
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=-0.25,
+                    xanchor="center",
+                    x=0.5
+                )
             )
-        )
         
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         st.markdown("### 🏆 Comparación por Plataforma")
         
-        # Datos válidos por plataforma
-        platform_data = df[df['price_usd'].notna()].groupby('platform').agg({
-            'price_usd': ['mean', 'min', 'max', 'count']
-        }).round(2)
-        
-        fig = go.Figure()
-        
-        platforms = platform_data.index.tolist()
-        
-        fig.add_trace(go.Bar(
-            x=platforms,
-            y=platform_data['price_usd']['mean'],
-            name='Precio Promedio',
-            marker_color='#1f77b4',
-            text=platform_data['price_usd']['mean'].apply(lambda x: f'${x:,.2f}'),
-            textposition='outside',
-            hovertemplate='<b>%{x}</b><br>Promedio: $%{y:,.2f}<extra></extra>'
-        ))
-        
-        fig.update_layout(
-            height=350,
-            margin=dict(l=0, r=0, t=20, b=0),
-            template='plotly_white',
-            showlegend=False,
-            yaxis_title="Precio (USD)"
-        )
+        with timed('Plotly:dashboard_plataformas', profile_only=True):
+            # Datos válidos por plataforma
+            platform_data = df[df['price_usd'].notna()].groupby('platform').agg({
+                'price_usd': ['mean', 'min', 'max', 'count']
+            }).round(2)
+        
+            fig = go.Figure()
+        
+            platforms = platform_data.index.tolist()
+        
+            fig.add_trace(go.Bar(
+                x=platforms,
+                y=platform_data['price_usd']['mean'],
+                name='Precio Promedio',
+                marker_color='#1f77b4',
+                text=platform_data['price_usd']['mean'].apply(lambda x: f'${x:,.2f}'),
+                textposition='outside',
+                hovertemplate='<b>%{x}</b><br>Promedio: $%{y:,.2f}<extra></extra>'
+            ))
+        
+            fig.update_layout(
+                height=350,
+                margin=dict(l=0, r=0, t=20, b=0),
+                template='plotly_white',
+                showlegend=False,
+                yaxis_title="Precio (USD)"
+            )
         
         st.plotly_chart(fig, use_container_width=True)
     
@@ -424,6 +444,7 @@ def render_dashboard():
     st.dataframe(summary, use_container_width=True)
 
 
+@timed('UI:render_scraping_interface', profile_only=True)
 def render_scraping_interface():
     """Interfaz para realizar nuevo scraping"""
     st.markdown("## � Nuevo Scraping")
@@ -484,23 +505,50 @@ def render_scraping_interface():
     with col2:
         st.markdown("**👥 Configuración de Reserva**")
         
-        guests = st.number_input(
-            "Número de huéspedes:",
-            min_value=1,
-            max_value=16,
-            value=2,
-            help="Cantidad de personas que se alojarán"
-        )
-        
-        nights = st.number_input(
-            "Número de noches:",
-            min_value=1,
-            max_value=30,
-            value=1,
-            help="Duración de la estadía en noches"
+        matrix_mode = st.checkbox(
+            "🧮 Modo matriz (noches × huéspedes)",
+            value=False,
+            help="Scrapea todas las combinaciones de noches y huéspedes en una sola ejecución"
         )
         
-        st.caption(f"🛏️ {guests} huésped(es) × {nights} noche(s)")
+        if matrix_mode:
+            guests = st.multiselect(
+                "Huéspedes:",
+                options=list(range(1, 17)),
+                default=[2, 4],
+                help="Cantidades de personas a consultar"
+            )
+            
+            nights = st.multiselect(
+                "Noches:",
+                options=list(range(1, 31)),
+                default=[1, 2, 3, 7],
+                help="Duraciones de estadía a consultar"
+            )
+            
+            if not guests or not nights:
+                st.warning("⚠️ Selecciona al menos un valor de huéspedes y de noches")
+                return
+            
+            st.caption(f"🛏️ {len(guests)} × {len(nights)} = {len(guests) * len(nights)} combinaciones por fecha")
+        else:
+            guests = st.number_input(
+                "Número de huéspedes:",
+                min_value=1,
+                max_value=16,
+                value=2,
+                help="Cantidad de personas que se alojarán"
+            )
+            
+            nights = st.number_input(
+                "Número de noches:",
+                min_value=1,
+                max_value=30,
+                value=1,
+                help="Duración de la estadía en noches"
+            )
+            
+            st.caption(f"🛏️ {guests} huésped(es) × {nights} noche(s)")
     
     # Selector de plataformas
     st.markdown("**🔧 Plataformas**")
@@ -532,13 +580,24 @@ def render_scraping_interface():
         return
     
     # Checkbox para forzar ejecución (ignora anti-duplicado)
-    col_force, col_btn = st.columns([2, 1])
+    col_force, col_budget, col_btn = st.columns([2, 1, 1])
     
     with col_force:
         force_run = st.checkbox(
             "🔄 Forzar ejecución",
             value=False,
-            help="Permite ejecutar el scraping incluso si existe una ejecución idéntica en las últimas 48 horas"
+            help="Permite ejecutar el scraping incluso si existe una ejecución idéntica en las últimas 48 horas "
+                 "y vuelve a cargar las páginas aunque haya resultados recientes en caché "
+                 "o fechas marcadas como no disponibles"
+        )
+    
+    with col_budget:
+        time_budget_minutes = st.number_input(
+            "⏱️ Límite (min):",
+            min_value=0,
+            max_value=600,
+            value=0,
+            help="Tiempo máximo de la ejecución (0 = sin límite). Se scrapean primero las fechas más cercanas"
         )
     
     # Botón de scraping
@@ -553,15 +612,26 @@ def render_scraping_interface():
             end_date,
             guests,
             nights,
-            force_run
+            force_run,
+            time_budget_minutes
         )
 
 
-def run_scraping(property_config, selected_platforms, start_date, end_date, guests, nights, force_run=False):
-    """Ejecuta el proceso de scraping"""
+def run_scraping(property_config, selected_platforms, start_date, end_date, guests, nights, force_run=False, time_budget_minutes=None):
+    """
+    Ejecuta el proceso de scraping
+    
+    guests y nights aceptan un entero o una lista de valores (modo matriz);
+    todas las combinaciones se scrapean en una sola sesión de navegador por
+    plataforma, las plataformas corren en paralelo y todo se guarda junto.
+    Con time_budget_minutes la ejecución se detiene al agotar el tiempo y las
+    celdas salteadas se priorizan después.
+    """
     
     property_name = property_config['name']
     platforms = property_config.get('platforms', {})
+    guests_list = as_list(guests)
+    nights_list = as_list(nights)
     
     # Contenedor para progreso
     progress_container = st.container()
@@ -575,15 +645,19 @@ def run_scraping(property_config, selected_platforms, start_date, end_date, gues
         # Calcular plataformas seleccionadas
         active_platforms = [k for k, v in selected_platforms.items() if v]
         
-        # Chequeo anti-duplicado (48 horas)
-        is_recent = data_manager.is_recent_same_run(
-            property_name=property_name,
-            start_date=start_date,
-            end_date=end_date,
-            nights=nights,
-            guests=guests,
-            platforms=active_platforms,
-            window_hours=48
+        # Chequeo anti-duplicado (48 horas): bloquear solo si todas las combinaciones son recientes
+        is_recent = all(
+            data_manager.is_recent_same_run(
+                property_name=property_name,
+                start_date=start_date,
+                end_date=end_date,
+                nights=n,
+                guests=g,
+                platforms=active_platforms,
+                window_hours=48
+            )
+            for n in nights_list
+            for g in guests_list
         )
         
         if is_recent and not force_run:
@@ -594,91 +668,156 @@ def run_scraping(property_config, selected_platforms, start_date, end_date, gues
                 
                 - Propiedad: {property_name}
                 - Fechas: {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}
-                - Noches: {nights}
-                - Huéspedes: {guests}
+                - Noches: {', '.join(str(n) for n in nights_list)}
+                - Huéspedes: {', '.join(str(g) for g in guests_list)}
                 - Plataformas: {', '.join(active_platforms)}
                 
                 Para ejecutarlo de todas formas, marca la opción **"Forzar ejecución"** y vuelve a intentar.
             """)
             return
         
+        # Checkpoint: cada celda se persiste al terminar y una ejecución interrumpida se reanuda
+        checkpoint = data_manager.open_checkpoint(
+            property_name, start_date, end_date, nights_list, guests_list, active_platforms
+        )
+        # Los logs de la ejecución llevan el id del checkpoint (el mismo al reanudar)
+        set_run_id(checkpoint.run_id)
+        if checkpoint.resumed:
+            st.info(f"♻️ Reanudando ejecución interrumpida: {checkpoint.manifest['completed_cells']} celda(s) ya completadas")
+        
         progress_bar = st.progress(0)
         status_text = st.empty()
+        live_table = st.empty()
         
-        results = []
-        total_steps = sum(selected_platforms.values()) * 2  # *2 porque cada plataforma tiene inicio y fin
-        current_step = 0
+        # Presupuesto de tiempo de la ejecución (None = sin límite)
+        budget = RunBudget(time_budget_minutes * 60 if time_budget_minutes else None)
         
-        # Scrapear Airbnb
-        if selected_platforms.get('airbnb', False):
-            status_text.markdown("🏠 **Scrapeando Airbnb...**")
-            current_step += 1
-            progress_bar.progress(current_step / total_steps)
-            
-            try:
-                airbnb = AirbnbScraper()
-                airbnb_results = airbnb.scrape_date_range(
-                    platforms['airbnb'],
-                    start_date,
-                    end_date,
-                    nights=nights,
-                    guests=guests,
-                    debug_first=False,  # Desactivado para evitar archivos debug
-                    property_name=property_name  # Nombre para archivos debug únicos
-                )
-                results.extend(airbnb_results)
-                
-                current_step += 1
-                progress_bar.progress(current_step / total_steps)
-                st.success(f"✅ Airbnb: {len(airbnb_results)} registros obtenidos")
-            except Exception as e:
-                st.error(f"❌ Error en Airbnb: {str(e)}")
+        # Celdas por plataforma: pendientes del checkpoint, primero las salteadas
+        # por el deadline anterior y luego las fechas más cercanas
+        carried_over = data_manager.load_skipped_cells().keys()
+        plans = {}
+        for platform in active_platforms:
+            cells = build_cells(start_date, end_date, nights_list, guests_list)
+            for cell in cells:
+                cell.update(platform=platform, property_name=property_name)
+            plans[platform] = prioritize_cells(checkpoint.pending(platform.capitalize(), cells), carried_over)
         
-        # Scrapear Booking
-        if selected_platforms.get('booking', False):
-            status_text.markdown("🏨 **Scrapeando Booking...**")
-            current_step += 1
-            progress_bar.progress(current_step / total_steps)
-            
+        # Progreso por celda: las ya completadas en un intento previo no cuentan
+        total_cells = sum(len(cells) for cells in plans.values())
+        live_rows = []
+        
+        def on_progress(state):
+            """Actualiza barra, estado y tabla en vivo después de cada celda"""
+            progress_bar.progress(state['fraction'])
+            status_text.markdown(
+                f"{state['label']} · {state['done']}/{state['total']} celdas · ⏱️ ETA {format_eta(state['eta_seconds'])}"
+            )
+            live_rows.append({k: v for k, v in state['result'].items() if k not in ('timings', 'nightly')})
+            live_table.dataframe(pd.DataFrame(live_rows), use_container_width=True)
+        
+        tracker = ProgressTracker(total_cells, on_progress)
+        result_cache = get_result_cache()
+        cache_before = result_cache.stats() if result_cache is not None else None
+        completed_cells = []
+        skipped_cells = []
+        
+        # Plataformas en paralelo: cada una con su navegador, su pausa entre
+        # celdas y su propio flujo de resultados; la UI se actualiza desde acá
+        labels = {platform: platform.capitalize() for platform in plans}
+        status_text.markdown(
+            "**Scrapeando " + " + ".join(f"{get_platform_icon(label)} {label}" for label in labels.values()) + "...**"
+        )
+        streams = {}
+        for platform, cells in plans.items():
             try:
-                booking = BookingScraper()
-                booking_results = booking.scrape_date_range(
-                    platforms['booking'],
-                    start_date,
-                    end_date,
-                    nights=nights,
-                    adults=guests,
+                scraper = SCRAPERS[platform]()
+                scraper.bypass_cache = force_run
+                streams[platform] = scraper.iter_cells(
+                    platforms[platform],
+                    cells,
                     debug_first=False,  # Desactivado para evitar archivos debug
-                    property_name=property_name  # Nombre para archivos debug únicos
+                    property_name=property_name,  # Nombre para archivos debug únicos
+                    checkpoint=checkpoint,
+                    budget=budget
                 )
-                results.extend(booking_results)
-                
-                current_step += 1
-                progress_bar.progress(current_step / total_steps)
-                st.success(f"✅ Booking: {len(booking_results)} registros obtenidos")
             except Exception as e:
-                st.error(f"❌ Error en Booking: {str(e)}")
+                st.error(f"❌ Error en {labels[platform]}: {str(e)}")
+        
+        platform_results = {platform: [] for platform in streams}
+        failed_platforms = set()
+        for platform, result, error in iter_parallel(streams):
+            label = labels[platform]
+            if error is not None:
+                failed_platforms.add(platform)
+                st.error(f"❌ Error en {label}: {str(error)}")
+                continue
+            platform_results[platform].append(result)
+            tracker.advance(result, label=f"{get_platform_icon(label)} **{label}**")
+        
+        for platform, results_so_far in platform_results.items():
+            if platform in failed_platforms:
+                continue
+            cells = plans[platform]
+            completed_cells.extend(cells[:len(results_so_far)])
+            if budget.exhausted():
+                skipped_cells.extend(cells[len(results_so_far):])
+            st.success(f"✅ {labels[platform]}: {len(results_so_far)} registros obtenidos")
+        
+        # Aciertos/fallos de la caché en esta ejecución (los contadores son del proceso)
+        if result_cache is not None:
+            cache_stats = result_cache.stats()
+            cache_hits = cache_stats['hits'] - cache_before['hits']
+            cache_misses = cache_stats['misses'] - cache_before['misses']
+            if cache_hits:
+                st.caption(f"♻️ Caché de resultados: {cache_hits} aciertos / {cache_misses} fallos")
+        
+        # Percentiles por fase (navegador, navegación, extracción, E/S) acumulados en el proceso
+        timing_rows = phase_rows()
+        if timing_rows:
+            with st.expander("⏱️ Tiempos por fase (segundos)"):
+                st.dataframe(pd.DataFrame(timing_rows), use_container_width=True)
+        
+        # Snapshot de métricas (celdas, selectores, latencias, cachés) para monitoreo externo
+        get_metrics().write_snapshot()
+        
+        # Registrar lo que quedó afuera por el deadline para priorizarlo en el próximo ciclo
+        data_manager.update_skipped_cells(skipped_cells, completed_cells)
+        if skipped_cells:
+            st.warning(
+                f"⏱️ Límite de tiempo alcanzado: {len(skipped_cells)} celda(s) quedaron sin scrapear "
+                "y se priorizarán en la próxima ejecución"
+            )
+        
+        # Resultados de esta ejecución y de intentos previos interrumpidos
+        results = checkpoint.results()
         
         # Guardar resultados
         if results:
             status_text.markdown("💾 **Guardando resultados...**")
             data_manager.save_results(results, property_name)
+            checkpoint.finish()
             
-            # Registrar ejecución exitosa (log anti-duplicado)
-            try:
-                data_manager.log_scrape_run(
-                    property_name=property_name,
-                    start_date=start_date,
-                    end_date=end_date,
-                    nights=nights,
-                    guests=guests,
-                    platforms=active_platforms
-                )
-            except Exception as e:
-                # No detener el flujo si falla el logging
-                st.info(f"ℹ️ No se pudo registrar el log de ejecución: {e}")
+            # Registrar ejecución exitosa (log anti-duplicado), una entrada por combinación;
+            # una ejecución cortada por el deadline no cuenta como duplicada
+            if not skipped_cells:
+                try:
+                    for n in nights_list:
+                        for g in guests_list:
+                            data_manager.log_scrape_run(
+                                property_name=property_name,
+                                start_date=start_date,
+                                end_date=end_date,
+                                nights=n,
+                                guests=g,
+                                platforms=active_platforms
+                            )
+                except Exception as e:
+                    # No detener el flujo si falla el logging
+                    st.info(f"ℹ️ No se pudo registrar el log de ejecución: {e}")
             
             progress_bar.progress(1.0)
+            # La tabla en vivo se reemplaza por el resumen final
+            live_table.empty()
             
             st.markdown("""
                 <div class="success-box">
@@ -689,12 +828,13 @@ def run_scraping(property_config, selected_platforms, start_date, end_date, gues
             
             # Mostrar preview de resultados
             with st.expander("👀 Ver Resultados Obtenidos", expanded=True):
-                df_results = pd.DataFrame(results)
+                df_results = pd.DataFrame(results).drop(columns=['timings', 'nightly'], errors='ignore')
                 st.dataframe(df_results, use_container_width=True)
         else:
             st.warning("⚠️ No se obtuvieron resultados del scraping")
 
 
+@timed('UI:render_historical_data', profile_only=True)
 def render_historical_data():
     """Visualiza datos históricos con gráficos y análisis"""
     st.markdown("## 📈 Datos Históricos")
@@ -823,6 +963,7 @@ def render_historical_data():
         )
 
 
+@timed('UI:render_competitor_management', profile_only=True)
 def render_competitor_management():
     """Interfaz para gestionar competidores"""
     st.markdown("## 🏢 Gestión de Competidores")
@@ -946,35 +1087,50 @@ def render_competitor_management():
 
 # ==================== APLICACIÓN PRINCIPAL ====================
 
+def render_rerun_profile(profile):
+    """Panel de debug con el desglose del rerun; también se agrega al log (phase='rerun')"""
+    rows = profile.rows()
+    total_ms = round(profile.total * 1000, 1)
+    with st.sidebar.expander(f"🐢 Último rerun: {total_ms:,.0f} ms", expanded=True):
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    profile_log.info(f"Rerun en {total_ms:,.0f} ms", phase='rerun', total_ms=total_ms, breakdown=rows)
+
+
 def main():
     """Función principal de la aplicación"""
     
-    # Renderizar sidebar
-    render_sidebar()
-    
-    # Header principal
-    st.markdown("# 💰 Price Monitor")
-    st.caption("Sistema Inteligente de Monitoreo de Precios de Alojamientos")
-    
-    # Tabs principales
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "📊 Dashboard",
-        "🔍 Nuevo Scraping",
-        "📈 Datos Históricos",
-        "🏢 Gestión de Competidores"
-    ])
-    
-    with tab1:
-        render_dashboard()
-    
-    with tab2:
-        render_scraping_interface()
-    
-    with tab3:
-        render_historical_data()
+    # Perfil opcional del rerun: cada render, llamada al DataManager y gráfico
+    profiling = st.session_state.get('profile_reruns', False) or os.environ.get('PRICE_MONITOR_PROFILE') == '1'
+    with profile_rerun(profiling) as profile:
+        # Renderizar sidebar
+        render_sidebar()
+        
+        # Header principal
+        st.markdown("# 💰 Price Monitor")
+        st.caption("Sistema Inteligente de Monitoreo de Precios de Alojamientos")
+        
+        # Tabs principales
+        tab1, tab2, tab3, tab4 = st.tabs([
+            "📊 Dashboard",
+            "🔍 Nuevo Scraping",
+            "📈 Datos Históricos",
+            "🏢 Gestión de Competidores"
+        ])
+        
+        with tab1:
+            render_dashboard()
+        
+        with tab2:
+            render_scraping_interface()
+        
+        with tab3:
+            render_historical_data()
+        
+        with tab4:
+            render_competitor_management()
     
-    with tab4:
-        render_competitor_management()
+    if profile is not None:
+        render_rerun_profile(profile)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,3 @@
+"""
+Benchmarks del scraper contra un sitio local (ver benchmarks/run.py)
+"""
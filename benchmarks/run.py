@@ -0,0 +1,266 @@
+"""
+Benchmark del scraper contra el sitio local (sin tocar Airbnb ni Booking)
+
+Uso:
+    python -m benchmarks.run --cells 10 --latency-ms 300 --jitter-ms 200
+    python -m benchmarks.run --modes pooled parallel --output bench.json
+    python -m benchmarks.run --baseline bench.json --tolerance 0.2
+
+    # Grabar una vez y reproducir offline desde HAR (mismo puerto y fechas)
+    python -m benchmarks.run --port 8765 --start 2026-01-10 --har-record /tmp/har
+    python -m benchmarks.run --port 8765 --start 2026-01-10 --har-replay /tmp/har
+
+Modos:
+    sequential  un navegador por celda (scrape_price)
+    pooled      un navegador y un pool de contextos por plataforma (iter_cells)
+    parallel    pooled con las plataformas en hilos simultáneos (como la app)
+
+Reporta celdas con precio por segundo, latencia p50/p95 por celda, CPU y
+RSS máximo (el RSS es el pico del proceso hasta ese modo: para comparar
+modos entre sí, correr uno por invocación). Con --baseline sale con código 1
+si algún modo perdió más de --tolerance de throughput respecto de la corrida
+guardada. Las celdas sin precio sin haber pedido --failure-rate o
+--unavailable-rate (p.ej. sin navegador instalado) invalidan la corrida:
+también sale con código 1.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.standin_site import FAILURE_MODES, StandInSite, load_recorded_pages
+from src.debug_artifacts import DebugArtifactWriter
+from src.har_replay import HarArchive, configure_scraper
+from src.latency import LatencyTracker, percentile
+from src.parallel_streams import iter_parallel
+from src.platforms import SCRAPERS
+from src.scrape_cells import build_cells
+from src.snapshots import SnapshotStore
+from src.structured_log import setup_logging
+
+
+MODES = ('sequential', 'pooled', 'parallel')
+
+# Alojamientos ficticios del sitio local
+LISTINGS = {
+    'airbnb': '/rooms/1000001',
+    'booking': '/hotel/ar/hosteria-de-prueba.es.html',
+}
+
+
+def make_scraper(platform, base_url, workdir, settle_seconds=0, har=None):
+    """
+    Scraper apuntando al sitio local, sin cachés ni estado compartido
+
+    Las cachés y el estado persistido se desactivan para que cada modo
+    cargue todas las páginas; snapshots y debug van a un directorio temporal.
+    Con har (HarArchive) las sesiones se graban o se reproducen desde HAR.
+    """
+    scraper = SCRAPERS[platform](base_url=base_url)
+    if har is not None:
+        configure_scraper(scraper, har)
+    scraper.settle_seconds = settle_seconds
+    scraper.cell_delay = 0
+    scraper.result_cache = None
+    scraper.unavailable_cache = None
+    scraper.storage_state = None
+    scraper.latency = LatencyTracker()
+    scraper.snapshot_store = SnapshotStore(os.path.join(workdir, 'snapshots'))
+    scraper.debug_writer = DebugArtifactWriter(os.path.join(workdir, 'debug'))
+    return scraper
+
+
+def _usage():
+    """CPU (s) del proceso y de sus hijos (driver y Chromium) y RSS máximo (MB)"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        'cpu': own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+        # ru_maxrss está en KB en Linux
+        'rss_mb': own.ru_maxrss / 1024,
+        'children_rss_mb': children.ru_maxrss / 1024
+    }
+
+
+def cell_latency(result):
+    """Segundos de una celda según sus timings (total si existe)"""
+    timings = result.get('timings') or {}
+    return timings.get('total', sum(timings.values()))
+
+
+def run_mode(mode, platforms, cells, base_url, workdir, settle_seconds=0, har=None):
+    """
+    Ejecuta un modo y devuelve sus resultados
+
+    Returns:
+        list de resultados de todas las plataformas
+    """
+    scrapers = {platform: make_scraper(platform, base_url, workdir, settle_seconds, har) for platform in platforms}
+    urls = {platform: base_url + LISTINGS[platform] for platform in platforms}
+
+    if mode == 'sequential':
+        return [
+            scraper.scrape_price(urls[platform], cell['checkin'], cell['checkout'], cell['guests'], property_name='benchmark')
+            for platform, scraper in scrapers.items()
+            for cell in cells
+        ]
+    if mode == 'pooled':
+        return [
+            result
+            for platform, scraper in scrapers.items()
+            for result in scraper.iter_cells(urls[platform], cells, property_name='benchmark')
+        ]
+    if mode == 'parallel':
+        streams = {
+            platform: scraper.iter_cells(urls[platform], cells, property_name='benchmark')
+            for platform, scraper in scrapers.items()
+        }
+        results = []
+        for platform, result, error in iter_parallel(streams):
+            if error is not None:
+                raise error
+            results.append(result)
+        return results
+    raise ValueError(f"Modo desconocido: {mode}")
+
+
+def summarize(mode, results, wall_seconds, usage_before, usage_after):
+    """Métricas de un modo a partir de sus resultados y del uso de recursos"""
+    latencies = [cell_latency(result) for result in results]
+    priced = sum(1 for result in results if result.get('price_usd') is not None)
+    return {
+        'mode': mode,
+        'cells': len(results),
+        'priced': priced,
+        'errors': len(results) - priced,
+        'wall_s': round(wall_seconds, 3),
+        # Solo cuentan las celdas con precio: fallar rápido no es throughput
+        'cells_per_s': round(priced / wall_seconds, 3) if wall_seconds else None,
+        'p50_s': round(percentile(latencies, 0.5), 3) if latencies else None,
+        'p95_s': round(percentile(latencies, 0.95), 3) if latencies else None,
+        'cpu_s': round(usage_after['cpu'] - usage_before['cpu'], 3),
+        'peak_rss_mb': round(usage_after['rss_mb'], 1),
+        'children_peak_rss_mb': round(usage_after['children_rss_mb'], 1)
+    }
+
+
+def compare_with_baseline(report, baseline, tolerance):
+    """
+    Modos cuyo throughput cayó más de tolerance respecto de la línea base
+
+    Returns:
+        list de (modo, celdas/s base, celdas/s actual)
+    """
+    previous = {row['mode']: row for row in baseline.get('modes', [])}
+    regressions = []
+    for row in report['modes']:
+        base = previous.get(row['mode'])
+        if base and base.get('cells_per_s') and row['cells_per_s'] is not None:
+            if row['cells_per_s'] < base['cells_per_s'] * (1 - tolerance):
+                regressions.append((row['mode'], base['cells_per_s'], row['cells_per_s']))
+    return regressions
+
+
+def unexpected_errors(report):
+    """
+    Modos con celdas sin precio cuando no se inyectaron fallas ni no disponibles
+
+    Returns:
+        list de (modo, celdas sin precio)
+    """
+    config = report.get('config', {})
+    if config.get('failure_rate') or config.get('unavailable_rate'):
+        return []
+    return [(row['mode'], row['errors']) for row in report['modes'] if row['errors']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del scraper contra un sitio local")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--platforms', nargs='+', choices=sorted(LISTINGS), default=sorted(LISTINGS))
+    parser.add_argument('--cells', type=int, default=6, help="Fechas de check-in por plataforma")
+    parser.add_argument('--nights', type=int, default=2)
+    parser.add_argument('--guests', type=int, default=2)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--failure-mode', choices=FAILURE_MODES, default='error')
+    parser.add_argument('--unavailable-rate', type=float, default=0.0)
+    parser.add_argument('--settle-seconds', type=float, default=0, help="Espera tras la navegación (en vivo: 5-8 s)")
+    parser.add_argument('--recorded', metavar='SNAPSHOTS_DIR',
+                        help="Servir el último snapshot real de cada plataforma en lugar de las fixtures")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=0, help="Puerto del sitio local (fijo para grabar/reproducir HAR)")
+    parser.add_argument('--start', help="Primera fecha de check-in (YYYY-MM-DD, por defecto en 30 días)")
+    har_group = parser.add_mutually_exclusive_group()
+    har_group.add_argument('--har-record', metavar='HAR_DIR', help="Grabar las sesiones en HAR")
+    har_group.add_argument('--har-replay', metavar='HAR_DIR', help="Reproducir desde HAR (sin red)")
+    parser.add_argument('--output', help="Guardar el reporte en JSON")
+    parser.add_argument('--baseline', help="Reporte JSON previo contra el cual comparar")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Caída de throughput tolerada (0-1)")
+    args = parser.parse_args(argv)
+    # Solo advertencias y errores: los logs por celda no deben pesar en la medición
+    setup_logging(level='WARNING', json_path=None)
+
+    if args.start:
+        start = datetime.strptime(args.start, '%Y-%m-%d')
+    else:
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=30)
+    cells = build_cells(start, start + timedelta(days=args.cells - 1), [args.nights], [args.guests])
+    pages = load_recorded_pages(args.recorded) if args.recorded else None
+    har = None
+    if args.har_record or args.har_replay:
+        har = HarArchive(args.har_record or args.har_replay, 'record' if args.har_record else 'replay')
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'modes': []
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in args.modes:
+            # Sitio nuevo por modo: misma semilla => mismas fallas y demoras
+            with StandInSite(pages, args.latency_ms, args.jitter_ms, args.failure_rate, args.failure_mode,
+                             args.unavailable_rate, seed=args.seed, port=args.port) as site:
+                print(f"▶ {mode}: {len(cells) * len(args.platforms)} celdas contra {site.base_url}")
+                usage_before = _usage()
+                started = time.monotonic()
+                results = run_mode(mode, args.platforms, cells, site.base_url, workdir, args.settle_seconds, har)
+                row = summarize(mode, results, time.monotonic() - started, usage_before, _usage())
+                # En modo --har-replay queda en 0: ningún pedido salió a la red
+                row['requests'] = site.requests
+            report['modes'].append(row)
+
+    print(f"\n{'modo':<11} {'celdas':>6} {'precio':>6} {'errores':>7} {'c/s':>7} {'p50 s':>7} {'p95 s':>7} "
+          f"{'CPU s':>7} {'RSS MB':>7} {'hijos MB':>9}")
+    for row in report['modes']:
+        print(f"{row['mode']:<11} {row['cells']:>6} {row['priced']:>6} {row['errors']:>7} {row['cells_per_s']:>7} "
+              f"{row['p50_s']:>7} {row['p95_s']:>7} {row['cpu_s']:>7} {row['peak_rss_mb']:>7} {row['children_peak_rss_mb']:>9}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ Reporte guardado en {args.output}")
+
+    failed = unexpected_errors(report)
+    for mode, errors in failed:
+        print(f"❌ {mode}: {errors} celda(s) sin precio sin fallas inyectadas (¿navegador instalado?)")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(report, json.load(f), args.tolerance)
+        for mode, before, after in regressions:
+            print(f"❌ Regresión en {mode}: {before} → {after} celdas/s")
+        if not regressions and not failed:
+            print("✓ Sin regresiones respecto de la línea base")
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
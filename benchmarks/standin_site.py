@@ -0,0 +1,194 @@
+"""
+Sitio local que reemplaza a Airbnb y Booking durante los benchmarks
+
+Sirve páginas de alojamiento grabadas (fixtures o snapshots reales de
+data/snapshots) con latencia configurable e inyección de fallas, para
+medir el scraper sin tocar los sitios reales. Los scrapers apuntan a él
+con base_url:
+
+    with StandInSite(latency_ms=300, failure_rate=0.05) as site:
+        scraper = AirbnbScraper(base_url=site.base_url)
+"""
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.snapshots import SnapshotStore
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Ruta de la URL → plataforma (mismas rutas que build_url() de cada scraper)
+ROUTES = [
+    (re.compile(r'^/rooms/\d+'), 'airbnb'),
+    (re.compile(r'^/hotel/[a-z]{2}/[^.?]+'), 'booking'),
+]
+
+# Fallas inyectables: código HTTP de error, bloqueo (429) o página colgada
+FAILURE_MODES = ('error', 'blocked', 'hang')
+
+
+def load_fixture_pages(fixtures_dir=FIXTURES_DIR):
+    """
+    Páginas de prueba incluidas en el repositorio
+
+    Returns:
+        dict plataforma → {'listing': html, 'unavailable': html}
+    """
+    pages = {}
+    for platform in ('airbnb', 'booking'):
+        pages[platform] = {}
+        for kind in ('listing', 'unavailable'):
+            with open(os.path.join(fixtures_dir, f'{platform}_{kind}.html'), 'r', encoding='utf-8') as f:
+                pages[platform][kind] = f.read()
+    return pages
+
+
+def load_recorded_pages(snapshot_root='data/snapshots', pages=None):
+    """
+    Reemplaza las páginas de alojamiento por el último snapshot real de cada plataforma
+
+    Args:
+        snapshot_root: raíz del SnapshotStore
+        pages: páginas base (por defecto las fixtures); las plataformas sin
+            snapshots conservan la fixture
+
+    Returns:
+        dict plataforma → {'listing': html, 'unavailable': html}
+    """
+    pages = pages or load_fixture_pages()
+    store = SnapshotStore(snapshot_root)
+    latest = {}
+    for entry in store.iter_index():
+        platform = (entry.get('platform') or '').lower()
+        if platform in pages:
+            latest[platform] = entry['digest']
+    for platform, digest in latest.items():
+        pages[platform]['listing'] = store.get(digest)
+    return pages
+
+
+class StandInSite:
+    """
+    Servidor HTTP local con las páginas de las plataformas
+
+    La disponibilidad se decide por URL (determinística: la misma celda
+    siempre da el mismo resultado); las fallas y la latencia son aleatorias
+    con una semilla fija, para que dos corridas sean comparables.
+    """
+
+    def __init__(self, pages=None, latency_ms=0, jitter_ms=0, failure_rate=0.0, failure_mode='error',
+                 unavailable_rate=0.0, hang_seconds=120, seed=0, port=0):
+        """
+        Args:
+            pages: dict plataforma → {'listing', 'unavailable'} (por defecto las fixtures)
+            latency_ms: demora fija de cada respuesta
+            jitter_ms: demora adicional aleatoria (uniforme entre 0 y jitter_ms)
+            failure_rate: fracción de pedidos que fallan (0 a 1)
+            failure_mode: 'error' (HTTP 500), 'blocked' (HTTP 429) o 'hang' (no responde)
+            unavailable_rate: fracción de celdas que se muestran como no disponibles
+            hang_seconds: cuánto se cuelga una respuesta en modo 'hang'
+            seed: semilla de las fallas y la latencia
+            port: puerto local (0 = uno libre)
+        """
+        if failure_mode not in FAILURE_MODES:
+            raise ValueError(f"failure_mode debe ser uno de {FAILURE_MODES}")
+        self.pages = pages or load_fixture_pages()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.unavailable_rate = unavailable_rate
+        self.hang_seconds = hang_seconds
+        self.requests = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='standin-site', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def is_unavailable(self, path):
+        """Disponibilidad determinística por URL (alojamiento + fechas + huéspedes)"""
+        return zlib.crc32(path.encode('utf-8')) % 10000 < self.unavailable_rate * 10000
+
+    def _plan(self):
+        """Demora y falla del próximo pedido"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        return delay / 1000, failed
+
+    def respond(self, path):
+        """
+        Respuesta para una ruta (sin demora ni fallas)
+
+        Returns:
+            (código HTTP, html)
+        """
+        for pattern, platform in ROUTES:
+            if pattern.match(path) and platform in self.pages:
+                kind = 'unavailable' if self.is_unavailable(path) else 'listing'
+                return 200, self.pages[platform][kind]
+        return 404, '<html><body>No encontrado</body></html>'
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                delay, failed = site._plan()
+                if delay:
+                    time.sleep(delay)
+                if failed and site.failure_mode == 'hang':
+                    site._stopped.wait(site.hang_seconds)
+                    return
+                if failed:
+                    status, html = (429 if site.failure_mode == 'blocked' else 500), '<html><body>Error</body></html>'
+                else:
+                    status, html = site.respond(self.path)
+                body = html.encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # El navegador cortó la carga (p.ej. por timeout)
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
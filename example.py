@@ -11,9 +11,20 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from src.airbnb_scraper import AirbnbScraper
 from src.booking_scraper import BookingScraper
 from src.data_manager import DataManager
+from src.progress import ProgressTracker, format_eta
+from src.structured_log import setup_logging
+
+
+def print_progress(state):
+    """Imprime cada resultado apenas llega, con el ETA de la ejecución"""
+    result = state['result']
+    price = result.get('price_usd')
+    price_str = f"${price:,.0f}" if price else result.get('error', 'sin precio')
+    print(f"  [{state['done']}/{state['total']}] {result['platform']} {result['checkin']}: {price_str} · ETA {format_eta(state['eta_seconds'])}")
 
 
 def main():
+    setup_logging()
     print("💰 Price Monitor - Ejemplo de uso")
     print("=" * 50)
     
@@ -35,14 +46,18 @@ def main():
     
     results = []
     
-    # Scrapear Airbnb
+    # Progreso por celda con ETA (una celda por fecha y plataforma)
+    days = (end_date - start_date).days + 1
+    tracker = ProgressTracker(days * 2, callback=print_progress)
+    
+    # Scrapear Airbnb: cada fecha se muestra apenas se obtiene
     print("🔍 Scrapeando Airbnb...")
-    airbnb_results = airbnb.scrape_date_range(airbnb_url, start_date, end_date, nights=1, guests=2)
-    results.extend(airbnb_results)
+    airbnb_results = airbnb.iter_date_range(airbnb_url, start_date, end_date, nights=1, guests=2)
+    results.extend(tracker.track(airbnb_results))
     
     print("\n🔍 Scrapeando Booking...")
-    booking_results = booking.scrape_date_range(booking_url, start_date, end_date, nights=1, adults=2)
-    results.extend(booking_results)
+    booking_results = booking.iter_date_range(booking_url, start_date, end_date, nights=1, adults=2)
+    results.extend(tracker.track(booking_results))
     
     # Guardar resultados
     print("\n💾 Guardando resultados...")
@@ -0,0 +1,240 @@
+"""
+Pool de contextos de navegador con rotación de fingerprints y health scoring
+"""
+import itertools
+import json
+import os
+
+from src.structured_log import get_logger
+
+
+log = get_logger('browser_pool')
+
+
+# Fingerprints realistas; el locale se mantiene en es-AR porque la
+# extracción de precios y los indicadores de disponibilidad dependen del idioma
+FINGERPRINTS = [
+    {
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'viewport': {'width': 1920, 'height': 1080},
+    },
+    {
+        'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+        'viewport': {'width': 1440, 'height': 900},
+    },
+    {
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36 Edg/126.0.0.0',
+        'viewport': {'width': 1536, 'height': 864},
+    },
+    {
+        'user_agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36',
+        'viewport': {'width': 1366, 'height': 768},
+    },
+    {
+        'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+        'viewport': {'width': 1680, 'height': 1050},
+    },
+]
+
+DEFAULT_FINGERPRINT = FINGERPRINTS[0]
+
+
+class PageBlockedError(Exception):
+    """La plataforma respondió con un bloqueo o desafío anti-bot"""
+
+
+def load_proxies(config_path='config/proxies.json'):
+    """
+    Carga proxies opcionales para asignar uno por contexto
+
+    Formato: {"proxies": [{"server": "http://host:port", "username": "...", "password": "..."}]}
+
+    Returns:
+        list de dicts de proxy de Playwright (vacía si no hay configuración)
+    """
+    try:
+        if os.path.exists(config_path):
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return [p for p in json.load(f).get('proxies', []) if p.get('server')]
+    except Exception as e:
+        log.warning(f"⚠️ No se pudo leer {config_path}: {e}")
+    return []
+
+
+def launch_options(proxies):
+    """
+    Opciones extra de launch() cuando hay proxies por contexto
+
+    Chromium requiere un proxy global para aceptar proxies por contexto; el
+    valor es un marcador que cada contexto reemplaza con el suyo.
+    """
+    if proxies:
+        return {'proxy': {'server': 'http://per-context'}}
+    return {}
+
+
+class PooledContext:
+    """Contexto de navegador con su página y estadísticas de salud"""
+
+    def __init__(self, context, fingerprint, proxy=None):
+        self.context = context
+        self.page = context.new_page()
+        self.fingerprint = fingerprint
+        self.proxy = proxy
+        self.successes = 0
+        self.failures = 0
+        self.blocks = 0
+        self.latency_ewma = None
+        # Cargas de la página actual (se reinicia al reciclarla)
+        self.page_uses = 0
+
+    @property
+    def uses(self):
+        return self.successes + self.failures
+
+    def score(self):
+        """
+        Puntaje de salud en [0, 1]: tasa de éxito suavizada penalizada por latencia
+
+        Un contexto nuevo arranca en 0.5 (sin evidencia) y sube o baja con el uso.
+        """
+        success_rate = (self.successes + 1) / (self.uses + 2)
+        latency_penalty = 1.0
+        if self.latency_ewma is not None:
+            latency_penalty = 1 / (1 + self.latency_ewma / 60)
+        return success_rate * latency_penalty
+
+    def record(self, ok, latency, blocked=False, alpha=0.3):
+        """Actualiza estadísticas después de una celda"""
+        if ok:
+            self.successes += 1
+        else:
+            self.failures += 1
+        self.page_uses += 1
+        if blocked:
+            self.blocks += 1
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = alpha * latency + (1 - alpha) * self.latency_ewma
+
+    def recycle_page(self):
+        """Reemplaza la página por una nueva en el mismo contexto (libera su renderer)"""
+        try:
+            self.page.close()
+        except Exception:
+            pass
+        self.page = self.context.new_page()
+        self.page_uses = 0
+
+    def close(self):
+        try:
+            self.context.close()
+        except Exception:
+            pass
+
+
+class ContextPool:
+    """
+    Pool de contextos "tibios" sobre un mismo navegador
+
+    Cada contexto tiene un fingerprint (y opcionalmente un proxy) distinto.
+    acquire() entrega el contexto más sano; release() registra el resultado
+    y retira contextos bloqueados o con mal puntaje, reemplazándolos por uno
+    nuevo con el siguiente fingerprint, sin relanzar el navegador. Con
+    max_page_uses/max_context_uses también recicla por uso, para acotar la
+    memoria que acumula Chromium (ver memory_governor).
+    """
+
+    def __init__(self, browser, context_factory, size=3, fingerprints=None, proxies=None, min_score=0.35, min_uses=3,
+                 max_page_uses=None, max_context_uses=None):
+        """
+        Args:
+            browser: navegador de Playwright ya lanzado
+            context_factory: callable(browser, fingerprint, proxy) → BrowserContext
+            size: cantidad de contextos simultáneos
+            fingerprints: lista de fingerprints a rotar (por defecto FINGERPRINTS)
+            proxies: lista opcional de proxies a rotar (ver load_proxies)
+            min_score: puntaje mínimo antes de retirar un contexto
+            min_uses: usos mínimos antes de evaluar el puntaje
+            max_page_uses: cargas antes de reemplazar la página de un contexto (None = nunca)
+            max_context_uses: cargas antes de retirar un contexto (None = nunca)
+        """
+        self.browser = browser
+        self.context_factory = context_factory
+        self.size = max(1, size)
+        self.min_score = min_score
+        self.min_uses = min_uses
+        self.max_page_uses = max_page_uses
+        self.max_context_uses = max_context_uses
+        self._fingerprints = itertools.cycle(fingerprints or FINGERPRINTS)
+        self._proxies = itertools.cycle(proxies) if proxies else None
+        self.retired = 0
+        self.recycled_pages = 0
+        self.contexts = [self._spawn() for _ in range(self.size)]
+
+    def _spawn(self):
+        """Crea un contexto nuevo con el siguiente fingerprint/proxy"""
+        fingerprint = next(self._fingerprints)
+        proxy = next(self._proxies) if self._proxies else None
+        context = self.context_factory(self.browser, fingerprint, proxy)
+        return PooledContext(context, fingerprint, proxy)
+
+    def acquire(self):
+        """Contexto con mejor puntaje (a igual puntaje, el menos usado)"""
+        return max(self.contexts, key=lambda ctx: (ctx.score(), -ctx.uses))
+
+    def release(self, pooled, ok, latency, blocked=False, discard=False):
+        """
+        Registra el resultado de una celda y retira el contexto si corresponde
+
+        Args:
+            pooled: PooledContext devuelto por acquire()
+            ok: True si la página cargó y se pudo interpretar
+            latency: segundos que tomó la celda
+            blocked: True si la plataforma bloqueó o desafió al contexto
+            discard: True si la página quedó inutilizable (p.ej. tras un error)
+        """
+        pooled.record(ok, latency, blocked)
+        unhealthy = pooled.uses >= self.min_uses and pooled.score() < self.min_score
+        worn_out = self.max_context_uses is not None and pooled.uses >= self.max_context_uses
+        if blocked or discard or unhealthy or worn_out:
+            self._retire(pooled)
+        elif self.max_page_uses is not None and pooled.page_uses >= self.max_page_uses:
+            try:
+                pooled.recycle_page()
+                self.recycled_pages += 1
+            except Exception:
+                self._retire(pooled)
+
+    def recycle(self, pooled):
+        """Reemplaza un contexto sano (p.ej. para liberar memoria)"""
+        self._retire(pooled)
+
+    def _retire(self, pooled):
+        """Reemplaza un contexto por uno nuevo"""
+        if pooled not in self.contexts:
+            return
+        index = self.contexts.index(pooled)
+        pooled.close()
+        self.retired += 1
+        self.contexts[index] = self._spawn()
+
+    def stats(self):
+        """Resumen de salud de cada contexto del pool"""
+        return [
+            {
+                'user_agent': ctx.fingerprint['user_agent'],
+                'proxy': (ctx.proxy or {}).get('server'),
+                'uses': ctx.uses,
+                'blocks': ctx.blocks,
+                'latency_ewma': round(ctx.latency_ewma, 2) if ctx.latency_ewma is not None else None,
+                'score': round(ctx.score(), 3)
+            }
+            for ctx in self.contexts
+        ]
+
+    def close(self):
+        for ctx in self.contexts:
+            ctx.close()
+        self.contexts = []
@@ -0,0 +1,182 @@
+"""
+Checkpoints de ejecuciones de scraping para poder reanudarlas
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta
+
+from src.structured_log import get_logger
+
+
+log = get_logger('checkpoint')
+
+# Un checkpoint más viejo que esto ya no se reanuda: sus precios están desactualizados
+DEFAULT_MAX_AGE_HOURS = 24
+
+
+def _created_at(run_dir):
+    """Fecha de creación del checkpoint según su manifiesto (o la del archivo)"""
+    manifest_path = os.path.join(run_dir, 'manifest.json')
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return datetime.fromisoformat(json.load(f)['created_at'])
+    except Exception:
+        pass
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(manifest_path if os.path.exists(manifest_path) else run_dir))
+    except OSError:
+        return None
+
+
+def prune_stale(checkpoint_dir, max_age_hours=DEFAULT_MAX_AGE_HOURS, now=None):
+    """
+    Elimina los checkpoints creados hace más de max_age_hours
+
+    Returns:
+        lista de run_id eliminados
+    """
+    if not max_age_hours or not os.path.isdir(checkpoint_dir):
+        return []
+    limit = (now or datetime.now()) - timedelta(hours=max_age_hours)
+    removed = []
+    for run_id in os.listdir(checkpoint_dir):
+        run_dir = os.path.join(checkpoint_dir, run_id)
+        if not os.path.isdir(run_dir):
+            continue
+        created_at = _created_at(run_dir)
+        if created_at is not None and created_at < limit:
+            shutil.rmtree(run_dir, ignore_errors=True)
+            removed.append(run_id)
+    if removed:
+        log.info(f"Checkpoints vencidos eliminados: {len(removed)}", removed=removed)
+    return removed
+
+
+def _date_str(value):
+    """Formatea date/datetime/str como YYYY-MM-DD"""
+    if hasattr(value, 'strftime'):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+
+class RunCheckpoint:
+    """
+    Persiste cada celda scrapeada apenas termina, junto con un manifiesto
+    de la ejecución. Una ejecución interrumpida (crash, timeout, rerun de
+    Streamlit) con la misma configuración retoma desde la primera celda
+    incompleta en lugar de empezar de cero.
+
+    record() es seguro entre hilos: varias plataformas pueden registrar
+    celdas en el mismo checkpoint a la vez.
+
+    Los checkpoints creados hace más de max_age_hours se descartan al abrir
+    uno nuevo: la ejecución vuelve a empezar con precios actuales.
+    """
+
+    def __init__(self, checkpoint_dir, property_name, start_date, end_date, nights_list, guests_list, platforms,
+                 max_age_hours=DEFAULT_MAX_AGE_HOURS):
+        self.config = {
+            'property_name': property_name,
+            'start_date': _date_str(start_date),
+            'end_date': _date_str(end_date),
+            'nights': sorted(int(n) for n in nights_list),
+            'guests': sorted(int(g) for g in guests_list),
+            'platforms': sorted(platforms)
+        }
+        # Misma configuración => mismo run_id => se reanuda
+        digest = hashlib.sha1(json.dumps(self.config, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        self.run_id = digest.hexdigest()[:16]
+        self.run_dir = os.path.join(checkpoint_dir, self.run_id)
+        self.manifest_path = os.path.join(self.run_dir, 'manifest.json')
+        self.results_path = os.path.join(self.run_dir, 'results.jsonl')
+
+        prune_stale(checkpoint_dir, max_age_hours)
+        os.makedirs(self.run_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._done = self._load_done()
+        self.resumed = bool(self._done)
+        self.manifest = self._load_manifest()
+        self._save_manifest()
+
+    @staticmethod
+    def cell_key(platform, cell):
+        """Clave única de una celda dentro de la ejecución"""
+        return f"{platform}|{_date_str(cell['checkin'])}|{int(cell['nights'])}|{int(cell['guests'])}"
+
+    def _load_manifest(self):
+        """Carga el manifiesto existente o crea uno nuevo"""
+        try:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                manifest['status'] = 'running'
+                manifest['resumed_at'] = datetime.now().isoformat(timespec='seconds')
+                return manifest
+        except Exception:
+            pass
+        return {
+            'run_id': self.run_id,
+            **self.config,
+            'status': 'running',
+            'completed_cells': len(self._done),
+            'created_at': datetime.now().isoformat(timespec='seconds')
+        }
+
+    def _save_manifest(self):
+        """Escribe el manifiesto de forma atómica"""
+        self.manifest['completed_cells'] = len(self._done)
+        self.manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        tmp_path = self.manifest_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        except Exception as e:
+            log.warning(f"⚠️ No se pudo guardar el manifiesto: {e}", run_id=self.run_id)
+
+    def _iter_records(self):
+        """Itera los registros válidos del archivo de resultados"""
+        if not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Línea truncada por una interrupción a mitad de escritura
+                    continue
+
+    def _load_done(self):
+        """Conjunto de celdas ya completadas"""
+        return {record['cell'] for record in self._iter_records()}
+
+    def is_done(self, platform, cell):
+        """Indica si la celda ya fue scrapeada en esta ejecución"""
+        return self.cell_key(platform, cell) in self._done
+
+    def pending(self, platform, cells):
+        """Filtra las celdas que aún no se completaron"""
+        return [cell for cell in cells if not self.is_done(platform, cell)]
+
+    def record(self, platform, cell, result):
+        """Persiste el resultado de una celda inmediatamente"""
+        key = self.cell_key(platform, cell)
+        line = json.dumps({'cell': key, 'result': result}, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.results_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._done.add(key)
+            self._save_manifest()
+
+    def results(self):
+        """Todos los resultados persistidos (incluye los de ejecuciones previas)"""
+        return [record['result'] for record in self._iter_records()]
+
+    def finish(self):
+        """Elimina el checkpoint una vez que los resultados fueron guardados"""
+        shutil.rmtree(self.run_dir, ignore_errors=True)
@@ -6,43 +6,79 @@ import json
 from datetime import datetime
 import os
 
+from src.checkpoint import RunCheckpoint
+from src.scrape_cells import cell_key
+from src.structured_log import get_logger
+from src.timing import timed
+
+
+log = get_logger('data_manager')
+
 
 class DataManager:
     def __init__(self, data_dir='data'):
         self.data_dir = data_dir
         self.csv_path = os.path.join(data_dir, 'price_history.csv')
         self.runs_path = os.path.join(data_dir, 'scrape_runs.json')
+        self.checkpoints_dir = os.path.join(data_dir, 'checkpoints')
+        self.skipped_path = os.path.join(data_dir, 'skipped_cells.json')
         
         # Crear directorio si no existe
         os.makedirs(data_dir, exist_ok=True)
         
+    @timed('DataManager:save_results')
     def save_results(self, results, property_name='unknown'):
         """
         Guarda los resultados del scraping en CSV
         
+        Los resultados servidos desde una caché (from_cache) ya se guardaron
+        cuando se scrapearon y se omiten.
+        
         Args:
             results: lista de dicts con los datos de precios
             property_name: nombre de la propiedad
         """
+        results = [r for r in results if not r.get('from_cache')]
         if not results:
             return
         
-        # Convertir a DataFrame
-        df = pd.DataFrame(results)
+        # Convertir a DataFrame (las duraciones por fase son métricas y el
+        # desglose por noche es una lista: ninguno va al histórico)
+        df = pd.DataFrame(results).drop(columns=['timings', 'nightly'], errors='ignore')
         
         # Agregar nombre de propiedad
         df['property_name'] = property_name
         
         # Si el archivo existe, agregar los datos
         if os.path.exists(self.csv_path):
-            existing_df = pd.read_csv(self.csv_path)
+            with timed('DataManager:read_csv'):
+                existing_df = pd.read_csv(self.csv_path)
             df = pd.concat([existing_df, df], ignore_index=True)
         
         # Guardar
-        df.to_csv(self.csv_path, index=False)
+        with timed('DataManager:write_csv'):
+            df.to_csv(self.csv_path, index=False)
         
-        print(f"✓ Datos guardados en {self.csv_path}")
+        log.info(f"✓ Datos guardados en {self.csv_path}", property=property_name, phase='save', rows=len(results))
         
+    def open_checkpoint(self, property_name, start_date, end_date, nights_list, guests_list, platforms):
+        """
+        Abre (o retoma) el checkpoint de una ejecución de scraping
+        
+        Returns:
+            RunCheckpoint asociado a la configuración dada
+        """
+        return RunCheckpoint(
+            self.checkpoints_dir,
+            property_name,
+            pd.to_datetime(start_date),
+            pd.to_datetime(end_date),
+            nights_list,
+            guests_list,
+            platforms
+        )
+        
+    @timed('DataManager:load_data')
     def load_data(self):
         """
         Carga los datos históricos
@@ -55,6 +91,7 @@ class DataManager:
         return None
 
     # ====== Gestión de ejecuciones (anti-duplicado 48h) ======
+    @timed('DataManager:load_runs')
     def _load_runs(self):
         """Carga el log de ejecuciones de scraping"""
         try:
@@ -65,13 +102,14 @@ class DataManager:
             pass
         return []
 
+    @timed('DataManager:save_runs')
     def _save_runs(self, runs):
         """Guarda el log de ejecuciones de scraping"""
         try:
             with open(self.runs_path, 'w', encoding='utf-8') as f:
                 json.dump(runs, f, ensure_ascii=False, indent=2)
         except Exception as e:
-            print(f"⚠️ No se pudo guardar runs log: {e}")
+            log.warning(f"⚠️ No se pudo guardar runs log: {e}")
 
     def log_scrape_run(self, property_name, start_date, end_date, nights, guests, platforms):
         """Registra una ejecución de scraping exitosa"""
@@ -89,6 +127,7 @@ class DataManager:
         self._save_runs(runs)
         return record
 
+    @timed('DataManager:is_recent_same_run')
     def is_recent_same_run(self, property_name, start_date, end_date, nights, guests, platforms, window_hours=48):
         """Verifica si ya se ejecutó la misma configuración en las últimas window_hours horas"""
         runs = self._load_runs()
@@ -117,6 +156,53 @@ class DataManager:
                 continue
         return False
     
+    # ====== Celdas salteadas por deadline ======
+    @timed('DataManager:load_skipped_cells')
+    def load_skipped_cells(self):
+        """
+        Carga las celdas que quedaron sin scrapear por agotar el tiempo
+        
+        Returns:
+            dict cell_key → info de la celda (fechas como texto)
+        """
+        try:
+            if os.path.exists(self.skipped_path):
+                with open(self.skipped_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception:
+            pass
+        return {}
+
+    @timed('DataManager:update_skipped_cells')
+    def update_skipped_cells(self, skipped, completed=()):
+        """
+        Registra las celdas salteadas para que el próximo ciclo las priorice
+        
+        Args:
+            skipped: lista de celdas que no se alcanzaron a scrapear
+            completed: lista de celdas scrapeadas (se quitan del registro)
+        """
+        pending = self.load_skipped_cells()
+        for cell in completed:
+            pending.pop(cell_key(cell), None)
+        now = datetime.now().isoformat(timespec='seconds')
+        for cell in skipped:
+            pending[cell_key(cell)] = {
+                'platform': cell.get('platform'),
+                'property_name': cell.get('property_name'),
+                'checkin': cell['checkin'].strftime('%Y-%m-%d'),
+                'nights': int(cell['nights']),
+                'guests': int(cell['guests']),
+                'skipped_at': now
+            }
+        try:
+            with open(self.skipped_path, 'w', encoding='utf-8') as f:
+                json.dump(pending, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            log.warning(f"⚠️ No se pudo guardar el registro de celdas salteadas: {e}")
+        return pending
+    
+    @timed('DataManager:get_property_data')
     def get_property_data(self, property_name):
         """
         Obtiene datos de una propiedad específica
@@ -132,6 +218,7 @@ class DataManager:
             return df[df['property_name'] == property_name]
         return None
     
+    @timed('DataManager:get_platform_comparison')
     def get_platform_comparison(self, property_name):
         """
         Compara precios entre plataformas para una propiedad
@@ -157,6 +244,7 @@ class DataManager:
             return pivot
         return None
     
+    @timed('DataManager:export_to_excel')
     def export_to_excel(self, property_name, output_path=None):
         """
         Exporta los datos a Excel con múltiples hojas
@@ -181,11 +269,12 @@ class DataManager:
                 if comparison is not None:
                     comparison.to_excel(writer, sheet_name='Comparación Plataformas')
             
-            print(f"✓ Datos exportados a {output_path}")
+            log.info(f"✓ Datos exportados a {output_path}")
             return output_path
         
         return None
     
+    @timed('DataManager:get_summary_stats')
     def get_summary_stats(self, property_name):
         """
         Obtiene estadísticas resumidas por plataforma
@@ -0,0 +1,137 @@
+"""
+Escritura asíncrona y acotada de artefactos de debug (screenshots y HTML)
+"""
+import atexit
+import gzip
+import os
+import queue
+import random
+import threading
+
+from src.structured_log import get_logger
+
+
+log = get_logger('debug_artifacts')
+
+
+class DebugArtifactWriter:
+    """
+    Escribe los artefactos de debug en un hilo en segundo plano
+
+    - El scraper solo encola bytes ya capturados; la compresión y la
+      escritura a disco no bloquean la celda.
+    - El HTML se guarda comprimido (.html.gz); los PNG ya vienen comprimidos.
+    - El directorio funciona como buffer circular: al superar max_files o
+      max_bytes se borran los artefactos más viejos.
+    - Las capturas por falla se muestrean (failure_sample_rate); las pedidas
+      explícitamente con debug=True se guardan siempre.
+    - Si la cola está llena el artefacto se descarta (nunca frena el scraping).
+    """
+
+    def __init__(self, debug_dir='debug', max_files=200, max_bytes=200 * 1024 * 1024, failure_sample_rate=0.25, queue_size=32):
+        """
+        Args:
+            debug_dir: directorio de artefactos
+            max_files: máximo de archivos a conservar
+            max_bytes: máximo de bytes a conservar
+            failure_sample_rate: fracción de fallas que se capturan (0 a 1)
+            queue_size: artefactos pendientes antes de empezar a descartar
+        """
+        self.debug_dir = debug_dir
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.failure_sample_rate = failure_sample_rate
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        os.makedirs(debug_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='debug-artifacts', daemon=True)
+        self._thread.start()
+
+    def should_capture(self, forced=False):
+        """True si corresponde capturar artefactos (siempre si forced)"""
+        if forced or random.random() < self.failure_sample_rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+    def submit(self, base_name, html=None, screenshot=None):
+        """
+        Encola artefactos para escribir en segundo plano
+
+        Args:
+            base_name: nombre base de los archivos (sin extensión)
+            html: contenido de la página (str) o None
+            screenshot: bytes PNG o None
+
+        Returns:
+            True si se encoló, False si se descartó por cola llena
+        """
+        try:
+            self._queue.put_nowait((base_name, html, screenshot))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        """Espera a que se escriban todos los artefactos encolados"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            base_name, html, screenshot = self._queue.get()
+            try:
+                self._write(base_name, html, screenshot)
+                self._prune()
+            except Exception as e:
+                log.warning(f"⚠️ No se pudieron guardar los artefactos de debug {base_name}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, base_name, html, screenshot):
+        if screenshot is not None:
+            with open(os.path.join(self.debug_dir, f'{base_name}.png'), 'wb') as f:
+                f.write(screenshot)
+            self.written += 1
+        if html is not None:
+            with gzip.open(os.path.join(self.debug_dir, f'{base_name}.html.gz'), 'wb', compresslevel=6) as f:
+                f.write(html.encode('utf-8'))
+            self.written += 1
+
+    def _prune(self):
+        """Borra los artefactos más viejos hasta respetar los límites"""
+        entries = []
+        for entry in os.scandir(self.debug_dir):
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_files or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_bytes -= size
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_debug_writer(debug_dir='debug'):
+    """
+    Escritor compartido por directorio (un solo hilo para todos los scrapers)
+
+    Los artefactos pendientes se escriben antes de salir del proceso.
+    """
+    with _writers_lock:
+        if debug_dir not in _writers:
+            writer = DebugArtifactWriter(debug_dir)
+            atexit.register(writer.flush)
+            _writers[debug_dir] = writer
+        return _writers[debug_dir]
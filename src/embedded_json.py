@@ -0,0 +1,214 @@
+"""
+Extracción de precios desde el estado JSON embebido en las páginas
+
+Airbnb y Booking incluyen los datos de la reserva como JSON en etiquetas
+<script>. Leerlos una vez por página es mucho más barato que recorrer el
+DOM renderizado y funciona igual sobre snapshots HTML guardados.
+"""
+import json
+import re
+
+from src.structured_log import get_logger
+
+
+log = get_logger('extraction')
+
+
+SCRIPT_PATTERN = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.DOTALL | re.IGNORECASE)
+JSON_SCRIPT_TYPES = ('application/json', 'application/ld+json')
+
+# Equivalente en el navegador de json_script_texts(): un solo page.evaluate()
+JSON_SCRIPTS_SCRIPT = """
+() => Array.from(
+    document.querySelectorAll('script[type="application/json"], script[type="application/ld+json"]'),
+    (script) => script.textContent
+)
+"""
+
+CURRENCY_MARKERS = [
+    ('US$', 'USD'),
+    ('USD', 'USD'),
+    ('ARS', 'ARS'),
+    ('€', 'EUR'),
+    ('EUR', 'EUR'),
+]
+
+
+def json_script_texts(html):
+    """Contenido de los <script> JSON de un HTML (sin parsear el DOM completo)"""
+    texts = []
+    for attrs, body in SCRIPT_PATTERN.findall(html):
+        attrs = attrs.lower()
+        if any(script_type in attrs for script_type in JSON_SCRIPT_TYPES):
+            texts.append(body)
+    return texts
+
+
+def parse_blobs(texts):
+    """Parsea los textos JSON, ignorando los inválidos"""
+    blobs = []
+    for text in texts:
+        try:
+            blobs.append(json.loads(text))
+        except (TypeError, ValueError):
+            continue
+    return blobs
+
+
+def find_keys(obj, keys):
+    """
+    Recorre un JSON y genera (clave, valor) para cada clave buscada
+
+    Recorrido iterativo en profundidad, en el orden del documento.
+    """
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            children = []
+            for key, value in current.items():
+                if key in keys:
+                    yield key, value
+                if isinstance(value, (dict, list)):
+                    children.append(value)
+            stack.extend(reversed(children))
+        elif isinstance(current, list):
+            stack.extend(reversed([item for item in current if isinstance(item, (dict, list))]))
+
+
+def detect_currency(text, default=None):
+    """Moneda a partir de un texto de precio ('US$ 250' → 'USD')"""
+    if text:
+        for marker, currency in CURRENCY_MARKERS:
+            if marker in text:
+                return currency
+    return default
+
+
+def _to_amount(value):
+    """Número de un valor JSON (ya numérico o texto sin formato)"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _result(amount=None, price_text=None, currency=None, nightly=None, unavailable=False, source=None):
+    return {
+        'amount': amount,
+        'price_text': price_text,
+        'currency': currency or detect_currency(price_text),
+        'nightly': nightly or [],
+        'unavailable': unavailable,
+        'source': source
+    }
+
+
+def airbnb_state(blobs):
+    """
+    Precio de Airbnb desde el estado de la página (structuredDisplayPrice)
+
+    El total sale de la línea "Total" del desglose si existe, y si no de la
+    línea principal; el resto del desglose se devuelve como detalle por noche.
+    La disponibilidad no se infiere del JSON (muchas claves 'available' son
+    de amenities o del calendario): sin precio se usa la extracción por DOM.
+
+    Returns:
+        dict con amount, price_text, currency, nightly, unavailable y source, o None
+    """
+    for blob in blobs:
+        for _, display in find_keys(blob, ('structuredDisplayPrice',)):
+            if not isinstance(display, dict):
+                continue
+            primary = display.get('primaryLine') or {}
+            total_text = None
+            nightly = []
+            details = (display.get('explanationData') or {}).get('priceDetails') or []
+            for group in details:
+                for item in (group or {}).get('items') or []:
+                    description, price_string = item.get('description'), item.get('priceString')
+                    if description and 'total' in description.lower():
+                        total_text = price_string
+                    elif price_string:
+                        nightly.append({'description': description, 'price_text': price_string})
+            price_text = total_text or primary.get('discountedPrice') or primary.get('price') or primary.get('originalPrice')
+            if price_text:
+                return _result(price_text=price_text, nightly=nightly, source='json:structuredDisplayPrice')
+    return None
+
+
+def booking_state(blobs):
+    """
+    Precio de Booking desde el store embebido (priceDisplayInfoIrene)
+
+    Returns:
+        dict con amount, price_text, currency, nightly, unavailable y source, o None
+    """
+    for blob in blobs:
+        for _, info in find_keys(blob, ('priceDisplayInfoIrene', 'priceDisplayInfo')):
+            if not isinstance(info, dict):
+                continue
+            display = info.get('displayPrice') or {}
+            per_stay = display.get('amountPerStay') or {}
+            amount = _to_amount(per_stay.get('amountUnformatted'))
+            price_text = per_stay.get('amountRounded') or per_stay.get('amount')
+            if amount or price_text:
+                nightly = []
+                per_night = display.get('amountPerNight') or {}
+                if per_night:
+                    nightly.append({
+                        'description': 'por noche',
+                        'price_text': per_night.get('amountRounded') or per_night.get('amount')
+                    })
+                return _result(amount=amount, price_text=price_text, currency=per_stay.get('currency'),
+                               nightly=nightly, source='json:priceDisplayInfo')
+
+    # Sin precio en ningún blob: agotado solo si el store lo indica explícitamente
+    for blob in blobs:
+        for _, sold_out in find_keys(blob, ('soldOut', 'isSoldOut')):
+            if sold_out is True:
+                return _result(unavailable=True, source='json:soldOut')
+    return None
+
+
+def embedded_extraction(texts, state_parser, parse_price_text):
+    """
+    Resultado de extracción a partir de los scripts JSON de una página
+
+    Mismo formato que page_extraction/html_parsing, más currency y nightly.
+    Solo se aceptan precios en USD (la columna del histórico es price_usd);
+    con otra moneda se devuelve None y se usa la extracción por DOM.
+
+    Args:
+        texts: contenido de los <script> JSON
+        state_parser: airbnb_state o booking_state
+        parse_price_text: conversión de texto a número de la plataforma
+
+    Returns:
+        dict con price, price_text, selector, unavailable, challenge,
+        currency y nightly, o None si el JSON no tiene datos útiles
+    """
+    state = state_parser(parse_blobs(texts))
+    if state is None:
+        return None
+    price = state['amount'] if state['amount'] is not None else parse_price_text(state['price_text'])
+    if not price and not state['unavailable']:
+        return None
+    if price and state['currency'] not in (None, 'USD'):
+        log.info(f"⚠️ Precio embebido en {state['currency']}, se usa la extracción por DOM", phase='extract')
+        return None
+    return {
+        'price': price or None,
+        'price_text': state['price_text'] or (f"{price:g}" if price else None),
+        'selector': state['source'],
+        'unavailable': bool(state['unavailable'] and not price),
+        'challenge': False,
+        'currency': state['currency'],
+        'nightly': state['nightly']
+    }
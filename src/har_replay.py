@@ -0,0 +1,134 @@
+"""
+Grabación y reproducción de sesiones en HAR para corridas deterministas
+
+Uso:
+    # Grabar contra los sitios reales (un HAR por contexto del navegador)
+    python -m src.har_replay record --platform airbnb --url https://www.airbnb.com.ar/rooms/123 --start 2025-12-01 --days 3
+
+    # Reproducir offline las mismas celdas, sin esperas de red
+    python -m src.har_replay replay --platform airbnb --url https://www.airbnb.com.ar/rooms/123 --start 2025-12-01 --days 3 --fast
+
+La reproducción usa route_from_har de Playwright: cada pedido se responde
+desde los HAR grabados de la plataforma (por URL y método) y lo que no está
+grabado se aborta, así que nunca sale a la red. El pipeline completo corre
+igual que en vivo: JSON embebido, selectores, fallbacks y detección de "no
+disponible".
+"""
+import argparse
+import glob
+import os
+from datetime import datetime, timedelta
+
+from src.platforms import SCRAPERS
+from src.scrape_cells import build_cells
+from src.structured_log import setup_logging
+
+
+HAR_MODES = ('record', 'replay')
+
+
+class HarArchive:
+    """
+    HAR grabados por plataforma
+
+    Estructura: <har_dir>/<plataforma>/<timestamp>-<n>.har (uno por contexto;
+    el pool de contextos graba en paralelo sin pisarse). Al reproducir se
+    registran todos, con prioridad para los más nuevos.
+    """
+
+    def __init__(self, har_dir='data/har', mode='replay'):
+        """
+        Args:
+            har_dir: directorio raíz de los HAR
+            mode: 'record' (graba las sesiones) o 'replay' (responde desde los HAR)
+        """
+        if mode not in HAR_MODES:
+            raise ValueError(f"mode debe ser uno de {HAR_MODES}")
+        self.har_dir = har_dir
+        self.mode = mode
+        self._recorded = 0
+
+    def platform_dir(self, platform):
+        return os.path.join(self.har_dir, platform.lower())
+
+    def files(self, platform):
+        """HAR de la plataforma, del más viejo al más nuevo"""
+        return sorted(glob.glob(os.path.join(self.platform_dir(platform), '*.har')))
+
+    def attach(self, context, platform):
+        """
+        Conecta un contexto nuevo a los HAR de la plataforma
+
+        En modo 'record' Playwright escribe el HAR al cerrar el contexto; en
+        modo 'replay' los pedidos no grabados se abortan.
+
+        Returns:
+            list de rutas de HAR asociadas al contexto
+        """
+        if self.mode == 'record':
+            os.makedirs(self.platform_dir(platform), exist_ok=True)
+            self._recorded += 1
+            path = os.path.join(
+                self.platform_dir(platform),
+                f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._recorded}.har"
+            )
+            context.route_from_har(path, update=True, update_content='embed', update_mode='minimal')
+            return [path]
+
+        files = self.files(platform)
+        if not files:
+            raise FileNotFoundError(f"No hay HAR grabados de {platform} en {self.platform_dir(platform)}")
+        # Las rutas se evalúan de la última registrada a la primera: el aborto
+        # queda como último recurso y los HAR más nuevos tienen prioridad
+        context.route('**/*', lambda route: route.abort())
+        for path in files:
+            context.route_from_har(path, not_found='fallback')
+        return files
+
+
+def configure_scraper(scraper, archive, fast=False):
+    """
+    Prepara un scraper para grabar o reproducir
+
+    Las cachés y el estado persistido se desactivan para que todas las
+    celdas pasen por el navegador. Con fast (solo en replay) se eliminan las
+    esperas pensadas para la red real, para perfilar la extracción aislada.
+    """
+    scraper.har = archive
+    scraper.result_cache = None
+    scraper.unavailable_cache = None
+    scraper.storage_state = None
+    if fast and archive.mode == 'replay':
+        scraper.settle_seconds = 0
+        scraper.cell_delay = 0
+    return scraper
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grabación y reproducción de sesiones en HAR")
+    parser.add_argument('mode', choices=HAR_MODES)
+    parser.add_argument('--platform', choices=sorted(SCRAPERS), required=True)
+    parser.add_argument('--url', required=True, help="URL del alojamiento")
+    parser.add_argument('--start', required=True, help="Primera fecha de check-in (YYYY-MM-DD)")
+    parser.add_argument('--days', type=int, default=1)
+    parser.add_argument('--nights', type=int, nargs='+', default=[1])
+    parser.add_argument('--guests', type=int, nargs='+', default=[2])
+    parser.add_argument('--har-dir', default='data/har')
+    parser.add_argument('--fast', action='store_true', help="Sin esperas de red al reproducir")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    start = datetime.strptime(args.start, '%Y-%m-%d')
+    cells = build_cells(start, start + timedelta(days=args.days - 1), args.nights, args.guests)
+    scraper = configure_scraper(SCRAPERS[args.platform](), HarArchive(args.har_dir, args.mode), args.fast)
+
+    for result in scraper.iter_cells(args.url, cells, property_name=f'har-{args.mode}'):
+        price = result['price_usd'] if result['price_usd'] is not None else result.get('error')
+        print(f"{result['checkin']} → {result['checkout']}: {price} {result.get('timings', {})}")
+
+    if args.mode == 'record':
+        print(f"\n✓ HAR grabados en {scraper.har.platform_dir(scraper.platform)}")
+
+
+if __name__ == '__main__':
+    main()
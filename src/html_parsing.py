@@ -0,0 +1,132 @@
+"""
+Utilidades de parseo de HTML compartidas por las etapas de extracción
+"""
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Etiquetas cuyo contenido no es texto visible
+NON_VISIBLE_TAGS = ('script', 'style', 'noscript', 'template')
+
+
+def make_soup(html):
+    """Parsea HTML con lxml si está disponible (más rápido) o html.parser"""
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+def select_texts(soup, selector):
+    """
+    Textos de los elementos que coinciden con un selector
+
+    Soporta selectores CSS y la sintaxis de Playwright 'text=/regex/'.
+    """
+    if selector.startswith('text=/') and selector.endswith('/'):
+        pattern = re.compile(selector[len('text=/'):-1])
+        return [
+            node.parent.get_text(' ', strip=True)
+            for node in soup.find_all(string=pattern)
+            if node.parent.name not in NON_VISIBLE_TAGS
+        ]
+    return [element.get_text(' ', strip=True) for element in soup.select(selector)]
+
+
+def body_text(soup):
+    """
+    Texto visible del body (equivalente aproximado a inner_text('body'))
+
+    Descarta scripts y estilos, cuyo contenido no es visible. Modifica soup,
+    por lo que debe llamarse después de evaluar los selectores.
+    """
+    for tag in soup(list(NON_VISIBLE_TAGS)):
+        tag.decompose()
+    body = soup.body or soup
+    return body.get_text('\n')
+
+
+def has_currency(text, config):
+    """True si el texto parece un precio según la configuración de la plataforma"""
+    if not any(marker in text for marker in config['currency_markers']):
+        return False
+    return not config['require_digit'] or any(char.isdigit() for char in text)
+
+
+def classify_page_text(page_text, classifier):
+    """
+    Resultado de extracción a partir del texto completo de la página
+
+    Se usa cuando ningún selector encontró el precio.
+
+    Returns:
+        dict con price_text, selector, unavailable y challenge
+    """
+    classified = classifier.classify(page_text)
+    label = classified['label']
+    return {
+        'price_text': classified['match'] if label == 'price' else None,
+        'selector': f"regex:{classified['pattern']}" if label == 'price' else None,
+        'unavailable': label == 'unavailable',
+        'challenge': label == 'challenge'
+    }
+
+
+def extract_from_html(html, config, classifier):
+    """
+    Busca el texto del precio en HTML ya descargado
+
+    Equivalente offline de page_extraction.extract_in_page(): mismas reglas,
+    misma configuración y mismo formato de resultado.
+
+    Args:
+        html: contenido de la página
+        config: dict con selectors, currency_markers y require_digit
+        classifier: TextClassifier de la plataforma para el texto completo
+
+    Returns:
+        dict con price_text, selector, unavailable y challenge
+    """
+    soup = make_soup(html)
+    for selector in config['selectors']:
+        try:
+            texts = select_texts(soup, selector)
+        except Exception:
+            continue
+        for text in texts:
+            if text and has_currency(text, config):
+                return {'price_text': text, 'selector': selector, 'unavailable': False, 'challenge': False}
+
+    # Sin precio en los selectores: clasificar todo el texto de la página
+    return classify_page_text(body_text(soup), classifier)
+
+
+def search_cards_from_html(html, config):
+    """
+    Tarjetas de una página de resultados ya descargada
+
+    Equivalente offline de page_extraction.extract_search_cards().
+
+    Returns:
+        list de dicts con href y price_text de cada tarjeta
+    """
+    soup = make_soup(html)
+    cards = []
+    for card in soup.select(config['card_selector']):
+        link = card.select_one(config['link_selector'])
+        texts = [
+            text
+            for selector in config['price_selectors']
+            for text in (element.get_text(' ', strip=True) for element in card.select(selector))
+            if text and has_currency(text, config)
+        ]
+        keyword = config.get('prefer_keyword')
+        preferred = next((text for text in texts if keyword and keyword in text.lower()), None)
+        cards.append({
+            'href': link.get('href') if link is not None else None,
+            'price_text': preferred or (texts[0] if texts else None)
+        })
+    return cards
@@ -0,0 +1,104 @@
+"""
+Distribución de latencias observadas y timeouts adaptativos por plataforma
+"""
+import math
+import threading
+from collections import deque
+
+
+def percentile(values, q):
+    """Percentil q (0-1) por el método del rango más cercano (None si no hay valores)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(q * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class LatencyTracker:
+    """
+    Ventana de las últimas latencias de cada operación ('Airbnb:goto', ...)
+
+    Con suficientes muestras, el timeout pasa a ser el percentil alto de la
+    distribución por un factor de holgura, entre un piso y el timeout fijo
+    de la plataforma (que queda como tope). Una página colgada se corta así
+    en segundos en lugar de ocupar un contexto durante minuto y medio, y la
+    celda se reintenta en otro contexto.
+
+    Los timeouts también se registran (con el valor que se cortó): si la
+    plataforma se vuelve más lenta, el percentil sube y los timeouts se
+    relajan solos en lugar de fallar en cadena.
+    """
+
+    def __init__(self, window=200, quantile=0.99, factor=1.5, min_samples=20):
+        """
+        Args:
+            window: cantidad de muestras recientes por operación
+            quantile: percentil usado para el timeout (0-1)
+            factor: holgura multiplicativa sobre el percentil
+            min_samples: muestras necesarias antes de adaptar (antes se usa el tope)
+        """
+        self.window = window
+        self.quantile = quantile
+        self.factor = factor
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, seconds):
+        """Registra la duración de una operación"""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def samples(self, key):
+        with self._lock:
+            return list(self._samples.get(key, ()))
+
+    def timeout_ms(self, key, cap_ms, floor_ms):
+        """
+        Timeout en ms para la próxima operación
+
+        Args:
+            key: operación ('Booking:ready', ...)
+            cap_ms: timeout fijo de la plataforma, usado como tope y mientras
+                no haya min_samples muestras
+            floor_ms: mínimo, para no cortar cargas normales por una ventana optimista
+
+        Returns:
+            int con el timeout en milisegundos
+        """
+        samples = self.samples(key)
+        if len(samples) < self.min_samples:
+            return cap_ms
+        adaptive_ms = int(percentile(samples, self.quantile) * self.factor * 1000)
+        return max(min(adaptive_ms, cap_ms), min(floor_ms, cap_ms))
+
+    def stats(self):
+        """Resumen por operación: count, p50, p90 y p99 en segundos"""
+        with self._lock:
+            snapshot = {key: list(samples) for key, samples in self._samples.items()}
+        return {
+            key: {
+                'count': len(samples),
+                'p50': percentile(samples, 0.5),
+                'p90': percentile(samples, 0.9),
+                'p99': percentile(samples, 0.99)
+            }
+            for key, samples in snapshot.items()
+        }
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_latency_tracker():
+    """Latencias compartidas por todos los scrapers del proceso"""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = LatencyTracker()
+        return _tracker
@@ -0,0 +1,323 @@
+"""
+Control de memoria de Chromium: reciclado de páginas, contextos y navegadores
+
+Con navegadores de larga vida el RSS de Chromium crece carga tras carga. El
+gobernador mide la memoria de cada navegador (proceso principal más sus
+renderers y procesos auxiliares) y decide:
+
+- reciclar la página de un contexto tras max_page_uses cargas
+- retirar un contexto tras max_context_uses cargas, o el más usado cuando el
+  navegador pasa context_rss_mb
+- relanzar el navegador cuando pasa browser_rss_mb o browser_max_loads cargas
+- limitar cuántas cargas corren a la vez para que la suma de todos los
+  navegadores del proceso no supere total_rss_mb
+
+La memoria se lee con psutil si está instalado y, si no, desde /proc (Linux).
+Los umbrales se ajustan en config/memory.json, p.ej.:
+    {"total_rss_mb": 3000, "browser_rss_mb": 1200, "max_concurrency": 2}
+y {"enabled": false} desactiva el gobernador (sin mediciones ni límites).
+"""
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from src.structured_log import get_logger
+
+try:
+    import psutil
+except ImportError:  # opcional: sin psutil se lee /proc
+    psutil = None
+
+
+# Nombres de proceso de Chromium y del headless shell de Playwright
+CHROMIUM_NAMES = ('chrome', 'chromium', 'headless_shell')
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+log = get_logger('memory_governor')
+
+
+def _proc_table():
+    """
+    Procesos del sistema leídos de /proc
+
+    Returns:
+        dict pid → (ppid, nombre, rss en bytes)
+    """
+    table = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+            with open(f'/proc/{entry}/statm', 'r') as f:
+                resident = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            # El proceso terminó mientras se leía
+            continue
+        # El nombre va entre paréntesis y puede contener espacios
+        name = stat[stat.find('(') + 1:stat.rfind(')')]
+        ppid = int(stat[stat.rfind(')') + 2:].split()[1])
+        table[int(entry)] = (ppid, name, resident * _PAGE_SIZE)
+    return table
+
+
+def process_table():
+    """dict pid → (ppid, nombre, rss en bytes), con psutil o desde /proc"""
+    if psutil is None:
+        return _proc_table() if os.path.isdir('/proc') else {}
+    table = {}
+    for proc in psutil.process_iter(['ppid', 'name', 'memory_info']):
+        info = proc.info
+        if info.get('memory_info') is not None:
+            table[proc.pid] = (info['ppid'], info['name'] or '', info['memory_info'].rss)
+    return table
+
+
+def total_memory_mb():
+    """Memoria física total en MB (None si no se puede leer)"""
+    if psutil is not None:
+        return psutil.virtual_memory().total / 2**20
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def is_chromium(name):
+    name = name.lower()
+    return any(marker in name for marker in CHROMIUM_NAMES)
+
+
+def chromium_trees(table, root_pid=None):
+    """
+    RSS de cada navegador Chromium descendiente de root_pid
+
+    Un navegador es un proceso de Chromium cuyo padre no es Chromium (lo lanza
+    el driver de Playwright); su árbol incluye renderers, GPU y utilitarios.
+
+    Returns:
+        dict pid del navegador → RSS del árbol en MB
+    """
+    root_pid = root_pid or os.getpid()
+    children = {}
+    for pid, (ppid, name, rss) in table.items():
+        children.setdefault(ppid, []).append(pid)
+
+    def descendants(pid):
+        stack, found = list(children.get(pid, [])), []
+        while stack:
+            child = stack.pop()
+            found.append(child)
+            stack.extend(children.get(child, []))
+        return found
+
+    trees = {}
+    for pid in descendants(root_pid):
+        ppid, name, rss = table[pid]
+        parent = table.get(ppid)
+        if is_chromium(name) and not (parent and is_chromium(parent[1])):
+            tree = [pid] + descendants(pid)
+            trees[pid] = sum(table[p][2] for p in tree) / 2**20
+    return trees
+
+
+class MemoryGovernor:
+    """
+    Umbrales de reciclado y límite de concurrencia por memoria, compartido
+    por todos los scrapers del proceso
+    """
+
+    def __init__(self, max_page_uses=25, max_context_uses=100, browser_max_loads=400,
+                 context_rss_mb=900, browser_rss_mb=1400, total_rss_mb=None, max_concurrency=4,
+                 sample_interval=5.0):
+        """
+        Args:
+            max_page_uses: cargas antes de reemplazar la página de un contexto
+            max_context_uses: cargas antes de retirar un contexto
+            browser_max_loads: cargas antes de relanzar el navegador
+            context_rss_mb: RSS de un navegador desde el cual se retira su contexto más usado
+            browser_rss_mb: RSS de un navegador desde el cual se relanza
+            total_rss_mb: tope de la suma de todos los navegadores (por defecto
+                la mitad de la memoria física)
+            max_concurrency: cargas simultáneas cuando sobra memoria
+            sample_interval: segundos entre mediciones (las decisiones usan la última)
+
+        Cualquier umbral en None queda desactivado.
+        """
+        self.max_page_uses = max_page_uses
+        self.max_context_uses = max_context_uses
+        self.browser_max_loads = browser_max_loads
+        self.context_rss_mb = context_rss_mb
+        self.browser_rss_mb = browser_rss_mb
+        if total_rss_mb is None:
+            physical = total_memory_mb()
+            total_rss_mb = physical / 2 if physical else None
+        self.total_rss_mb = total_rss_mb
+        self.max_concurrency = max(1, max_concurrency)
+        self.sample_interval = sample_interval
+        self.allowed = self.max_concurrency
+        self.last_sample = {'browsers': {}, 'total_mb': 0.0}
+        self._sampled_at = None
+        self._pids = {}
+        self._active = 0
+        self._launch_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._slots = threading.Condition(self._lock)
+
+    def launch(self, launch_fn):
+        """
+        Lanza un navegador y registra el pid de su proceso principal
+
+        Los lanzamientos se serializan para atribuir el proceso nuevo al
+        navegador correcto cuando varias plataformas arrancan a la vez.
+        """
+        with self._launch_lock:
+            before = set(chromium_trees(process_table()))
+            browser = launch_fn()
+            new = set(chromium_trees(process_table())) - before
+        if len(new) == 1:
+            with self._lock:
+                self._pids[id(browser)] = new.pop()
+        self.invalidate()
+        return browser
+
+    def forget(self, browser):
+        """Deja de seguir un navegador cerrado"""
+        with self._lock:
+            self._pids.pop(id(browser), None)
+        self.invalidate()
+
+    def invalidate(self):
+        """Fuerza una medición nueva en la próxima consulta"""
+        with self._lock:
+            self._sampled_at = None
+
+    def sample(self):
+        """
+        Memoria actual de los navegadores (cacheada sample_interval segundos)
+
+        Returns:
+            dict con browsers (pid → MB), total_mb y allowed (cargas simultáneas permitidas)
+        """
+        with self._lock:
+            if self._sampled_at is not None and time.monotonic() - self._sampled_at < self.sample_interval:
+                return dict(self.last_sample, allowed=self.allowed)
+        trees = chromium_trees(process_table())
+        total = sum(trees.values())
+        with self._slots:
+            self.last_sample = {'browsers': trees, 'total_mb': round(total, 1)}
+            self._sampled_at = time.monotonic()
+            self.allowed = self._allowed(trees, total)
+            # Con más cupo, despertar a los que esperan
+            self._slots.notify_all()
+            return dict(self.last_sample, allowed=self.allowed)
+
+    def _allowed(self, trees, total):
+        """Cargas simultáneas que entran en total_rss_mb según el consumo medio por navegador"""
+        if not self.total_rss_mb or not trees:
+            return self.max_concurrency
+        per_browser = total / len(trees)
+        return max(1, min(self.max_concurrency, int(self.total_rss_mb // per_browser)))
+
+    @contextmanager
+    def slot(self, timeout=1.0):
+        """
+        Reserva un lugar para una carga; espera mientras se supera el límite
+
+        Se vuelve a medir cada timeout segundos, así el cupo se recupera
+        cuando otros navegadores liberan memoria.
+        """
+        self.sample()
+        with self._slots:
+            while self._active >= self.allowed:
+                self._slots.wait(timeout)
+                self._slots.release()
+                try:
+                    self.sample()
+                finally:
+                    self._slots.acquire()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._slots:
+                self._active -= 1
+                self._slots.notify()
+
+    def browser_action(self, browser, loads):
+        """
+        Qué reciclar antes de la próxima carga de un navegador
+
+        Args:
+            browser: navegador lanzado con launch()
+            loads: cargas desde que se lanzó
+
+        Returns:
+            'loads' o 'memory' (relanzar el navegador), 'context' (retirar el
+            contexto más usado) o None
+        """
+        if self.browser_max_loads and loads >= self.browser_max_loads:
+            return 'loads'
+        pid = self._pids.get(id(browser))
+        if pid is None:
+            return None
+        rss = self.sample()['browsers'].get(pid, 0)
+        if self.browser_rss_mb and rss >= self.browser_rss_mb:
+            return 'memory'
+        if self.context_rss_mb and rss >= self.context_rss_mb:
+            return 'context'
+        return None
+
+    def pool_limits(self):
+        """Argumentos de ContextPool para reciclar páginas y contextos por uso"""
+        return {'max_page_uses': self.max_page_uses, 'max_context_uses': self.max_context_uses}
+
+
+def load_memory_config(config_path='config/memory.json'):
+    """
+    Umbrales opcionales del gobernador (argumentos de MemoryGovernor)
+
+    Returns:
+        dict (vacío si no hay configuración), o None si {"enabled": false}
+    """
+    try:
+        if os.path.exists(config_path):
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            if config.get('enabled') is False:
+                return None
+            accepted = inspect.signature(MemoryGovernor).parameters
+            return {key: value for key, value in config.items() if key in accepted}
+    except Exception as e:
+        log.warning(f"⚠️ No se pudo leer {config_path}: {e}")
+    return {}
+
+
+_governor = None
+_governor_loaded = False
+_governor_lock = threading.Lock()
+
+
+def get_memory_governor():
+    """
+    Gobernador de memoria compartido por todo el proceso (umbrales de config/memory.json)
+
+    Returns:
+        MemoryGovernor, o None si está desactivado por configuración
+    """
+    global _governor, _governor_loaded
+    with _governor_lock:
+        if not _governor_loaded:
+            settings = load_memory_config()
+            _governor = MemoryGovernor(**settings) if settings is not None else None
+            _governor_loaded = True
+        return _governor
@@ -0,0 +1,256 @@
+"""
+Métricas del scraping y del almacenamiento en formato Prometheus y JSON
+
+Uso:
+    from src.metrics import get_metrics, serve_metrics
+
+    serve_metrics(9108)              # http://127.0.0.1:9108/metrics y /metrics.json
+    get_metrics().write_snapshot()   # data/metrics.json
+
+Los contadores e histogramas los alimenta el motor de scraping; al exportar
+se suman las estadísticas de la caché de resultados, la caché negativa, la
+memoria de Chromium (ver memory_governor) y las duraciones por fase
+(incluida la E/S del DataManager, ver timing).
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.memory_governor import get_memory_governor
+from src.result_cache import get_result_cache
+from src.structured_log import get_logger
+from src.timing import get_phase_stats
+from src.unavailable_cache import get_unavailable_cache
+
+
+log = get_logger('metrics')
+
+
+# Límites de los histogramas de latencia (segundos)
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 90)
+
+# Nombre → (tipo, descripción) de cada métrica que se exporta
+METRICS = {
+    'scraper_cells_total': ('counter', 'Celdas resueltas por plataforma, resultado (success/unavailable/error) y origen'),
+    'scraper_selector_hits_total': ('counter', 'Extracciones por plataforma y selector o fuente que encontró el precio'),
+    'scraper_page_seconds': ('histogram', 'Duración de la navegación (goto) por plataforma'),
+    'scraper_browser_launches_total': ('counter', 'Navegadores lanzados por plataforma'),
+    'scraper_blocked_total': ('counter', 'Cargas bloqueadas o desafiadas por plataforma'),
+    'scraper_browser_recycles_total': ('counter', 'Navegadores relanzados por memoria o cantidad de cargas'),
+    'scraper_chromium_memory_megabytes': ('gauge', 'RSS de los navegadores Chromium del proceso (con sus renderers)'),
+    'scraper_chromium_concurrency_limit': ('gauge', 'Cargas simultáneas permitidas por el tope de memoria'),
+    'scraper_result_cache_hits_total': ('counter', 'Aciertos de la caché de resultados'),
+    'scraper_result_cache_misses_total': ('counter', 'Fallos de la caché de resultados'),
+    'scraper_result_cache_hit_ratio': ('gauge', 'Proporción de aciertos de la caché de resultados'),
+    'scraper_unavailable_cache_entries': ('gauge', 'Celdas no disponibles recordadas'),
+    'scraper_phase_seconds': ('summary', 'Percentiles de duración por fase (scraping y E/S del DataManager)'),
+}
+
+
+def _escape(value):
+    """Escapa un valor de etiqueta según el formato de texto de Prometheus"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+class MetricsRegistry:
+    """
+    Contadores e histogramas del proceso, seguros entre hilos
+
+    Las series se identifican por nombre y etiquetas (platform, outcome...).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """Suma value al contador name con las etiquetas dadas"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Registra una duración en el histograma name"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram['buckets'][index] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def _collected(self):
+        """
+        Series calculadas al exportar: cachés y duraciones por fase
+
+        Returns:
+            list de (métrica, nombre de la muestra, etiquetas, valor)
+        """
+        series = []
+        result_cache = get_result_cache()
+        if result_cache is not None:
+            cache = result_cache.stats()
+            series += [
+                ('scraper_result_cache_hits_total', 'scraper_result_cache_hits_total', (), cache['hits']),
+                ('scraper_result_cache_misses_total', 'scraper_result_cache_misses_total', (), cache['misses']),
+                ('scraper_result_cache_hit_ratio', 'scraper_result_cache_hit_ratio', (), round(cache['hit_rate'], 4)),
+            ]
+        series.append(('scraper_unavailable_cache_entries', 'scraper_unavailable_cache_entries', (), len(get_unavailable_cache())))
+        governor = get_memory_governor()
+        if governor is not None:
+            memory = governor.sample()
+            series.append(('scraper_chromium_memory_megabytes', 'scraper_chromium_memory_megabytes', (), memory['total_mb']))
+            series.append(('scraper_chromium_concurrency_limit', 'scraper_chromium_concurrency_limit', (), memory['allowed']))
+        for key, stats in sorted(get_phase_stats().stats().items()):
+            for quantile, field in (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99')):
+                series.append(('scraper_phase_seconds', 'scraper_phase_seconds',
+                               (('phase', key), ('quantile', quantile)), round(stats[field], 4)))
+            series.append(('scraper_phase_seconds', 'scraper_phase_seconds_count', (('phase', key),), stats['count']))
+        return series
+
+    def render_prometheus(self):
+        """Exposición en formato de texto de Prometheus (versión 0.0.4)"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, dict(value, buckets=list(value['buckets']))) for key, value in self._histograms.items())
+        samples = {}
+        for (name, labels), value in counters:
+            samples.setdefault(name, []).append(f'{name}{_label_text(labels)} {value}')
+        for (name, labels), histogram in histograms:
+            lines = samples.setdefault(name, [])
+            for bound, count in zip(self.buckets, histogram['buckets']):
+                lines.append(f'{name}_bucket{_label_text(labels + (("le", f"{bound:g}"),))} {count}')
+            lines.append(f'{name}_bucket{_label_text(labels + (("le", "+Inf"),))} {histogram["count"]}')
+            lines.append(f'{name}_sum{_label_text(labels)} {round(histogram["sum"], 4)}')
+            lines.append(f'{name}_count{_label_text(labels)} {histogram["count"]}')
+        for family, name, labels, value in self._collected():
+            samples.setdefault(family, []).append(f'{name}{_label_text(labels)} {value}')
+
+        output = []
+        for name, (metric_type, description) in METRICS.items():
+            if name not in samples:
+                continue
+            output.append(f'# HELP {name} {description}')
+            output.append(f'# TYPE {name} {metric_type}')
+            output.extend(samples[name])
+        return '\n'.join(output) + '\n'
+
+    def snapshot(self):
+        """
+        Estado actual como dict serializable
+
+        Incluye, por plataforma, las tasas de éxito / no disponible / error
+        sobre las celdas resueltas.
+        """
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {'name': name, 'labels': dict(labels), 'buckets': dict(zip((f'{b:g}' for b in self.buckets), value['buckets'])),
+                 'sum': round(value['sum'], 4), 'count': value['count']}
+                for (name, labels), value in sorted(self._histograms.items())
+            ]
+        outcomes = {}
+        for counter in counters:
+            if counter['name'] == 'scraper_cells_total':
+                by_platform = outcomes.setdefault(counter['labels'].get('platform'), {})
+                outcome = counter['labels'].get('outcome')
+                by_platform[outcome] = by_platform.get(outcome, 0) + counter['value']
+        rates = {
+            platform: {outcome: round(count / sum(counts.values()), 4) for outcome, count in counts.items()}
+            for platform, counts in outcomes.items()
+        }
+        return {
+            'started_at': self.started_at,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'counters': counters,
+            'histograms': histograms,
+            'rates': rates,
+            'collected': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for family, name, labels, value in self._collected()
+            ]
+        }
+
+    def write_snapshot(self, path='data/metrics.json'):
+        """Guarda snapshot() en un archivo JSON (escritura atómica)"""
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            log.warning(f"⚠️ No se pudo guardar el snapshot de métricas: {e}")
+            return False
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics():
+    """Registro de métricas compartido por todo el proceso"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def serve_metrics(port=9108, host='127.0.0.1', registry=None):
+    """
+    Sirve las métricas por HTTP en un hilo en segundo plano
+
+    Rutas: /metrics (texto de Prometheus) y /metrics.json (snapshot)
+
+    Returns:
+        ThreadingHTTPServer (llamar a shutdown() para detenerlo)
+    """
+    registry = registry or get_metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/metrics':
+                body, content_type = registry.render_prometheus(), 'text/plain; version=0.0.4; charset=utf-8'
+            elif path == '/metrics.json':
+                body, content_type = json.dumps(registry.snapshot(), ensure_ascii=False), 'application/json; charset=utf-8'
+            else:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,119 @@
+"""
+Extracción de precios dentro del navegador en un único round trip
+
+En lugar de un query_selector_all + inner_text() por elemento y selector,
+un solo page.evaluate() recorre todos los selectores y devuelve el precio
+encontrado o, si no hay, el texto visible para clasificarlo con el
+TextClassifier de la plataforma. Las reglas son las mismas que
+html_parsing.extract_from_html().
+
+SEARCH_RESULTS_SCRIPT hace lo mismo para las páginas de resultados de
+búsqueda: un solo round trip devuelve el enlace y el precio de cada tarjeta.
+"""
+from src.html_parsing import classify_page_text
+
+
+EXTRACTION_SCRIPT = r"""
+(config) => {
+    const NON_VISIBLE = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    const body = document.body;
+
+    const hasCurrency = (text) =>
+        config.currency_markers.some((marker) => text.includes(marker)) &&
+        (!config.require_digit || /\d/.test(text));
+
+    // Soporta selectores CSS y la sintaxis de Playwright 'text=/regex/'
+    const textsFor = (selector) => {
+        if (selector.startsWith('text=/') && selector.endsWith('/')) {
+            const regex = new RegExp(selector.slice(6, -1));
+            const texts = [];
+            if (!body) return texts;
+            const walker = document.createTreeWalker(body, NodeFilter.SHOW_TEXT);
+            while (walker.nextNode()) {
+                const parent = walker.currentNode.parentElement;
+                if (parent && !NON_VISIBLE.has(parent.tagName) && regex.test(walker.currentNode.nodeValue)) {
+                    texts.push(parent.innerText);
+                }
+            }
+            return texts;
+        }
+        return Array.from(document.querySelectorAll(selector), (element) => element.innerText);
+    };
+
+    for (const selector of config.selectors) {
+        let texts;
+        try {
+            texts = textsFor(selector);
+        } catch (e) {
+            continue;
+        }
+        for (const text of texts) {
+            if (text && hasCurrency(text)) {
+                return {price_text: text.trim(), selector: selector};
+            }
+        }
+    }
+
+    // Sin precio en los selectores: devolver el texto para clasificarlo en Python
+    return {price_text: null, selector: null, page_text: body ? body.innerText : ''};
+}
+"""
+
+
+def extract_in_page(page, config, classifier):
+    """
+    Busca el texto del precio en la página abierta con un único page.evaluate()
+
+    Args:
+        page: página de Playwright ya navegada
+        config: dict con selectors, currency_markers y require_digit
+            (serializable a JSON)
+        classifier: TextClassifier de la plataforma para el texto completo
+
+    Returns:
+        dict con price_text, selector, unavailable y challenge
+    """
+    extracted = page.evaluate(EXTRACTION_SCRIPT, config)
+    if extracted.get('price_text'):
+        return {'price_text': extracted['price_text'], 'selector': extracted['selector'], 'unavailable': False, 'challenge': False}
+    return classify_page_text(extracted.get('page_text', ''), classifier)
+
+
+SEARCH_RESULTS_SCRIPT = r"""
+(config) => {
+    const hasCurrency = (text) =>
+        config.currency_markers.some((marker) => text.includes(marker)) &&
+        (!config.require_digit || /\d/.test(text));
+
+    return Array.from(document.querySelectorAll(config.card_selector), (card) => {
+        const link = card.querySelector(config.link_selector);
+        const texts = [];
+        for (const selector of config.price_selectors) {
+            for (const element of card.querySelectorAll(selector)) {
+                const text = (element.innerText || '').trim();
+                if (text && hasCurrency(text)) {
+                    texts.push(text);
+                }
+            }
+        }
+        const keyword = config.prefer_keyword;
+        const preferred = keyword ? texts.find((text) => text.toLowerCase().includes(keyword)) : null;
+        return {href: link ? link.getAttribute('href') : null, price_text: preferred || texts[0] || null};
+    });
+}
+"""
+
+
+def extract_search_cards(page, config):
+    """
+    Tarjetas de una página de resultados de búsqueda en un único page.evaluate()
+
+    Args:
+        page: página de resultados ya navegada
+        config: dict con card_selector, link_selector, price_selectors,
+            currency_markers, require_digit y prefer_keyword
+
+    Returns:
+        list de dicts con href y price_text de cada tarjeta
+    """
+    return page.evaluate(SEARCH_RESULTS_SCRIPT, config)
@@ -0,0 +1,69 @@
+"""
+Consumo concurrente de varios generadores de resultados (uno por plataforma)
+"""
+import contextvars
+import queue
+import threading
+
+
+# Marca de fin de un generador dentro de la cola
+_DONE = object()
+
+
+def iter_parallel(streams):
+    """
+    Recorre varios generadores a la vez, cada uno en su propio hilo
+
+    Cada plataforma apunta a otro host, así que no compiten entre sí: el
+    tiempo total pasa a ser el del generador más lento en lugar de la suma.
+    Los resultados se entregan en el hilo que llama (Streamlit solo puede
+    actualizar la UI desde su propio hilo) a medida que llegan; dentro de
+    cada generador se conserva el orden.
+
+    Args:
+        streams: dict clave → iterable (p.ej. plataforma → scraper.iter_cells())
+
+    Yields:
+        (clave, resultado, None) por cada resultado, o (clave, None, excepción)
+        si un generador falla; el resto sigue ejecutándose
+    """
+    events = queue.Queue()
+    stop = threading.Event()
+
+    def consume(key, stream):
+        try:
+            for result in stream:
+                events.put((key, result, None))
+                if stop.is_set():
+                    break
+        except Exception as e:
+            events.put((key, None, e))
+        finally:
+            # Cerrar desde el mismo hilo que lo ejecutó (Playwright sync no cambia de hilo)
+            close = getattr(stream, 'close', None)
+            if close is not None:
+                close()
+            events.put((key, _DONE, None))
+
+    # Cada hilo corre en una copia del contexto del llamador (run_id de los logs)
+    threads = [
+        threading.Thread(target=contextvars.copy_context().run, args=(consume, key, stream),
+                         name=f'stream-{key}', daemon=True)
+        for key, stream in streams.items()
+    ]
+    for thread in threads:
+        thread.start()
+
+    pending = len(threads)
+    try:
+        while pending:
+            key, result, error = events.get()
+            if result is _DONE:
+                pending -= 1
+                continue
+            yield key, result, error
+    finally:
+        # El llamador cortó antes de tiempo: los hilos terminan tras su celda actual
+        stop.set()
+        for thread in threads:
+            thread.join()
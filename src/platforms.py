@@ -0,0 +1,11 @@
+"""
+Registro de scrapers por clave de plataforma (como en competitors.json)
+"""
+from src.airbnb_scraper import AirbnbScraper
+from src.booking_scraper import BookingScraper
+
+
+SCRAPERS = {
+    'airbnb': AirbnbScraper,
+    'booking': BookingScraper,
+}
@@ -0,0 +1,66 @@
+"""
+Seguimiento de progreso por celda con estimación de tiempo restante (ETA)
+"""
+import time
+
+
+def format_eta(seconds):
+    """Formatea segundos como '1h 02m', '4m 10s' o '35s'"""
+    if seconds is None:
+        return '--'
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressTracker:
+    """
+    Cuenta celdas completadas y notifica a un callback después de cada una
+
+    El callback recibe un dict con done, total, fraction, elapsed,
+    eta_seconds, label y el último resultado obtenido.
+    """
+
+    def __init__(self, total, callback=None):
+        self.total = total
+        self.done = 0
+        self.callback = callback
+        self.started_at = time.monotonic()
+
+    def elapsed(self):
+        """Segundos transcurridos desde el inicio"""
+        return time.monotonic() - self.started_at
+
+    def eta_seconds(self):
+        """Tiempo restante estimado según el ritmo promedio observado"""
+        if self.done == 0:
+            return None
+        remaining = max(self.total - self.done, 0)
+        return self.elapsed() / self.done * remaining
+
+    def snapshot(self, result=None, label=None):
+        """Estado actual del progreso"""
+        return {
+            'done': self.done,
+            'total': self.total,
+            'fraction': min(self.done / self.total, 1.0) if self.total else 1.0,
+            'elapsed': self.elapsed(),
+            'eta_seconds': self.eta_seconds(),
+            'label': label,
+            'result': result
+        }
+
+    def advance(self, result=None, label=None):
+        """Marca una celda como completada y notifica"""
+        self.done += 1
+        if self.callback:
+            self.callback(self.snapshot(result, label))
+
+    def track(self, iterable, label=None):
+        """Envuelve un generador de resultados reportando cada elemento"""
+        for result in iterable:
+            self.advance(result, label)
+            yield result
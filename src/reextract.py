@@ -0,0 +1,147 @@
+"""
+Re-extracción offline de precios a partir de snapshots HTML guardados
+
+Permite corregir selectores y volver a extraer precios de páginas ya
+descargadas sin volver a navegar Airbnb/Booking. El parseo es CPU-bound,
+así que se reparte entre procesos.
+
+Uso:
+    python -m src.reextract --platform airbnb --output data/reextracted.csv
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src import airbnb_scraper, booking_scraper
+from src.data_manager import DataManager
+from src.scraper_engine import UNAVAILABLE_ERROR
+from src.snapshots import SnapshotStore
+
+
+# Parser puro y clave de huéspedes de cada plataforma
+PARSERS = {
+    'Airbnb': (airbnb_scraper.parse_html, 'guests'),
+    'Booking': (booking_scraper.parse_html, 'adults'),
+}
+
+
+def _parse_entry(task):
+    """
+    Re-extrae una entrada del índice (se ejecuta en un proceso del pool)
+
+    Args:
+        task: tupla (raíz del SnapshotStore, registro del índice)
+
+    Returns:
+        dict con el mismo formato que los resultados del scraping en vivo
+    """
+    root, entry = task
+    parse_html, guests_key = PARSERS[entry['platform']]
+    result = {
+        'platform': entry['platform'],
+        'checkin': entry.get('checkin'),
+        'checkout': entry.get('checkout'),
+        'price_usd': None,
+        guests_key: entry.get(guests_key),
+        'scraped_at': entry.get('fetched_at'),
+        'url': entry.get('url'),
+        'property_name': entry.get('property_name'),
+        'snapshot': entry['digest']
+    }
+    try:
+        parsed = parse_html(SnapshotStore(root).get(entry['digest']))
+    except Exception as e:
+        result['error'] = f"Snapshot ilegible: {e}"
+        return result
+
+    result['price_usd'] = parsed['price']
+    if parsed['price'] is None:
+        if parsed['challenge']:
+            result['error'] = 'Desafío anti-bot'
+        elif parsed['unavailable']:
+            result['error'] = UNAVAILABLE_ERROR
+        else:
+            result['error'] = 'No se pudo extraer el precio'
+    return result
+
+
+def reextract(store, platform=None, processes=None):
+    """
+    Vuelve a extraer los precios de todos los snapshots del índice
+
+    Args:
+        store: SnapshotStore con los snapshots
+        platform: 'Airbnb', 'Booking' o None para todas
+        processes: cantidad de procesos (None = uno por CPU)
+
+    Returns:
+        lista de dicts de resultado, en el orden del índice
+    """
+    tasks = [(store.root, entry) for entry in store.iter_index(platform) if entry.get('platform') in PARSERS]
+    if not tasks:
+        return []
+    if processes == 1:
+        return [_parse_entry(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_parse_entry, tasks, chunksize=16))
+
+
+def compare_with_history(results, history):
+    """
+    Compara los precios re-extraídos con el último precio guardado de cada celda
+
+    Args:
+        results: resultados de reextract()
+        history: DataFrame del histórico (DataManager.load_data()) o None
+
+    Returns:
+        dict con cantidades: total, with_price, recovered, changed
+    """
+    summary = {'total': len(results), 'with_price': 0, 'recovered': 0, 'changed': 0}
+    latest = {}
+    if history is not None and not history.empty:
+        history = history.sort_values('scraped_at')
+        for row in history.itertuples(index=False):
+            key = (row.property_name, row.platform, str(row.checkin), str(row.checkout))
+            latest[key] = row.price_usd
+
+    for result in results:
+        if result['price_usd'] is None:
+            continue
+        summary['with_price'] += 1
+        key = (result['property_name'], result['platform'], result['checkin'], result['checkout'])
+        if key not in latest:
+            continue
+        previous = latest[key]
+        if pd.isna(previous):
+            summary['recovered'] += 1
+        elif float(previous) != result['price_usd']:
+            summary['changed'] += 1
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-extraer precios de snapshots HTML sin volver a scrapear")
+    parser.add_argument('--snapshots', default='data/snapshots', help="Directorio del SnapshotStore")
+    parser.add_argument('--platform', choices=['airbnb', 'booking'], help="Limitar a una plataforma")
+    parser.add_argument('--processes', type=int, help="Procesos de parseo (por defecto uno por CPU)")
+    parser.add_argument('--output', default='data/reextracted.csv', help="CSV de salida")
+    args = parser.parse_args(argv)
+
+    platform = args.platform.capitalize() if args.platform else None
+    results = reextract(SnapshotStore(args.snapshots), platform=platform, processes=args.processes)
+    if not results:
+        print("⚠️ No hay snapshots para re-extraer")
+        return
+
+    pd.DataFrame(results).to_csv(args.output, index=False)
+    summary = compare_with_history(results, DataManager().load_data())
+    print(f"✓ Snapshots re-extraídos: {summary['total']} ({summary['with_price']} con precio)")
+    print(f"  → Precios recuperados (antes con error): {summary['recovered']}")
+    print(f"  → Precios distintos al histórico: {summary['changed']}")
+    print(f"✓ Resultados guardados en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
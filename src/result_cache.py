@@ -0,0 +1,147 @@
+"""
+Caché local de resultados por URL con TTL y tamaño acotado
+
+El TTL y el tamaño se ajustan en config/result_cache.json, p.ej.:
+    {"ttl_seconds": 600, "max_entries": 500}
+o con las variables PRICE_MONITOR_RESULT_CACHE_TTL y
+PRICE_MONITOR_RESULT_CACHE_SIZE (tienen prioridad). Un TTL de 0 o
+{"enabled": false} desactiva la caché.
+"""
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.structured_log import get_logger
+
+
+log = get_logger('result_cache')
+
+
+def normalize_url(url):
+    """
+    Clave canónica de una URL de build_url()
+
+    Host en minúsculas, parámetros ordenados y sin fragmento, para que
+    la misma combinación alojamiento/fechas/huéspedes tenga la misma clave.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
+
+
+class ResultCache:
+    """
+    Resultados de scraping recientes, indexados por URL normalizada
+
+    Evita repetir la carga en el navegador cuando dos usuarios o un
+    reintento piden el mismo alojamiento y fechas en pocos minutos. Los
+    resultados se devuelven tal cual se guardaron (con su scraped_at
+    original). Al superar max_entries se descarta el menos usado.
+    """
+
+    def __init__(self, ttl_seconds=900, max_entries=2000):
+        """
+        Args:
+            ttl_seconds: segundos de validez de cada resultado
+            max_entries: cantidad máxima de resultados en memoria
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """Resultado guardado para la URL o None si no hay o venció"""
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, url, result):
+        """Guarda un resultado para la URL"""
+        key = normalize_url(url)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Contadores de aciertos y fallos de la caché"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+def load_cache_config(config_path='config/result_cache.json'):
+    """
+    Parámetros de la caché desde config/result_cache.json y el entorno
+
+    Returns:
+        dict de argumentos de ResultCache, o None si la caché está desactivada
+    """
+    config = {}
+    try:
+        if os.path.exists(config_path):
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+    except Exception as e:
+        log.warning(f"⚠️ No se pudo leer {config_path}: {e}")
+
+    settings = {key: config[key] for key in ('ttl_seconds', 'max_entries') if key in config}
+    for env, key, cast in (('PRICE_MONITOR_RESULT_CACHE_TTL', 'ttl_seconds', float),
+                           ('PRICE_MONITOR_RESULT_CACHE_SIZE', 'max_entries', int)):
+        value = os.environ.get(env)
+        if value:
+            try:
+                settings[key] = cast(value)
+            except ValueError:
+                log.warning(f"⚠️ Valor inválido en {env}: {value}")
+
+    if config.get('enabled') is False or settings.get('ttl_seconds') == 0 or settings.get('max_entries') == 0:
+        return None
+    return settings
+
+
+_cache = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """
+    Caché compartida por todos los scrapers del proceso (y sesiones de Streamlit)
+
+    Returns:
+        ResultCache, o None si está desactivada por configuración
+    """
+    global _cache, _cache_loaded
+    with _cache_lock:
+        if not _cache_loaded:
+            settings = load_cache_config()
+            _cache = ResultCache(**settings) if settings is not None else None
+            _cache_loaded = True
+        return _cache
@@ -0,0 +1,44 @@
+"""
+Presupuesto de tiempo de una ejecución de scraping
+"""
+import time
+
+
+class RunBudget:
+    """
+    Deadline de una ejecución basado en un reloj monótono
+
+    Los scrapers la consultan antes de cada celda y acotan sus timeouts de
+    navegación al tiempo restante, de modo que una página colgada no pueda
+    extender la ejecución más allá del límite.
+    """
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.started_at = time.monotonic()
+
+    def remaining(self):
+        """Segundos restantes (None si no hay límite)"""
+        if self.seconds is None:
+            return None
+        return max(self.seconds - (time.monotonic() - self.started_at), 0.0)
+
+    def exhausted(self):
+        """Indica si el presupuesto ya se consumió"""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def clamp_ms(self, timeout_ms):
+        """Acota un timeout de Playwright (ms) al tiempo restante"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout_ms
+        # Playwright interpreta 0 como "sin timeout": usar al menos 1 ms
+        return max(min(timeout_ms, int(remaining * 1000)), 1)
+
+
+def clamp_timeout(timeout_ms, budget=None):
+    """Timeout efectivo en ms considerando un RunBudget opcional"""
+    if budget is None:
+        return timeout_ms
+    return budget.clamp_ms(timeout_ms)
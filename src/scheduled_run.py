@@ -0,0 +1,171 @@
+"""
+Ejecución programada (cron) de todos los competidores con presupuesto de tiempo
+
+Uso:
+    python -m src.scheduled_run --budget-minutes 50 --days 30 --nights 1 2 --guests 2
+
+Con --search, las propiedades que tienen "area" en competitors.json se
+resuelven desde la página de resultados de búsqueda del área: una carga por
+fecha/huéspedes cubre a todos los competidores que aparecen en ella.
+
+Las celdas se ordenan por prioridad (salteadas en el ciclo anterior, fechas
+más cercanas, competidores más importantes) y la ejecución se detiene al
+agotar el presupuesto. Lo que quedó afuera se registra para el próximo ciclo.
+
+Al terminar se guardan las métricas en data/metrics.json; con
+--metrics-port se sirven además en http://127.0.0.1:<puerto>/metrics
+(formato Prometheus) mientras dura la ejecución.
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from src.data_manager import DataManager
+from src.metrics import get_metrics, serve_metrics
+from src.parallel_streams import iter_parallel
+from src.platforms import SCRAPERS
+from src.run_budget import RunBudget
+from src.scrape_cells import build_cells, prioritize_cells
+from src.structured_log import get_logger, setup_logging
+from src.timing import phase_rows
+
+
+log = get_logger('scheduled_run')
+
+
+def plan_cells(properties, start_date, end_date, nights_list, guests_list, platforms=None):
+    """
+    Genera las celdas de todos los competidores configurados
+
+    Args:
+        properties: lista de propiedades (como en competitors.json)
+        start_date, end_date: rango de check-in
+        nights_list, guests_list: enteros o listas (modo matriz)
+        platforms: subconjunto opcional de plataformas
+
+    Returns:
+        list de celdas con platform, property_name, url, priority y, si la
+        propiedad la define, area (para el modo búsqueda)
+    """
+    cells = []
+    for prop in properties:
+        for platform, url in prop.get('platforms', {}).items():
+            if platform not in SCRAPERS or (platforms and platform not in platforms):
+                continue
+            for cell in build_cells(start_date, end_date, nights_list, guests_list):
+                cell.update(
+                    platform=platform,
+                    property_name=prop['name'],
+                    url=url,
+                    priority=prop.get('priority', 0)
+                )
+                if prop.get('area'):
+                    cell['area'] = prop['area']
+                cells.append(cell)
+    return cells
+
+
+def run_scheduled(properties, start_date, end_date, nights_list, guests_list, budget_seconds=None, data_manager=None, platforms=None, search_mode=False):
+    """
+    Scrapea todos los competidores respetando el presupuesto de tiempo
+
+    Cada plataforma mantiene un navegador abierto durante toda la ejecución
+    en su propio hilo (Playwright sync admite una sola sesión por hilo); cada
+    una recorre sus celdas en el orden global de prioridad. Con search_mode
+    las celdas con área se resuelven desde las páginas de resultados.
+
+    Returns:
+        dict con 'results' (por propiedad), 'completed' y 'skipped' (celdas)
+    """
+    data_manager = data_manager or DataManager()
+    budget = RunBudget(budget_seconds)
+    cells = prioritize_cells(
+        plan_cells(properties, start_date, end_date, nights_list, guests_list, platforms),
+        data_manager.load_skipped_cells().keys()
+    )
+
+    # Un generador por plataforma; celdas con URL inválida se descartan acá
+    # para que cada resultado corresponda a la celda en la misma posición
+    scrapers = {platform: scraper_class() for platform, scraper_class in SCRAPERS.items()}
+    for scraper in scrapers.values():
+        scraper.search_mode = search_mode
+    cells = [cell for cell in cells if scrapers[cell['platform']].extract_listing_id(cell['url'])]
+    streams = {
+        platform: scraper.iter_cells(None, [c for c in cells if c['platform'] == platform], budget=budget)
+        for platform, scraper in scrapers.items()
+    }
+
+    # Cada resultado corresponde a la próxima celda de su plataforma; un
+    # generador que se detiene por el deadline deja el resto como salteado
+    pending = {platform: iter([c for c in cells if c['platform'] == platform]) for platform in streams}
+    results_by_property = {}
+    completed = []
+    for platform, result, error in iter_parallel(streams):
+        if error is not None:
+            log.error(f"Error en {platform}: {error}", platform=platform)
+            continue
+        cell = next(pending[platform])
+        completed.append(cell)
+        results_by_property.setdefault(cell['property_name'], []).append(result)
+
+    completed_keys = {id(cell) for cell in completed}
+    skipped = [cell for cell in cells if id(cell) not in completed_keys]
+
+    for property_name, results in results_by_property.items():
+        data_manager.save_results(results, property_name)
+    data_manager.update_skipped_cells(skipped, completed)
+
+    return {'results': results_by_property, 'completed': completed, 'skipped': skipped}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scraping programado con presupuesto de tiempo")
+    parser.add_argument('--config', default='config/competitors.json')
+    parser.add_argument('--budget-minutes', type=float, help="Tiempo máximo de la ejecución")
+    parser.add_argument('--start', help="Primera fecha de check-in (YYYY-MM-DD, por defecto hoy)")
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--nights', type=int, nargs='+', default=[1])
+    parser.add_argument('--guests', type=int, nargs='+', default=[2])
+    parser.add_argument('--platforms', nargs='+', help="Subconjunto de plataformas (airbnb, booking)")
+    parser.add_argument('--search', action='store_true',
+                        help="Resolver las propiedades con 'area' desde la página de resultados de búsqueda")
+    parser.add_argument('--metrics-port', type=int, help="Servir las métricas por HTTP en este puerto")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+        print(f"📈 Métricas en http://127.0.0.1:{args.metrics_port}/metrics")
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        properties = json.load(f).get('properties', [])
+
+    start = datetime.strptime(args.start, '%Y-%m-%d') if args.start else datetime.now()
+    end = start + timedelta(days=args.days - 1)
+    budget_seconds = args.budget_minutes * 60 if args.budget_minutes else None
+
+    report = run_scheduled(properties, start, end, args.nights, args.guests, budget_seconds,
+                           platforms=args.platforms, search_mode=args.search)
+
+    print(f"\n✓ Celdas scrapeadas: {len(report['completed'])}")
+    if report['skipped']:
+        print(f"⏱️ Celdas salteadas por límite de tiempo: {len(report['skipped'])} (se priorizan en el próximo ciclo)")
+        pending = {}
+        for cell in report['skipped']:
+            key = f"{cell['property_name']} / {cell['platform']}"
+            pending[key] = pending.get(key, 0) + 1
+        for key, count in sorted(pending.items()):
+            print(f"   - {key}: {count}")
+
+    rows = phase_rows()
+    if rows:
+        print("\n⏱️ Tiempos por fase (p50 / p90 / p99, segundos):")
+        for row in rows:
+            print(f"   - {row['operación']}: {row['p50']} / {row['p90']} / {row['p99']} (n={row['n']})")
+
+    if get_metrics().write_snapshot():
+        print("\n📈 Métricas guardadas en data/metrics.json")
+
+
+if __name__ == '__main__':
+    main()
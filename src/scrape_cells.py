@@ -0,0 +1,84 @@
+"""
+Planificación de celdas de scraping (fecha × noches × huéspedes)
+"""
+from datetime import timedelta
+
+
+def as_list(value):
+    """Normaliza un valor escalar o iterable a una lista de enteros sin duplicados"""
+    if isinstance(value, (list, tuple, set)):
+        values = [int(v) for v in value]
+    else:
+        values = [int(value)]
+    # Mantener el orden original eliminando duplicados
+    return list(dict.fromkeys(values))
+
+
+def build_cells(start_date, end_date, nights_list, guests_list):
+    """
+    Genera todas las combinaciones a scrapear para un rango de fechas
+
+    Args:
+        start_date: primera fecha de check-in (datetime)
+        end_date: última fecha de check-in (datetime)
+        nights_list: lista (o entero) de noches por reserva
+        guests_list: lista (o entero) de huéspedes
+
+    Returns:
+        list de dicts con checkin, checkout, nights y guests, ordenados por fecha
+    """
+    nights_list = as_list(nights_list)
+    guests_list = as_list(guests_list)
+
+    cells = []
+    current_date = start_date
+
+    while current_date <= end_date:
+        for nights in nights_list:
+            for guests in guests_list:
+                cells.append({
+                    'checkin': current_date,
+                    'checkout': current_date + timedelta(days=nights),
+                    'nights': nights,
+                    'guests': guests
+                })
+        current_date += timedelta(days=1)
+
+    return cells
+
+
+def cell_key(cell):
+    """Clave estable de una celda (plataforma, propiedad, fecha, noches, huéspedes)"""
+    return '|'.join([
+        str(cell.get('platform', '')),
+        str(cell.get('property_name', '')),
+        cell['checkin'].strftime('%Y-%m-%d'),
+        str(int(cell['nights'])),
+        str(int(cell['guests']))
+    ])
+
+
+def prioritize_cells(cells, carried_over=()):
+    """
+    Ordena las celdas para que un deadline corte primero lo menos importante
+
+    Orden: celdas salteadas en el ciclo anterior, luego las fechas más
+    cercanas y, dentro de una misma fecha, los competidores con mayor
+    'priority' (campo opcional en competitors.json).
+
+    Args:
+        cells: lista de celdas (ver build_cells)
+        carried_over: claves (cell_key) salteadas en la ejecución anterior
+
+    Returns:
+        nueva lista ordenada
+    """
+    carried_over = set(carried_over)
+    return sorted(
+        cells,
+        key=lambda cell: (
+            cell_key(cell) not in carried_over,
+            cell['checkin'],
+            -int(cell.get('priority', 0))
+        )
+    )
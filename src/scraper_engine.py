@@ -0,0 +1,851 @@
+"""
+Motor de scraping común a todas las plataformas
+
+Maneja el ciclo de vida del navegador, el pool de contextos, la navegación
+y las esperas, los reintentos, la pausa entre celdas, la caché, los
+checkpoints y el armado de resultados. Cada plataforma solo define cómo
+construir la URL y cómo extraer el precio.
+"""
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError, sync_playwright
+from contextlib import nullcontext
+from datetime import datetime
+import re
+import time
+from urllib.parse import urljoin
+
+from src.browser_pool import DEFAULT_FINGERPRINT, ContextPool, PageBlockedError, launch_options, load_proxies
+from src.debug_artifacts import get_debug_writer
+from src.embedded_json import JSON_SCRIPTS_SCRIPT, embedded_extraction, json_script_texts
+from src.latency import get_latency_tracker
+from src.memory_governor import get_memory_governor
+from src.metrics import get_metrics
+from src.page_extraction import extract_in_page, extract_search_cards
+from src.result_cache import get_result_cache
+from src.run_budget import clamp_timeout
+from src.scrape_cells import build_cells
+from src.snapshots import snapshot_store_from_env
+from src.storage_state import StorageStateStore
+from src.structured_log import get_logger
+from src.timing import PhaseTimer, record_phases, timed
+from src.unavailable_cache import get_unavailable_cache
+
+
+UNAVAILABLE_ERROR = "Alojamiento no disponible para estas fechas (posiblemente ocupado)"
+
+# Códigos HTTP con los que la plataforma bloquea o limita al cliente
+BLOCKED_STATUSES = (403, 429)
+
+# Flags de Chromium: anti-detección y estabilidad en contenedores
+BROWSER_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox'
+]
+
+# Oculta las marcas más comunes de navegador automatizado
+ANTI_DETECTION_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    window.chrome = {
+        runtime: {}
+    };
+"""
+
+
+class ScraperEngine:
+    """
+    Base de los scrapers de plataformas
+
+    Una plataforma nueva hereda de esta clase, completa los atributos de
+    clase y define extract_listing_id() y build_url(); recibe así el pool de
+    contextos, la caché, los checkpoints, el presupuesto de tiempo y los
+    reintentos sin copiar el pipeline.
+    """
+
+    # Nombre de la plataforma en los resultados ('Airbnb', 'Booking', ...)
+    platform = None
+    base_url = None
+    # Clave del número de huéspedes en los resultados y texto para los logs
+    guests_key = 'guests'
+    guests_label = 'huésped(es)'
+    default_guests = 1
+
+    # Navegación y espera de contenido dinámico; los timeouts fijos son el
+    # tope de los adaptativos y los pisos evitan cortar cargas normales
+    wait_until = 'domcontentloaded'
+    nav_timeout_ms = 60000
+    nav_timeout_floor_ms = 15000
+    settle_seconds = 5
+    ready_selector = None
+    ready_timeout_ms = 10000
+    ready_timeout_floor_ms = 2000
+
+    # Extracción (ver embedded_json, page_extraction y text_classifier)
+    embedded_parser = None
+    extraction_config = None
+    text_classifier = None
+    # Tarjetas de la página de resultados de búsqueda (ver page_extraction)
+    search_config = None
+
+    def __init__(self, base_url=None):
+        """
+        Args:
+            base_url: reemplaza el sitio de la plataforma (p.ej. el sitio local
+                de los benchmarks); por defecto el de la clase
+        """
+        if base_url:
+            self.base_url = base_url.rstrip('/')
+        self.debug_dir = 'debug'
+        # Contextos con distinto fingerprint que rotan dentro de una sesión
+        self.pool_size = 3
+        # Intentos por celda; los reintentos usan otro contexto del pool
+        self.max_attempts = 2
+        # Pausa entre celdas para no saturar el servidor
+        self.cell_delay = 2
+        # HTML crudo de cada página para re-extracción offline; opcional porque
+        # crece sin límite (PRICE_MONITOR_SNAPSHOTS, None = desactivado)
+        self.snapshot_store = snapshot_store_from_env()
+        # Caché de resultados recientes por URL (None = desactivada en
+        # config/result_cache.json); bypass_cache fuerza la carga (los
+        # resultados nuevos igual se guardan)
+        self.result_cache = get_result_cache()
+        self.bypass_cache = False
+        # Celdas que la plataforma reportó ocupadas, persistidas entre ejecuciones
+        # con TTL según la anticipación (también se ignora con bypass_cache)
+        self.unavailable_cache = get_unavailable_cache()
+        # Escritor de artefactos de debug en segundo plano (crea el directorio)
+        self.debug_writer = get_debug_writer(self.debug_dir)
+        # Cookies/localStorage persistidos por plataforma (None = contextos vacíos)
+        self.storage_state = StorageStateStore()
+        # Latencias observadas para timeouts adaptativos (None = timeouts fijos)
+        self.latency = get_latency_tracker()
+        # Grabación/reproducción de sesiones en HAR (ver har_replay; None = red real)
+        self.har = None
+        # Contadores e histogramas exportables (ver metrics; None = desactivado)
+        self.metrics = get_metrics()
+        # Reciclado por memoria/uso y límite de cargas simultáneas (None = sin
+        # control, con {"enabled": false} en config/memory.json)
+        self.memory_governor = get_memory_governor()
+        # Logs estructurados del componente 'scraper.<plataforma>' (ver structured_log)
+        self.log = get_logger(f'scraper.{(self.platform or "engine").lower()}', platform=self.platform)
+        # Modo búsqueda: las celdas con 'area' se resuelven desde una página de
+        # resultados compartida por fecha/huéspedes (requiere search_config)
+        self.search_mode = False
+
+    # ====== Puntos de extensión de cada plataforma ======
+    def extract_listing_id(self, url):
+        """Extrae el identificador del alojamiento de su URL (None si no es válida)"""
+        raise NotImplementedError
+
+    def build_url(self, listing_id, checkin, checkout, guests):
+        """Construye la URL con las fechas especificadas"""
+        raise NotImplementedError
+
+    def build_search_url(self, area, checkin, checkout, guests):
+        """Construye la URL de resultados de búsqueda de un área (solo modo búsqueda)"""
+        raise NotImplementedError
+
+    @staticmethod
+    def parse_price_text(price_text):
+        """Convierte el texto del precio en número (None si no hay dígitos)"""
+        if not price_text:
+            return None
+        match = re.search(r'(\d+)', price_text.replace(',', '').replace('.', ''))
+        return float(match.group(1)) if match else None
+
+    def extract(self, page, html=None, timer=None):
+        """
+        Extrae el precio de una página ya cargada
+
+        Primero intenta con el JSON embebido (si la plataforma define
+        embedded_parser) y si no hay datos recorre el DOM.
+
+        Args:
+            page: página de Playwright ya navegada
+            html: contenido de la página si ya se descargó (evita pedirlo de nuevo)
+            timer: PhaseTimer opcional (fases 'embedded_json' y 'dom_extract')
+
+        Returns:
+            dict con price, price_text, selector, unavailable y challenge
+            (más currency y nightly si vino del JSON embebido)
+        """
+        timer = timer or PhaseTimer()
+        if self.embedded_parser is not None:
+            with timer.phase('embedded_json'):
+                texts = json_script_texts(html) if html is not None else page.evaluate(JSON_SCRIPTS_SCRIPT)
+                embedded = embedded_extraction(texts, self.embedded_parser, self.parse_price_text)
+            if embedded is not None:
+                return embedded
+        with timer.phase('dom_extract'):
+            extracted = extract_in_page(page, self.extraction_config, self.text_classifier)
+        return dict(extracted, price=self.parse_price_text(extracted['price_text']))
+
+    # ====== Navegador ======
+    def _launch_browser(self, p, proxies=None):
+        """Lanza Chromium con flags anti-detección"""
+        self._metric('scraper_browser_launches_total')
+        launch = lambda: p.chromium.launch(headless=True, args=BROWSER_ARGS, **launch_options(proxies))
+        if self.memory_governor is None:
+            return launch()
+        return self.memory_governor.launch(launch)
+
+    def _close_browser(self, browser):
+        browser.close()
+        if self.memory_governor is not None:
+            self.memory_governor.forget(browser)
+
+    def _new_pool(self, browser, proxies):
+        """Pool de contextos tibios, con los límites de uso del gobernador de memoria"""
+        limits = self.memory_governor.pool_limits() if self.memory_governor is not None else {}
+        return ContextPool(browser, self._new_context, size=self.pool_size, proxies=proxies, **limits)
+
+    def _memory_slot(self):
+        """Lugar para una carga dentro del límite de memoria de Chromium"""
+        if self.memory_governor is None:
+            return nullcontext()
+        return self.memory_governor.slot()
+
+    def _govern_memory(self, p, proxies, browser, pool, loads):
+        """
+        Recicla el contexto más usado o relanza el navegador si pasó sus umbrales
+
+        Returns:
+            (browser, pool, cargas del navegador); nuevos si se relanzó
+        """
+        action = self.memory_governor.browser_action(browser, loads) if self.memory_governor is not None else None
+        if action == 'context':
+            used = [ctx for ctx in pool.contexts if ctx.uses]
+            if used:
+                pool.recycle(max(used, key=lambda ctx: ctx.uses))
+                self.memory_governor.invalidate()
+            return browser, pool, loads
+        if action is None:
+            return browser, pool, loads
+
+        self.log.info(f"Reciclando el navegador de {self.platform} ({action}, {loads} cargas)", phase='recycle')
+        self._metric('scraper_browser_recycles_total', reason=action)
+        with timed(f'{self.platform}:recycle'):
+            # Los contextos antes que el navegador (así se escribe el HAR grabado)
+            pool.close()
+            self._close_browser(browser)
+            browser = self._launch_browser(p, proxies)
+            pool = self._new_pool(browser, proxies)
+        return browser, pool, 0
+
+    def _new_context(self, browser, fingerprint=DEFAULT_FINGERPRINT, proxy=None):
+        """Crea un contexto realista con script anti-detección y estado persistido"""
+        with timed(f'{self.platform}:context'):
+            return self._create_context(browser, fingerprint, proxy)
+
+    def _create_context(self, browser, fingerprint, proxy):
+        options = {}
+        if proxy:
+            options['proxy'] = proxy
+        # Arrancar con el estado guardado (consentimientos, idioma, moneda)
+        state_path = self.storage_state.load(self.platform) if self.storage_state is not None else None
+        if state_path:
+            options['storage_state'] = state_path
+        context = browser.new_context(
+            viewport=fingerprint['viewport'],
+            user_agent=fingerprint['user_agent'],
+            locale='es-AR',
+            timezone_id='America/Argentina/Buenos_Aires',
+            **options
+        )
+        context.add_init_script(ANTI_DETECTION_SCRIPT)
+        if self.har is not None:
+            self.har.attach(context, self.platform)
+        return context
+
+    def _new_page(self, browser):
+        """Crea un contexto con el fingerprint por defecto y devuelve una página"""
+        return self._new_context(browser).new_page()
+
+    def _build_result(self, checkin_date, checkout_date, guests, search_url, price=None, error=None,
+                      currency=None, nightly=None):
+        """
+        Construye el dict de resultado de una celda
+
+        currency y nightly (desglose por noche) solo vienen del JSON embebido;
+        nightly no se guarda en el histórico (igual que timings).
+        """
+        result = {
+            'platform': self.platform,
+            'checkin': checkin_date.strftime('%Y-%m-%d'),
+            'checkout': checkout_date.strftime('%Y-%m-%d'),
+            'price_usd': price,
+            self.guests_key: guests,
+            'scraped_at': datetime.now().isoformat(),
+            'url': search_url
+        }
+        if currency:
+            result['currency'] = currency
+        if nightly:
+            result['nightly'] = nightly
+        if error is not None:
+            result['error'] = error
+        return result
+
+    # ====== Una página ======
+    def _navigate(self, page, search_url, budget=None, attempt=1, timer=None):
+        """
+        Navega y espera el contenido dinámico; levanta PageBlockedError si hay bloqueo
+
+        El primer intento usa timeouts derivados de las latencias observadas
+        (ver latency.LatencyTracker) para liberar rápido un contexto colgado;
+        los reintentos usan el timeout fijo, por si la página solo es lenta.
+        """
+        timer = timer or PhaseTimer()
+        self.log.debug(f"Navegando a {self.platform}...", phase='goto', url=search_url)
+        goto_key = f'{self.platform}:goto'
+        timeout_ms = self._timeout_ms(goto_key, self.nav_timeout_ms, self.nav_timeout_floor_ms, attempt)
+        effective_ms = clamp_timeout(timeout_ms, budget)
+        started = time.monotonic()
+        try:
+            with timer.phase('goto'):
+                response = page.goto(search_url, wait_until=self.wait_until, timeout=effective_ms)
+        except PlaywrightTimeoutError:
+            # Muestra censurada: tardó al menos el timeout (salvo que lo haya acotado el presupuesto)
+            if effective_ms == timeout_ms:
+                self._record_latency(goto_key, timeout_ms / 1000)
+            raise
+        self._record_latency(goto_key, time.monotonic() - started)
+        if self.metrics is not None:
+            self.metrics.observe('scraper_page_seconds', time.monotonic() - started, platform=self.platform)
+        if response is not None and response.status in BLOCKED_STATUSES:
+            raise PageBlockedError(f"Bloqueado por {self.platform} (HTTP {response.status})")
+
+        # Esperar un poco más para que cargue contenido dinámico
+        with timer.phase('settle'):
+            time.sleep(self.settle_seconds)
+        if self.ready_selector:
+            ready_key = f'{self.platform}:ready'
+            timeout_ms = self._timeout_ms(ready_key, self.ready_timeout_ms, self.ready_timeout_floor_ms, attempt)
+            started = time.monotonic()
+            try:
+                with timer.phase('ready'):
+                    page.wait_for_selector(self.ready_selector, timeout=clamp_timeout(timeout_ms, budget))
+                self._record_latency(ready_key, time.monotonic() - started)
+            except Exception:
+                # Páginas sin precio (p.ej. no disponibles) no muestran el selector:
+                # esos timeouts no se registran para no inflar la distribución
+                pass
+
+    def _timeout_ms(self, key, cap_ms, floor_ms, attempt=1):
+        """Timeout adaptativo en el primer intento, fijo en los reintentos"""
+        if self.latency is None or attempt > 1:
+            return cap_ms
+        return self.latency.timeout_ms(key, cap_ms, floor_ms)
+
+    def _metric(self, name, value=1, **labels):
+        """Suma a un contador de la plataforma (si hay registro de métricas)"""
+        if self.metrics is not None:
+            self.metrics.inc(name, value, platform=self.platform, **labels)
+
+    def _count_cell(self, result, source):
+        """Cuenta una celda resuelta por resultado (success/unavailable/error) y origen"""
+        if result['price_usd'] is not None:
+            outcome = 'success'
+        elif result.get('error') == UNAVAILABLE_ERROR:
+            outcome = 'unavailable'
+        else:
+            outcome = 'error'
+        self._metric('scraper_cells_total', outcome=outcome, source=source)
+        return result
+
+    def _record_latency(self, key, seconds):
+        if self.latency is not None:
+            self.latency.record(key, seconds)
+
+    def _scrape_page(self, page, search_url, checkin_date, checkout_date, guests, debug=False, property_name='unknown', budget=None, attempt=1, timer=None):
+        """
+        Navega con una página ya abierta y extrae el precio
+
+        Etapa de fetch: navega, guarda el snapshot HTML (si hay un
+        SnapshotStore) y extrae el precio con extract(). Las excepciones de
+        navegación se propagan para que el llamador decida si reintentar con
+        otro contexto. Los timeouts se acotan al tiempo restante del
+        RunBudget, si se indica uno; attempt > 1 usa los timeouts fijos. Las
+        duraciones de cada fase se acumulan en timer (PhaseTimer opcional).
+        """
+        timer = timer or PhaseTimer()
+        self._navigate(page, search_url, budget, attempt, timer)
+
+        if self.snapshot_store is not None:
+            with timer.phase('content'):
+                html = page.content()
+            with timer.phase('snapshot'):
+                self._store_snapshot(html, search_url, checkin_date, checkout_date, guests, property_name)
+        else:
+            html = None
+
+        extracted = self.extract(page, html, timer)
+
+        # Si debug o no encontró precio, guardar info (en segundo plano)
+        if debug or not extracted['price_text']:
+            with timer.phase('debug'):
+                self._save_debug_artifacts(page, html, property_name, checkin_date, forced=debug)
+
+        if extracted['challenge']:
+            raise PageBlockedError(f"Desafío anti-bot de {self.platform}")
+
+        if extracted['price']:
+            self._metric('scraper_selector_hits_total', selector=extracted['selector'] or 'desconocido')
+            self.log.info(
+                f"Precio encontrado: ${extracted['price']} USD (selector: {extracted['selector']})",
+                property=property_name, checkin=checkin_date, phase='extract', price_usd=extracted['price']
+            )
+            return self._build_result(
+                checkin_date, checkout_date, guests, search_url, price=extracted['price'],
+                currency=extracted.get('currency'), nightly=extracted.get('nightly')
+            )
+
+        # Diferenciar entre "no disponible" y "error de scraping"
+        error_message = UNAVAILABLE_ERROR if extracted['unavailable'] else 'No se pudo extraer el precio'
+        self.log.info(error_message, property=property_name, checkin=checkin_date, phase='extract')
+        return self._build_result(checkin_date, checkout_date, guests, search_url, error=error_message)
+
+    def _save_debug_artifacts(self, page, html, property_name, checkin_date, forced=False):
+        """Captura screenshot y HTML y los encola para el escritor en segundo plano"""
+        if not self.debug_writer.should_capture(forced):
+            return
+        # Crear nombre de archivo único: plataforma + propiedad + fecha + timestamp
+        timestamp = datetime.now().strftime("%H%M%S")
+        safe_property_name = re.sub(r'[^\w\s-]', '', property_name).strip().replace(' ', '_')[:30]
+        base_name = f'{self.platform.lower()}_{safe_property_name}_{checkin_date.strftime("%Y%m%d")}_{timestamp}'
+        try:
+            screenshot = page.screenshot()
+            if html is None:
+                html = page.content()
+        except Exception as e:
+            self.log.warning(f"⚠️ No se pudieron capturar artefactos de debug: {e}", property=property_name, checkin=checkin_date, phase='debug')
+            return
+        if self.debug_writer.submit(base_name, html=html, screenshot=screenshot):
+            self.log.debug(f"Debug: {base_name} encolado en {self.debug_dir}", property=property_name, checkin=checkin_date, phase='debug')
+
+    def _store_snapshot(self, html, search_url, checkin_date, checkout_date, guests, property_name):
+        """Guarda el HTML crudo para re-extracción offline (nunca interrumpe el scraping)"""
+        if self.snapshot_store is None:
+            return
+        try:
+            self.snapshot_store.put(
+                html,
+                platform=self.platform,
+                url=search_url,
+                checkin=checkin_date.strftime('%Y-%m-%d'),
+                checkout=checkout_date.strftime('%Y-%m-%d'),
+                property_name=property_name,
+                **{self.guests_key: guests}
+            )
+        except Exception as e:
+            self.log.warning(f"⚠️ No se pudo guardar el snapshot: {e}", property=property_name, checkin=checkin_date, phase='snapshot')
+
+    def scrape_price(self, url, checkin_date, checkout_date, guests=None, debug=False, property_name='unknown'):
+        """
+        Obtiene el precio para una fecha específica con un navegador propio
+
+        Returns:
+            dict con información del precio o None si la URL no es válida
+        """
+        listing_id = self.extract_listing_id(url)
+        if not listing_id:
+            return None
+        if guests is None:
+            guests = self.default_guests
+
+        search_url = self.build_url(listing_id, checkin_date, checkout_date, guests)
+        timer = PhaseTimer()
+
+        try:
+            with self._memory_slot(), sync_playwright() as p:
+                with timer.phase('launch'):
+                    browser = self._launch_browser(p)
+                page = None
+                try:
+                    with timer.phase('context'):
+                        page = self._new_page(browser)
+                    result = self._scrape_page(page, search_url, checkin_date, checkout_date, guests, debug, property_name, timer=timer)
+                finally:
+                    with timer.phase('close'):
+                        # Cerrar el contexto antes que el navegador (así se escribe el HAR grabado)
+                        if page is not None:
+                            page.context.close()
+                        self._close_browser(browser)
+
+        except Exception as e:
+            self.log.warning(f"Error: {str(e)}", property=property_name, checkin=checkin_date)
+            result = self._build_result(checkin_date, checkout_date, guests, search_url, error=str(e))
+        return self._count_cell(self._attach_timings(result, timer), 'page')
+
+    # ====== Muchas celdas ======
+    def iter_matrix(self, url, start_date, end_date, nights_list, guests_list, debug_first=True, property_name='unknown', checkpoint=None, budget=None):
+        """
+        Genera precios para todas las combinaciones fecha × noches × huéspedes
+
+        Todas las celdas comparten un único navegador, por lo que el costo
+        de lanzar Chromium se paga una sola vez por ejecución. Cada
+        resultado se entrega apenas se obtiene, para que la UI o la CLI
+        puedan mostrarlo y persistirlo sin esperar al rango completo.
+
+        Args:
+            url: URL del alojamiento
+            start_date: fecha de inicio (datetime)
+            end_date: fecha de fin (datetime)
+            nights_list: lista (o entero) de noches por reserva
+            guests_list: lista (o entero) de huéspedes
+            debug_first: si True, guarda debug info del primer scraping
+            property_name: nombre de la propiedad (para archivos debug)
+            checkpoint: RunCheckpoint opcional; las celdas ya completadas se
+                omiten y cada resultado nuevo se persiste apenas se obtiene
+            budget: RunBudget opcional con el deadline de la ejecución
+
+        Yields:
+            dict con el precio de cada celda scrapeada en esta llamada
+        """
+        cells = build_cells(start_date, end_date, nights_list, guests_list)
+        return self.iter_cells(url, cells, debug_first, property_name, checkpoint, budget)
+
+    def iter_cells(self, url, cells, debug_first=False, property_name='unknown', checkpoint=None, budget=None):
+        """
+        Genera precios para una lista arbitraria de celdas sobre un solo navegador
+
+        Args:
+            url: URL del alojamiento
+            cells: lista de dicts con checkin, checkout, nights y guests; cada
+                celda puede traer su propia 'url' y 'property_name' para
+                mezclar varios alojamientos de la plataforma en la misma sesión
+            debug_first: si True, guarda debug info del primer scraping
+            property_name: nombre de la propiedad (para archivos debug)
+            checkpoint: RunCheckpoint opcional (ver iter_matrix)
+            budget: RunBudget opcional; al agotarse se dejan de scrapear celdas
+                y las restantes no se entregan (quedan como salteadas)
+
+        Yields:
+            dict con el precio de cada celda, en el mismo orden que cells
+        """
+        planned = []
+        for cell in cells:
+            listing_id = self.extract_listing_id(cell.get('url', url))
+            if listing_id:
+                planned.append((cell, listing_id))
+
+        if checkpoint is not None:
+            planned = [(cell, listing_id) for cell, listing_id in planned if not checkpoint.is_done(self.platform, cell)]
+        if not planned:
+            return
+        scraped = 0
+
+        # Resultados recientes en caché: esas celdas no se vuelven a cargar
+        cached = self._cached_results(planned)
+        if len(cached) == len(planned):
+            for index, (cell, listing_id) in enumerate(planned):
+                if checkpoint is not None:
+                    checkpoint.record(self.platform, cell, cached[index])
+                yield self._count_cell(cached[index], 'cache')
+            return
+
+        try:
+            with sync_playwright() as p:
+                proxies = load_proxies()
+                with timed(f'{self.platform}:launch'):
+                    browser = self._launch_browser(p, proxies)
+                pool = None
+                try:
+                    # Contextos tibios con fingerprints variados; las celdas van al más sano
+                    pool = self._new_pool(browser, proxies)
+                    # Precios por alojamiento de cada página de resultados ya cargada
+                    search_prices = {}
+                    # Cargas del navegador actual (se reinicia al reciclarlo)
+                    loads = 0
+
+                    for index, (cell, listing_id) in enumerate(planned):
+                        if index in cached:
+                            self.log.info(
+                                f"Resultado en caché (scrapeado {cached[index]['scraped_at']})",
+                                property=cell.get('property_name', property_name), checkin=cell['checkin'], phase='cache'
+                            )
+                            scraped += 1
+                            if checkpoint is not None:
+                                checkpoint.record(self.platform, cell, cached[index])
+                            yield self._count_cell(cached[index], 'cache')
+                            continue
+
+                        if budget is not None and budget.exhausted():
+                            self.log.warning(f"Presupuesto de tiempo agotado: quedan {len(planned) - index} celda(s) sin scrapear")
+                            return
+
+                        checkin, checkout, guests = cell['checkin'], cell['checkout'], cell['guests']
+                        search_url = self.build_url(listing_id, checkin, checkout, guests)
+                        browser, pool, loads = self._govern_memory(p, proxies, browser, pool, loads)
+
+                        if self.search_mode and self.search_config and cell.get('area'):
+                            searched = len(search_prices)
+                            with self._memory_slot():
+                                result = self._from_search(pool, cell, listing_id, search_url, search_prices, budget)
+                            # Solo cuenta como carga si hubo que abrir una página de resultados nueva
+                            loads += len(search_prices) - searched
+                            if result is not None:
+                                scraped += 1
+                                if checkpoint is not None:
+                                    checkpoint.record(self.platform, cell, result)
+                                yield result
+                                continue
+
+                        self.log.info(
+                            f"Scrapeando {self.platform}: {checkin.strftime('%Y-%m-%d')} -> {checkout.strftime('%Y-%m-%d')} ({guests} {self.guests_label})",
+                            property=cell.get('property_name', property_name), checkin=checkin
+                        )
+
+                        # Debug solo en el primer scraping si se solicita
+                        debug = debug_first and index == 0
+                        loads += 1
+                        with self._memory_slot():
+                            result = self._scrape_cell(
+                                pool, search_url, checkin, checkout, guests, debug,
+                                cell.get('property_name', property_name), budget
+                            )
+                        if result is None:
+                            # Cortada por el deadline: se reporta como salteada, no como error
+                            self.log.warning("Presupuesto de tiempo agotado durante la carga", checkin=checkin)
+                            return
+                        scraped += 1
+                        if checkpoint is not None:
+                            checkpoint.record(self.platform, cell, result)
+                        yield result
+
+                        # Pequeña pausa para no saturar el servidor
+                        if index < len(planned) - 1:
+                            time.sleep(self.cell_delay)
+                finally:
+                    with timed(f'{self.platform}:close'):
+                        # Cerrar los contextos antes que el navegador (así se escribe el HAR grabado)
+                        if pool is not None:
+                            pool.close()
+                        self._close_browser(browser)
+
+        except Exception as e:
+            # Falla del navegador: registrar error en las celdas restantes
+            self.log.error(f"Error del navegador: {str(e)}", property=property_name, phase='launch')
+            for index, (cell, listing_id) in enumerate(planned[scraped:], start=scraped):
+                if index in cached:
+                    yield cached[index]
+                    continue
+                search_url = self.build_url(listing_id, cell['checkin'], cell['checkout'], cell['guests'])
+                yield self._count_cell(self._build_result(cell['checkin'], cell['checkout'], cell['guests'], search_url, error=str(e)), 'page')
+
+    def _scrape_cell(self, pool, search_url, checkin, checkout, guests, debug, property_name, budget):
+        """
+        Scrapea una celda con reintentos sobre otro contexto del pool
+
+        Un timeout adaptativo corta una carga colgada en el primer intento y
+        la celda se reintenta en otro contexto con el timeout fijo.
+
+        Returns:
+            dict de resultado con 'timings' (segundos por fase, ver timing.PhaseTimer),
+            o None si el presupuesto se agotó durante la carga
+        """
+        timer = PhaseTimer()
+        with timer.phase('total'):
+            result = self._scrape_cell_attempts(pool, search_url, checkin, checkout, guests, debug, property_name, budget, timer)
+        if result is None:
+            return None
+        return self._count_cell(self._attach_timings(result, timer), 'page')
+
+    def _scrape_cell_attempts(self, pool, search_url, checkin, checkout, guests, debug, property_name, budget, timer):
+        result = None
+        for attempt in range(1, self.max_attempts + 1):
+            pooled = pool.acquire()
+            cell_started = time.monotonic()
+            try:
+                result = self._scrape_page(pooled.page, search_url, checkin, checkout, guests, debug, property_name, budget, attempt, timer)
+            except Exception as e:
+                # Contexto bloqueado o página en mal estado: el pool lo reemplaza
+                blocked = isinstance(e, PageBlockedError)
+                if blocked:
+                    self._metric('scraper_blocked_total')
+                with timer.phase('release'):
+                    pool.release(pooled, False, time.monotonic() - cell_started, blocked=blocked, discard=True)
+                if blocked and self.storage_state is not None:
+                    # Las cookies pueden haber quedado marcadas: los próximos contextos arrancan limpios
+                    self.storage_state.discard(self.platform)
+                if budget is not None and budget.exhausted():
+                    return None
+                self.log.warning(
+                    f"Error (intento {attempt}/{self.max_attempts}): {str(e)}",
+                    property=property_name, checkin=checkin, attempt=attempt, blocked=blocked
+                )
+                result = self._build_result(checkin, checkout, guests, search_url, error=str(e))
+                continue
+
+            # Fuera del try: el contexto se libera una sola vez y un error en la
+            # contabilidad posterior no convierte la celda en un fallo de carga
+            ok = result['price_usd'] is not None or result.get('error') == UNAVAILABLE_ERROR
+            if ok:
+                with timer.phase('storage_state'):
+                    self._refresh_storage_state(pooled.context)
+            with timer.phase('release'):
+                pool.release(pooled, ok, time.monotonic() - cell_started)
+            if ok and self.result_cache is not None:
+                self.result_cache.put(search_url, result)
+            if ok:
+                self._remember_availability(search_url, checkin, checkout, guests, result)
+            return result
+        return result
+
+    def _attach_timings(self, result, timer):
+        """Agrega las duraciones por fase al resultado y a las estadísticas de la plataforma"""
+        result['timings'] = timer.as_dict()
+        record_phases(self.platform, result['timings'])
+        return result
+
+    def _from_search(self, pool, cell, listing_id, search_url, search_prices, budget):
+        """
+        Resultado de una celda a partir de la página de resultados de su área
+
+        La página se carga una sola vez por (área, fechas, huéspedes) y sirve a
+        todos los alojamientos configurados que aparezcan en ella.
+
+        Returns:
+            dict de resultado, o None si el alojamiento no figura en la página
+            (la celda se carga entonces individualmente)
+        """
+        checkin, checkout, guests = cell['checkin'], cell['checkout'], cell['guests']
+        key = (cell['area'], checkin, checkout, guests)
+        if key not in search_prices:
+            search_prices[key] = self._scrape_search_page(pool, cell['area'], checkin, checkout, guests, budget)
+        price = search_prices[key].get(listing_id)
+        if not price:
+            return None
+        self.log.info(
+            f"Precio desde la búsqueda de {cell['area']}: ${price} USD",
+            property=cell.get('property_name'), checkin=checkin, phase='search', price_usd=price
+        )
+        result = self._build_result(checkin, checkout, guests, search_url, price=price)
+        if self.result_cache is not None:
+            self.result_cache.put(search_url, result)
+        self._remember_availability(search_url, checkin, checkout, guests, result)
+        return self._count_cell(result, 'search')
+
+    def _scrape_search_page(self, pool, area, checkin, checkout, guests, budget):
+        """
+        Carga una página de resultados y extrae el precio de cada tarjeta
+
+        Returns:
+            dict listing_id → precio (vacío si la carga falla)
+        """
+        with timed(f'{self.platform}:search_page'):
+            return self._load_search_page(pool, area, checkin, checkout, guests, budget)
+
+    def _load_search_page(self, pool, area, checkin, checkout, guests, budget):
+        search_url = self.build_search_url(area, checkin, checkout, guests)
+        self.log.info(
+            f"Buscando en {self.platform}: {area} {checkin.strftime('%Y-%m-%d')} -> {checkout.strftime('%Y-%m-%d')} ({guests} {self.guests_label})",
+            checkin=checkin, phase='search', area=area
+        )
+        pooled = pool.acquire()
+        started = time.monotonic()
+        try:
+            self._navigate(pooled.page, search_url, budget)
+            cards = extract_search_cards(pooled.page, self.search_config)
+        except Exception as e:
+            blocked = isinstance(e, PageBlockedError)
+            pool.release(pooled, False, time.monotonic() - started, blocked=blocked, discard=True)
+            self.log.warning(f"Error en la búsqueda: {str(e)}", checkin=checkin, phase='search', area=area)
+            return {}
+        prices = self.match_search_cards(cards)
+        pool.release(pooled, bool(prices), time.monotonic() - started)
+        self.log.info(f"{len(prices)} alojamiento(s) con precio en la página de resultados", checkin=checkin, phase='search', area=area)
+        return prices
+
+    def match_search_cards(self, cards):
+        """
+        Asocia las tarjetas de resultados a alojamientos por su identificador
+
+        Args:
+            cards: list de dicts con href y price_text (extract_search_cards)
+
+        Returns:
+            dict listing_id → precio; si un alojamiento aparece varias veces
+            gana la primera tarjeta
+        """
+        prices = {}
+        for card in cards:
+            if not card.get('href'):
+                continue
+            listing_id = self.extract_listing_id(urljoin(self.base_url, card['href']))
+            price = self.parse_price_text(card.get('price_text'))
+            if listing_id and price and listing_id not in prices:
+                prices[listing_id] = price
+        return prices
+
+    def _refresh_storage_state(self, context):
+        """Guarda el estado de un contexto sano si el persistido falta o está vencido"""
+        if self.storage_state is not None and self.storage_state.needs_refresh(self.platform):
+            if self.storage_state.save(context, self.platform):
+                self.log.debug(f"Estado del navegador de {self.platform} actualizado", phase='storage_state')
+
+    def _cached_results(self, planned):
+        """Resultados vigentes en la caché o en la caché negativa, por índice de celda planificada"""
+        if self.bypass_cache:
+            return {}
+        cached = {}
+        for index, (cell, listing_id) in enumerate(planned):
+            result = None
+            if self.result_cache is not None:
+                result = self.result_cache.get(self.build_url(listing_id, cell['checkin'], cell['checkout'], cell['guests']))
+            if result is None and self.unavailable_cache is not None:
+                nights = (cell['checkout'] - cell['checkin']).days
+                result = self.unavailable_cache.get(self.platform, listing_id, cell['checkin'], nights, cell['guests'])
+            if result is not None:
+                # Ya está en el histórico: se muestra pero save_results no lo vuelve a guardar
+                result['from_cache'] = True
+                cached[index] = result
+        return cached
+
+    def _remember_availability(self, search_url, checkin, checkout, guests, result):
+        """Registra en la caché negativa una celda no disponible, o la quita si tiene precio"""
+        listing_id = self.extract_listing_id(search_url)
+        if self.unavailable_cache is None or not listing_id:
+            return
+        nights = (checkout - checkin).days
+        if result['price_usd'] is not None:
+            self.unavailable_cache.discard(self.platform, listing_id, checkin, nights, guests)
+        elif result.get('error') == UNAVAILABLE_ERROR:
+            self.unavailable_cache.mark(self.platform, listing_id, checkin, nights, guests, result)
+
+    def scrape_matrix(self, url, start_date, end_date, nights_list, guests_list, debug_first=True, property_name='unknown', checkpoint=None):
+        """
+        Obtiene precios para todas las combinaciones fecha × noches × huéspedes
+
+        Versión que acumula los resultados de iter_matrix() en una lista.
+
+        Returns:
+            list de dicts con precios para cada celda scrapeada en esta llamada
+        """
+        return list(self.iter_matrix(url, start_date, end_date, nights_list, guests_list, debug_first, property_name, checkpoint))
+
+    def iter_date_range(self, url, start_date, end_date, nights=1, guests=None, debug_first=True, property_name='unknown', checkpoint=None):
+        """Versión generadora de scrape_date_range(): entrega cada fecha apenas se scrapea"""
+        if guests is None:
+            guests = self.default_guests
+        return self.iter_matrix(url, start_date, end_date, [nights], [guests], debug_first, property_name, checkpoint)
+
+    def scrape_date_range(self, url, start_date, end_date, nights=1, guests=None, debug_first=True, property_name='unknown'):
+        """
+        Obtiene precios para un rango de fechas
+
+        Args:
+            url: URL del alojamiento
+            start_date: fecha de inicio (datetime)
+            end_date: fecha de fin (datetime)
+            nights: número de noches por reserva
+            guests: número de huéspedes (por defecto el de la plataforma)
+            debug_first: si True, guarda debug info del primer scraping
+            property_name: nombre de la propiedad (para archivos debug)
+
+        Returns:
+            list de dicts con precios para cada fecha
+        """
+        return list(self.iter_date_range(url, start_date, end_date, nights, guests, debug_first, property_name))
@@ -0,0 +1,97 @@
+"""
+Almacén de snapshots HTML comprimidos y direccionados por contenido
+
+Es opcional: los scrapers solo guardan snapshots con la variable
+PRICE_MONITOR_SNAPSHOTS definida ("1" usa data/snapshots; otro valor es el
+directorio a usar).
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class SnapshotStore:
+    """
+    Guarda el HTML crudo de cada página scrapeada para poder re-extraer
+    precios offline cuando cambian los selectores, sin volver a los sitios.
+
+    Estructura:
+        <root>/objects/ab/abcdef....html.gz   HTML gzip, nombre = sha256 del contenido
+        <root>/index.jsonl                     una línea por fetch (metadatos + digest)
+
+    Páginas idénticas se almacenan una sola vez.
+    """
+
+    def __init__(self, root='data/snapshots'):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_path = os.path.join(root, 'index.jsonl')
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f'{digest}.html.gz')
+
+    def put(self, html, **meta):
+        """
+        Guarda un snapshot y registra sus metadatos
+
+        Args:
+            html: contenido de la página
+            **meta: platform, url, checkin, checkout, guests, property_name...
+
+        Returns:
+            digest sha256 del contenido
+        """
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        record = {'digest': digest, 'fetched_at': datetime.now().isoformat(), **meta}
+        with self._lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        return digest
+
+    def get(self, digest):
+        """Devuelve el HTML de un snapshot"""
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def iter_index(self, platform=None):
+        """Itera los registros del índice (opcionalmente de una plataforma)"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if platform is None or record.get('platform') == platform:
+                    yield record
+
+
+def snapshot_store_from_env(default_root='data/snapshots'):
+    """
+    SnapshotStore indicado por PRICE_MONITOR_SNAPSHOTS
+
+    Returns:
+        SnapshotStore, o None si la variable no está definida (o es "0")
+    """
+    value = os.environ.get('PRICE_MONITOR_SNAPSHOTS', '').strip()
+    if value.lower() in ('', '0', 'false', 'no', 'off'):
+        return None
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return SnapshotStore(default_root)
+    return SnapshotStore(value)
@@ -0,0 +1,90 @@
+"""
+Persistencia del storage_state de Playwright (cookies y localStorage) por plataforma
+"""
+import os
+import threading
+import time
+
+from src.structured_log import get_logger
+
+
+log = get_logger('storage_state')
+
+
+class StorageStateStore:
+    """
+    Guarda y reutiliza el estado del navegador de cada plataforma
+
+    Un contexto nuevo arranca "tibio" con las cookies de consentimiento,
+    idioma/moneda y visitas previas, evitando banners, redirecciones y
+    scripts de primera visita. El estado se refresca desde un contexto sano
+    cuando tiene más de max_age_hours y se descarta si la plataforma bloquea
+    a un contexto.
+
+    Estructura: <state_dir>/<plataforma>.json
+    """
+
+    def __init__(self, state_dir='data/storage_state', max_age_hours=12):
+        """
+        Args:
+            state_dir: directorio de los archivos de estado
+            max_age_hours: antigüedad a partir de la cual se refresca el estado
+        """
+        self.state_dir = state_dir
+        self.max_age_seconds = max_age_hours * 3600
+        self._lock = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)
+
+    def path(self, platform):
+        return os.path.join(self.state_dir, f'{platform.lower()}.json')
+
+    def age(self, platform):
+        """Segundos desde el último guardado (None si no hay estado)"""
+        try:
+            return time.time() - os.path.getmtime(self.path(platform))
+        except OSError:
+            return None
+
+    def load(self, platform):
+        """
+        Ruta del estado para new_context(storage_state=...)
+
+        Returns:
+            ruta del archivo, o None si no existe (se usa aunque esté vencido:
+            un estado viejo sigue siendo mejor que uno vacío)
+        """
+        path = self.path(platform)
+        return path if os.path.exists(path) else None
+
+    def needs_refresh(self, platform):
+        """True si no hay estado o superó la antigüedad máxima"""
+        age = self.age(platform)
+        return age is None or age > self.max_age_seconds
+
+    def save(self, context, platform):
+        """
+        Guarda el estado de un contexto (escritura atómica)
+
+        Returns:
+            True si se guardó
+        """
+        path = self.path(platform)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with self._lock:
+            try:
+                context.storage_state(path=tmp_path)
+                os.replace(tmp_path, path)
+                return True
+            except Exception as e:
+                log.warning(f"⚠️ No se pudo guardar el estado del navegador de {platform}: {e}", platform=platform)
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return False
+
+    def discard(self, platform):
+        """Borra el estado (p.ej. tras un bloqueo, por si las cookies quedaron marcadas)"""
+        with self._lock:
+            try:
+                os.remove(self.path(platform))
+            except OSError:
+                pass
@@ -0,0 +1,207 @@
+"""
+Logs estructurados (JSON por línea) sin bloquear los hilos de scraping
+
+Uso:
+    from src.structured_log import get_logger, setup_logging
+
+    setup_logging()                                   # una vez, en el punto de entrada
+    log = get_logger('scraper.airbnb', platform='Airbnb')
+    log.info("Precio encontrado", checkin=checkin, phase='extract', property='Competidor 1')
+
+Los componentes solo encolan el registro (QueueHandler); un hilo aparte
+(QueueListener) lo formatea y lo escribe en la consola y en
+data/logs/price_monitor.jsonl, así la E/S nunca frena una celda. Cada línea
+JSON lleva run_id, property, platform, checkin y phase cuando se conocen.
+
+El run_id vive en un ContextVar: cada sesión de Streamlit (o ejecución
+programada) tiene el suyo, y iter_parallel lo copia a los hilos de scraping.
+
+El nivel se controla por componente con la variable PRICE_MONITOR_LOG:
+    PRICE_MONITOR_LOG="WARNING,scraper.booking=DEBUG,data_manager=INFO"
+(el primer valor sin '=' es el nivel general).
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import uuid
+from datetime import date, datetime
+
+
+LOGGER_NAME = 'price_monitor'
+
+# Campos de contexto que se incluyen en cada línea JSON si están presentes
+CONTEXT_FIELDS = ('run_id', 'property', 'platform', 'checkin', 'phase')
+
+# Argumentos propios de logging.Logger.log (el resto se toma como campo)
+_LOG_KWARGS = ('exc_info', 'stack_info', 'stacklevel', 'extra')
+
+_run_id = contextvars.ContextVar('price_monitor_run_id', default=None)
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def set_run_id(run_id=None):
+    """
+    Fija el identificador de la ejecución que se agrega a cada línea
+
+    Vale para el contexto actual (el hilo que llama y los hilos de
+    iter_parallel que lance después), no para otras sesiones.
+
+    Returns:
+        run_id usado (uno nuevo basado en la hora si no se indica)
+    """
+    run_id = run_id or f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    _run_id.set(run_id)
+    return run_id
+
+
+def get_run_id():
+    """run_id del contexto actual (None si no se fijó)"""
+    return _run_id.get()
+
+
+def _field_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+
+class ContextLogger(logging.LoggerAdapter):
+    """
+    Logger de un componente con campos fijos (p.ej. la plataforma)
+
+    Los argumentos extra de cada llamada (checkin=..., phase=...) se suman a
+    los campos fijos y viajan en record.fields, junto con el run_id del
+    contexto (se toma acá porque el formateo ocurre en el hilo de salida).
+    """
+
+    def process(self, msg, kwargs):
+        fields = dict(self.extra)
+        run_id = _run_id.get()
+        if run_id and 'run_id' not in fields:
+            fields['run_id'] = run_id
+        for key in list(kwargs):
+            if key not in _LOG_KWARGS:
+                fields[key] = _field_value(kwargs.pop(key))
+        kwargs['extra'] = {**kwargs.get('extra', {}), 'fields': fields}
+        return msg, kwargs
+
+
+def get_logger(component, **fields):
+    """
+    Logger de un componente ('scraper.airbnb', 'data_manager', ...)
+
+    Args:
+        component: nombre bajo 'price_monitor' (controla el nivel por componente)
+        **fields: campos fijos de contexto de todas sus líneas
+    """
+    return ContextLogger(logging.getLogger(f'{LOGGER_NAME}.{component}'), fields)
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro: ts, level, component, msg y campos de contexto"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'component': record.name[len(LOGGER_NAME) + 1:] if record.name.startswith(f'{LOGGER_NAME}.') else record.name,
+            'msg': record.getMessage()
+        }
+        fields = dict(getattr(record, 'fields', None) or {})
+        for key in CONTEXT_FIELDS:
+            if fields.get(key) is not None:
+                entry[key] = fields.pop(key)
+        entry.update({key: value for key, value in fields.items() if value is not None})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def parse_levels(spec):
+    """
+    Niveles por componente a partir de 'WARNING,scraper=DEBUG,data_manager=INFO'
+
+    Returns:
+        (nivel general o None, dict componente → nivel)
+    """
+    default, levels = None, {}
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '=' in part:
+            component, level = part.split('=', 1)
+            levels[component.strip()] = level.strip().upper()
+        else:
+            default = part.upper()
+    return default, levels
+
+
+def setup_logging(level='INFO', component_levels=None, json_path='data/logs/price_monitor.jsonl', console=True):
+    """
+    Configura la salida de los logs (idempotente; la app la llama en cada rerun)
+
+    Args:
+        level: nivel general de los componentes
+        component_levels: dict componente → nivel (p.ej. {'scraper': 'DEBUG'})
+        json_path: archivo JSON por línea, rotado a los 10 MB (None = sin archivo)
+        console: si True, el mensaje se muestra también en la consola
+
+    PRICE_MONITOR_LOG tiene prioridad sobre level y component_levels. Si el
+    contexto actual no tiene run_id se le asigna uno nuevo.
+
+    Returns:
+        QueueListener que escribe los registros en segundo plano
+    """
+    global _listener
+    if _run_id.get() is None:
+        set_run_id()
+    env_default, env_levels = parse_levels(os.environ.get('PRICE_MONITOR_LOG'))
+    root = logging.getLogger(LOGGER_NAME)
+    root.setLevel(env_default or level)
+    for component, component_level in {**(component_levels or {}), **env_levels}.items():
+        logging.getLogger(f'{LOGGER_NAME}.{component}').setLevel(component_level)
+
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        # Quitar el QueueHandler de una configuración anterior detenida
+        root.handlers = [h for h in root.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+
+        handlers = []
+        if console:
+            stream = logging.StreamHandler(sys.stdout)
+            stream.setFormatter(logging.Formatter('%(message)s'))
+            handlers.append(stream)
+        if json_path:
+            os.makedirs(os.path.dirname(json_path) or '.', exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                json_path, maxBytes=10 * 1024 * 1024, backupCount=3, encoding='utf-8'
+            )
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+
+        records = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(records))
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        # Vaciar la cola al salir para no perder las últimas líneas
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Escribe los registros pendientes y detiene el hilo de salida"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
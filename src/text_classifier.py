@@ -0,0 +1,77 @@
+"""
+Clasificación del texto de una página: precio, no disponible o desafío anti-bot
+"""
+import re
+
+
+# Textos de páginas de desafío/bloqueo (sin distinguir mayúsculas)
+CHALLENGE_INDICATORS = [
+    'Are you a robot',
+    'Verify you are human',
+    'verify you are a human',
+    'Press & Hold',
+    'unusual traffic',
+    'Pardon Our Interruption',
+    'Access Denied',
+    'Verificá que sos humano',
+    'Verifica que eres humano',
+    'tráfico inusual',
+]
+
+
+class TextClassifier:
+    """
+    Clasifica el texto visible de una página en una sola pasada
+
+    Todos los indicadores y patrones se combinan en una única regex
+    precompilada con grupos con nombre, en lugar de un `in` por indicador y
+    un re.search() por patrón. Se construye una vez por plataforma y se
+    reutiliza en el scraping en vivo y en la re-extracción offline.
+
+    Prioridad: desafío > no disponible > patrones de precio (en el orden de
+    la lista, como antes).
+    """
+
+    def __init__(self, unavailable_indicators=(), price_patterns=(), challenge_indicators=CHALLENGE_INDICATORS):
+        """
+        Args:
+            unavailable_indicators: textos literales de no disponibilidad (distinguen mayúsculas)
+            price_patterns: regex de precio (sin distinguir mayúsculas)
+            challenge_indicators: textos literales de desafío (sin distinguir mayúsculas)
+        """
+        self.price_patterns = list(price_patterns)
+        alternatives = []
+        if challenge_indicators:
+            alternatives.append('(?P<challenge>(?i:' + '|'.join(map(re.escape, challenge_indicators)) + '))')
+        if unavailable_indicators:
+            alternatives.append('(?P<unavailable>' + '|'.join(map(re.escape, unavailable_indicators)) + ')')
+        for index, pattern in enumerate(self.price_patterns):
+            alternatives.append(f'(?P<price{index}>(?i:{pattern}))')
+        self._regex = re.compile('|'.join(alternatives)) if alternatives else None
+
+    def classify(self, text):
+        """
+        Clasifica un texto
+
+        Returns:
+            dict con label ('challenge', 'unavailable', 'price' o None),
+            match (texto encontrado) y pattern (regex de precio usada)
+        """
+        unavailable = None
+        prices = {}
+        if self._regex is not None and text:
+            for match in self._regex.finditer(text):
+                group = match.lastgroup
+                if group == 'challenge':
+                    return {'label': 'challenge', 'match': match.group(), 'pattern': None}
+                if group == 'unavailable':
+                    unavailable = unavailable or match
+                else:
+                    prices.setdefault(int(group[len('price'):]), match)
+
+        if unavailable is not None:
+            return {'label': 'unavailable', 'match': unavailable.group(), 'pattern': None}
+        if prices:
+            index = min(prices)
+            return {'label': 'price', 'match': prices[index].group(), 'pattern': self.price_patterns[index]}
+        return {'label': None, 'match': None, 'pattern': None}
@@ -0,0 +1,211 @@
+"""
+Medición por fases del scraping y de la E/S de datos
+"""
+import threading
+import time
+from datetime import datetime
+from contextlib import ContextDecorator, contextmanager
+
+from src.latency import LatencyTracker
+
+
+class PhaseTimer:
+    """
+    Acumula la duración de cada fase de una celda (reloj monótono)
+
+    Uso:
+        timer = PhaseTimer()
+        with timer.phase('goto'):
+            page.goto(url)
+        timer.as_dict()  # {'goto': 3.214}
+
+    Una fase repetida (p.ej. 'goto' en un reintento) suma sus duraciones.
+    """
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - started)
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def as_dict(self):
+        """Segundos por fase, redondeados a milisegundos"""
+        return {name: round(seconds, 3) for name, seconds in self.phases.items()}
+
+
+class timed(ContextDecorator):
+    """
+    Registra la duración de un bloque o función en las estadísticas de fases
+
+    Sirve como decorador (@timed('DataManager:save_results')) o como
+    context manager (with timed('DataManager:read_csv'): ...).
+
+    Con profile_only=True el bloque solo se mide mientras se perfila un
+    rerun (secciones de la UI y gráficos) y no entra en las estadísticas.
+    """
+
+    def __init__(self, key, profile_only=False):
+        self.key = key
+        self.profile_only = profile_only
+
+    def _recreate_cm(self):
+        # Como decorador, cada llamada usa su propia instancia (hilos y recursión)
+        return timed(self.key, self.profile_only)
+
+    def __enter__(self):
+        self._profile = current_profile()
+        if self._profile is not None:
+            self._profile.enter(self.key)
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.monotonic() - self._started
+        if not self.profile_only:
+            get_phase_stats().record(self.key, seconds)
+        if self._profile is not None:
+            self._profile.exit(self.key, seconds)
+        return False
+
+
+class RerunProfile:
+    """
+    Duraciones de un rerun de Streamlit: funciones de render, llamadas al
+    DataManager y armado de figuras (todo bloque con timed() del hilo del rerun)
+
+    Los bloques anidados se registran con su profundidad; la duración de un
+    bloque incluye la de los que contiene.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._started = time.monotonic()
+        self._depth = 0
+        self._order = []
+        self._entries = {}
+        self.total = None
+
+    def enter(self, key):
+        if key not in self._entries:
+            # Orden y profundidad de la primera aparición: los padres quedan antes que sus hijos
+            self._entries[key] = {'depth': self._depth, 'calls': 0, 'seconds': 0.0}
+            self._order.append(key)
+        self._depth += 1
+
+    def exit(self, key, seconds):
+        self._depth -= 1
+        self._entries[key]['calls'] += 1
+        self._entries[key]['seconds'] += seconds
+
+    def finish(self):
+        self.total = time.monotonic() - self._started
+        return self.total
+
+    def rows(self):
+        """
+        Desglose del rerun en orden de ejecución
+
+        Returns:
+            list de dicts con operación (sangrada por anidamiento), llamadas,
+            ms y % del rerun
+        """
+        total = self.total if self.total is not None else time.monotonic() - self._started
+        return [
+            {
+                'operación': '  ' * self._entries[key]['depth'] + key,
+                'llamadas': self._entries[key]['calls'],
+                'ms': round(self._entries[key]['seconds'] * 1000, 1),
+                '%': round(100 * self._entries[key]['seconds'] / total, 1) if total else 0.0
+            }
+            for key in self._order
+        ]
+
+
+_profiles = threading.local()
+
+
+def current_profile():
+    """RerunProfile activo en este hilo (None si no se está perfilando)"""
+    return getattr(_profiles, 'profile', None)
+
+
+@contextmanager
+def profile_rerun(enabled=True):
+    """
+    Perfila un rerun completo: todo timed() del hilo se acumula en el perfil
+
+    Uso:
+        with profile_rerun(enabled) as profile:
+            render_sidebar()
+            ...
+        if profile: mostrar profile.rows()
+
+    Solo cuenta el hilo que ejecuta el script (los scrapers en otros hilos no).
+    """
+    if not enabled:
+        yield None
+        return
+    profile = RerunProfile()
+    _profiles.profile = profile
+    try:
+        yield profile
+    finally:
+        _profiles.profile = None
+        profile.finish()
+
+
+def record_phases(prefix, phases):
+    """Agrega las fases de una celda a las estadísticas ('<prefix>:<fase>')"""
+    stats = get_phase_stats()
+    for name, seconds in phases.items():
+        stats.record(f'{prefix}:{name}', seconds)
+
+
+def phase_rows(prefix=None):
+    """
+    Tabla de percentiles por fase, para mostrar o exportar
+
+    Args:
+        prefix: filtra por plataforma o componente ('Airbnb', 'DataManager', ...)
+
+    Returns:
+        list de dicts con operación, n, p50, p90 y p99 (segundos), ordenada por clave
+    """
+    rows = []
+    for key, summary in sorted(get_phase_stats().stats().items()):
+        if prefix and not key.startswith(f'{prefix}:'):
+            continue
+        rows.append({
+            'operación': key,
+            'n': summary['count'],
+            'p50': round(summary['p50'], 3),
+            'p90': round(summary['p90'], 3),
+            'p99': round(summary['p99'], 3)
+        })
+    return rows
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_phase_stats():
+    """
+    Duraciones por fase del proceso, para percentiles por plataforma
+
+    Claves '<Plataforma>:<fase>' (p.ej. 'Airbnb:goto') y '<Componente>:<operación>'
+    (p.ej. 'DataManager:save_results'); stats() devuelve count, p50, p90 y p99.
+    """
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = LatencyTracker(window=500)
+        return _stats
@@ -0,0 +1,125 @@
+"""
+Caché negativa persistente de celdas sin disponibilidad
+"""
+import copy
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from src.structured_log import get_logger
+
+
+log = get_logger('unavailable_cache')
+
+
+# TTL según la anticipación del check-in: (días de anticipación máximos, horas de validez).
+# Cerca de la fecha las cancelaciones liberan noches seguido; lejos, un
+# "ocupado" suele ser un bloqueo que dura.
+LEAD_TIME_TTL_HOURS = [
+    (3, 6),
+    (14, 24),
+    (60, 72),
+]
+DEFAULT_TTL_HOURS = 168
+
+
+def _as_date(value):
+    """date de un datetime o date (st.date_input entrega date)"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def ttl_hours_for(checkin, now=None):
+    """Horas de validez de un "no disponible" según los días hasta el check-in"""
+    now = now or datetime.now()
+    lead_days = (_as_date(checkin) - _as_date(now)).days
+    for max_days, hours in LEAD_TIME_TTL_HOURS:
+        if lead_days <= max_days:
+            return hours
+    return DEFAULT_TTL_HOURS
+
+
+class UnavailableCache:
+    """
+    Celdas (alojamiento, check-in, noches, huéspedes) que la plataforma
+    reportó como no disponibles
+
+    En temporada alta gran parte de las celdas están ocupadas; con esta caché
+    las ejecuciones siguientes no gastan una carga de página en ellas hasta
+    que vence el TTL (ver LEAD_TIME_TTL_HOURS). Se guarda el resultado
+    original, que se entrega tal cual (con su scraped_at). Un precio
+    obtenido para la celda la quita de la caché.
+
+    Estructura: <path> JSON {clave: {expires_at, checkin, result}}
+    """
+
+    def __init__(self, path='data/unavailable_cells.json'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    @staticmethod
+    def key(platform, listing_id, checkin, nights, guests):
+        return f"{platform}|{listing_id}|{checkin.strftime('%Y-%m-%d')}|{int(nights)}|{int(guests)}"
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception:
+            pass
+        return {}
+
+    def _save(self):
+        """Escritura atómica, descartando entradas vencidas (llamar con el lock tomado)"""
+        now = time.time()
+        self._entries = {key: entry for key, entry in self._entries.items() if entry['expires_at'] > now}
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            log.warning(f"⚠️ No se pudo guardar la caché de celdas no disponibles: {e}")
+
+    def get(self, platform, listing_id, checkin, nights, guests):
+        """Resultado "no disponible" vigente para la celda, o None"""
+        with self._lock:
+            entry = self._entries.get(self.key(platform, listing_id, checkin, nights, guests))
+            if entry is None or entry['expires_at'] <= time.time():
+                return None
+            return copy.deepcopy(entry['result'])
+
+    def mark(self, platform, listing_id, checkin, nights, guests, result):
+        """Registra una celda no disponible con el TTL de su anticipación"""
+        with self._lock:
+            self._entries[self.key(platform, listing_id, checkin, nights, guests)] = {
+                'expires_at': time.time() + ttl_hours_for(checkin) * 3600,
+                'checkin': checkin.strftime('%Y-%m-%d'),
+                'result': copy.deepcopy(result)
+            }
+            self._save()
+
+    def discard(self, platform, listing_id, checkin, nights, guests):
+        """Quita la celda (p.ej. porque ahora tiene precio)"""
+        with self._lock:
+            if self._entries.pop(self.key(platform, listing_id, checkin, nights, guests), None) is not None:
+                self._save()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_unavailable_cache(path='data/unavailable_cells.json'):
+    """Caché compartida por los scrapers del proceso (una instancia por archivo)"""
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = UnavailableCache(path)
+        return _caches[path]
@@ -6,6 +6,8 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
 
+from src.timing import timed
+
 
 class PriceVisualizer:
     def __init__(self):
@@ -14,6 +16,7 @@ class PriceVisualizer:
             'Booking': '#003580',
         }
     
+    @timed('Plotly:create_price_comparison_chart')
     def create_price_comparison_chart(self, df, property_name=''):
         """
         Crea un gráfico de líneas comparando precios entre plataformas
@@ -75,6 +78,7 @@ class PriceVisualizer:
         
         return fig
     
+    @timed('Plotly:create_price_difference_chart')
     def create_price_difference_chart(self, df, property_name=''):
         """
         Crea un gráfico mostrando la diferencia de precios entre plataformas
@@ -144,6 +148,7 @@ class PriceVisualizer:
         
         return None
     
+    @timed('Plotly:create_summary_table')
     def create_summary_table(self, stats_df):
         """
         Crea una tabla con estadísticas resumidas
@@ -180,6 +185,7 @@ class PriceVisualizer:
         
         return fig
     
+    @timed('Plotly:create_price_distribution')
     def create_price_distribution(self, df, property_name=''):
         """
         Crea un histograma/boxplot de distribución de precios
@@ -0,0 +1,229 @@
+"""
+Cola de trabajo con leasing de celdas para scraping distribuido
+
+Implementación de referencia sobre SQLite: no requiere ningún servicio
+externo. Varios workers (procesos o máquinas que compartan el archivo)
+toman celdas en préstamo con un timeout de visibilidad; si un worker muere
+sin confirmar, la celda vuelve a quedar disponible para otro.
+"""
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+
+from src.scrape_cells import build_cells
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cells (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    property_name TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    url TEXT NOT NULL,
+    checkin TEXT NOT NULL,
+    checkout TEXT NOT NULL,
+    nights INTEGER NOT NULL,
+    guests INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    merged INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_cells_status ON cells (status, lease_expires);
+CREATE INDEX IF NOT EXISTS idx_cells_run ON cells (run_id, status);
+"""
+
+
+def default_worker_id():
+    """Identificador de worker: host + pid"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SQLiteWorkQueue:
+    """
+    Cola de celdas con lease, timeout de visibilidad y confirmación
+
+    Estados de una celda: pending → leased → done | failed. Una celda
+    'leased' cuyo lease venció se considera pendiente otra vez.
+    """
+
+    def __init__(self, db_path='data/work_queue.db', visibility_timeout=600, max_attempts=3):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """Conexión nueva por operación (seguro entre procesos y threads)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def enqueue_run(self, property_name, platform_urls, start_date, end_date, nights_list, guests_list):
+        """
+        Encola todas las celdas de una ejecución
+
+        Args:
+            property_name: nombre de la propiedad
+            platform_urls: dict plataforma → URL (como en competitors.json)
+            start_date, end_date: rango de check-in
+            nights_list, guests_list: enteros o listas (modo matriz)
+
+        Returns:
+            run_id de la ejecución encolada
+        """
+        run_id = uuid.uuid4().hex[:12]
+        cells = build_cells(start_date, end_date, nights_list, guests_list)
+        now = time.time()
+        rows = [
+            (
+                run_id, property_name, platform, url,
+                cell['checkin'].strftime('%Y-%m-%d'), cell['checkout'].strftime('%Y-%m-%d'),
+                cell['nights'], cell['guests'], now
+            )
+            for platform, url in platform_urls.items()
+            for cell in cells
+        ]
+        with closing(self._connect()) as conn:
+            conn.execute('BEGIN')
+            conn.executemany(
+                "INSERT INTO cells (run_id, property_name, platform, url, checkin, checkout, nights, guests, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute('COMMIT')
+        return run_id
+
+    def lease(self, worker_id, limit=5, platform=None):
+        """
+        Toma en préstamo hasta `limit` celdas disponibles
+
+        Se priorizan las fechas más cercanas. Todas las celdas devueltas
+        pertenecen a la misma propiedad y plataforma para que el worker
+        pueda scrapearlas con un solo navegador.
+
+        Returns:
+            list de dicts con los datos de cada celda (incluye 'id')
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # Leases vencidos que ya agotaron sus intentos no se reintentan
+            conn.execute(
+                "UPDATE cells SET status = 'failed', lease_owner = NULL, updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            available = "(status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+            params = [now]
+            if platform:
+                available += " AND platform = ?"
+                params.append(platform)
+
+            first = conn.execute(
+                f"SELECT property_name, platform, url FROM cells WHERE {available} ORDER BY checkin, id LIMIT 1",
+                params
+            ).fetchone()
+            if first is None:
+                conn.execute('COMMIT')
+                return []
+
+            rows = conn.execute(
+                f"SELECT * FROM cells WHERE {available} AND property_name = ? AND platform = ? AND url = ? "
+                "ORDER BY checkin, id LIMIT ?",
+                params + [first['property_name'], first['platform'], first['url'], limit]
+            ).fetchall()
+
+            expires = now + self.visibility_timeout
+            conn.executemany(
+                "UPDATE cells SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                [(worker_id, expires, now, row['id']) for row in rows]
+            )
+            conn.execute('COMMIT')
+            return [dict(row) for row in rows]
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def extend_lease(self, task_ids, worker_id):
+        """Renueva el lease de celdas que el worker todavía está procesando"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "UPDATE cells SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                [(now + self.visibility_timeout, now, task_id, worker_id) for task_id in task_ids]
+            )
+
+    def ack(self, task_id, worker_id, result):
+        """
+        Confirma una celda con su resultado
+
+        Returns:
+            True si el worker todavía tenía el lease; False si venció y otro
+            worker pudo haberla tomado (el resultado se descarta)
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE cells SET status = 'done', result = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result, ensure_ascii=False), time.time(), task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def nack(self, task_id, worker_id):
+        """Devuelve una celda a la cola (o la marca fallida tras max_attempts)"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE cells SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (self.max_attempts, time.time(), task_id, worker_id)
+            )
+
+    def collect_results(self, run_id=None):
+        """
+        Resultados confirmados que aún no se fusionaron en el histórico
+
+        Returns:
+            list de (id, property_name, result dict)
+        """
+        query = "SELECT id, property_name, result FROM cells WHERE status = 'done' AND merged = 0"
+        params = []
+        if run_id:
+            query += " AND run_id = ?"
+            params.append(run_id)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query + " ORDER BY id", params).fetchall()
+        return [(row['id'], row['property_name'], json.loads(row['result'])) for row in rows]
+
+    def mark_merged(self, task_ids):
+        """Marca celdas como ya fusionadas en el histórico"""
+        with closing(self._connect()) as conn:
+            conn.executemany("UPDATE cells SET merged = 1 WHERE id = ?", [(task_id,) for task_id in task_ids])
+
+    def stats(self, run_id=None):
+        """Cantidad de celdas por estado"""
+        query = "SELECT status, COUNT(*) AS n FROM cells"
+        params = []
+        if run_id:
+            query += " WHERE run_id = ?"
+            params.append(run_id)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query + " GROUP BY status", params).fetchall()
+        return {row['status']: row['n'] for row in rows}
@@ -0,0 +1,215 @@
+"""
+Workers y coordinador de scraping distribuido sobre SQLiteWorkQueue
+
+Uso:
+    python -m src.worker enqueue "Cerro Eléctrico" --days 30 --nights 1 2 3 7 --guests 2 4
+    python -m src.worker work --batch 5
+    python -m src.worker merge --wait RUN_ID
+    python -m src.worker status
+
+Los workers pueden correr en cualquier nodo que acceda al mismo archivo de
+cola; el coordinador (merge) fusiona los resultados con DataManager.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from src.data_manager import DataManager
+from src.platforms import SCRAPERS
+from src.scraper_engine import UNAVAILABLE_ERROR
+from src.structured_log import get_logger, setup_logging
+from src.work_queue import SQLiteWorkQueue, default_worker_id
+
+
+log = get_logger('worker')
+
+
+def _task_cell(task):
+    """Convierte una fila de la cola en una celda para los scrapers"""
+    return {
+        'checkin': datetime.strptime(task['checkin'], '%Y-%m-%d'),
+        'checkout': datetime.strptime(task['checkout'], '%Y-%m-%d'),
+        'nights': task['nights'],
+        'guests': task['guests']
+    }
+
+
+def run_worker(queue, worker_id=None, batch_size=5, idle_timeout=0, poll_interval=5):
+    """
+    Toma celdas de la cola, las scrapea y confirma cada resultado
+
+    Solo se confirman las celdas con precio o no disponibles; las que
+    fallaron vuelven a la cola (nack) hasta agotar los intentos de la cola.
+
+    Args:
+        queue: SQLiteWorkQueue compartida
+        worker_id: identificador del worker (por defecto host-pid)
+        batch_size: celdas por lease (comparten un navegador)
+        idle_timeout: segundos sin trabajo antes de salir; None = nunca
+        poll_interval: segundos entre consultas cuando la cola está vacía
+
+    Returns:
+        cantidad de celdas confirmadas
+    """
+    worker_id = worker_id or default_worker_id()
+    scrapers = {}
+    processed = 0
+    idle_since = time.monotonic()
+
+    while True:
+        tasks = queue.lease(worker_id, limit=batch_size)
+        if not tasks:
+            if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        first = tasks[0]
+        pending = list(tasks)
+        log.info(
+            f"[{worker_id}] {len(tasks)} celda(s) de {first['property_name']} en {first['platform']}",
+            run_id=first['run_id'], property=first['property_name'], platform=first['platform'], worker=worker_id
+        )
+
+        try:
+            if first['platform'] not in SCRAPERS:
+                log.warning(f"[{worker_id}] ⚠️ Plataforma desconocida: {first['platform']}", worker=worker_id)
+                continue
+
+            # Un scraper por plataforma para todo el worker (cachés y estado compartidos)
+            if first['platform'] not in scrapers:
+                scrapers[first['platform']] = SCRAPERS[first['platform']]()
+            scraper = scrapers[first['platform']]
+            results = scraper.iter_cells(
+                first['url'],
+                [_task_cell(task) for task in tasks],
+                property_name=first['property_name']
+            )
+            try:
+                for task, result in zip(tasks, results):
+                    if result['price_usd'] is not None or result.get('error') == UNAVAILABLE_ERROR:
+                        queue.ack(task['id'], worker_id, result)
+                        processed += 1
+                    else:
+                        log.warning(
+                            f"[{worker_id}] Celda {task['checkin']} sin precio, vuelve a la cola: {result.get('error')}",
+                            run_id=task['run_id'], checkin=task['checkin'], worker=worker_id
+                        )
+                        queue.nack(task['id'], worker_id)
+                    pending.remove(task)
+                    # Las celdas restantes siguen en proceso: renovar su lease
+                    queue.extend_lease([t['id'] for t in pending], worker_id)
+            finally:
+                results.close()
+        finally:
+            # Lo que no se confirmó vuelve a la cola para otro worker
+            for task in pending:
+                queue.nack(task['id'], worker_id)
+            idle_since = time.monotonic()
+
+    return processed
+
+
+def merge_results(queue, data_manager, run_id=None):
+    """
+    Fusiona en el histórico las celdas confirmadas (una ingesta por propiedad)
+
+    Returns:
+        cantidad de resultados fusionados
+    """
+    by_property = {}
+    for task_id, property_name, result in queue.collect_results(run_id):
+        ids, results = by_property.setdefault(property_name, ([], []))
+        ids.append(task_id)
+        results.append(result)
+
+    merged = 0
+    for property_name, (ids, results) in by_property.items():
+        data_manager.save_results(results, property_name)
+        queue.mark_merged(ids)
+        merged += len(results)
+    return merged
+
+
+def coordinate(queue, data_manager, run_id, poll_interval=30):
+    """Fusiona resultados a medida que llegan hasta que la ejecución termina"""
+    total = 0
+    while True:
+        total += merge_results(queue, data_manager, run_id)
+        stats = queue.stats(run_id)
+        if not stats.get('pending') and not stats.get('leased'):
+            break
+        time.sleep(poll_interval)
+    total += merge_results(queue, data_manager, run_id)
+    return total
+
+
+def _load_property(name, config_path='config/competitors.json'):
+    """Busca una propiedad en la configuración de competidores"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    for prop in config.get('properties', []):
+        if prop['name'] == name:
+            return prop
+    raise SystemExit(f"Propiedad no encontrada en {config_path}: {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scraping distribuido con cola de trabajo local")
+    parser.add_argument('--queue', default='data/work_queue.db', help="Archivo SQLite de la cola")
+    parser.add_argument('--visibility-timeout', type=int, default=600, help="Segundos de lease por celda")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_enqueue = sub.add_parser('enqueue', help="Encolar las celdas de una propiedad")
+    p_enqueue.add_argument('property_name')
+    p_enqueue.add_argument('--start', help="Primera fecha de check-in (YYYY-MM-DD, por defecto hoy)")
+    p_enqueue.add_argument('--days', type=int, default=7)
+    p_enqueue.add_argument('--nights', type=int, nargs='+', default=[1])
+    p_enqueue.add_argument('--guests', type=int, nargs='+', default=[2])
+    p_enqueue.add_argument('--platforms', nargs='+', help="Subconjunto de plataformas (airbnb, booking)")
+
+    p_work = sub.add_parser('work', help="Procesar celdas de la cola")
+    p_work.add_argument('--worker-id')
+    p_work.add_argument('--batch', type=int, default=5)
+    p_work.add_argument('--forever', action='store_true', help="Seguir esperando trabajo con la cola vacía")
+
+    p_merge = sub.add_parser('merge', help="Fusionar resultados en el histórico")
+    p_merge.add_argument('--wait', metavar='RUN_ID', help="Esperar y fusionar hasta que la ejecución termine")
+
+    sub.add_parser('status', help="Estado de la cola")
+
+    args = parser.parse_args(argv)
+    setup_logging()
+    queue = SQLiteWorkQueue(args.queue, visibility_timeout=args.visibility_timeout)
+
+    if args.command == 'enqueue':
+        prop = _load_property(args.property_name)
+        platform_urls = prop.get('platforms', {})
+        if args.platforms:
+            platform_urls = {k: v for k, v in platform_urls.items() if k in args.platforms}
+        start = datetime.strptime(args.start, '%Y-%m-%d') if args.start else datetime.now()
+        end = start + timedelta(days=args.days - 1)
+        run_id = queue.enqueue_run(prop['name'], platform_urls, start, end, args.nights, args.guests)
+        print(f"✓ Ejecución encolada: {run_id} ({queue.stats(run_id).get('pending', 0)} celdas)")
+    elif args.command == 'work':
+        processed = run_worker(
+            queue,
+            worker_id=args.worker_id,
+            batch_size=args.batch,
+            idle_timeout=None if args.forever else 0
+        )
+        print(f"✓ Celdas procesadas: {processed}")
+    elif args.command == 'merge':
+        data_manager = DataManager()
+        if args.wait:
+            merged = coordinate(queue, data_manager, args.wait)
+        else:
+            merged = merge_results(queue, data_manager)
+        print(f"✓ Resultados fusionados: {merged}")
+    else:
+        print(json.dumps(queue.stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.airbnb_scraper import AirbnbScraper
 from src.booking_scraper import BookingScraper
+from src.structured_log import setup_logging
 
 
 def test_single_scraping():
@@ -64,4 +65,6 @@ def test_single_scraping():
 
 
 if __name__ == '__main__':
+    # Sin esto los scrapers solo encolan sus logs y no se ve el progreso
+    setup_logging(level='DEBUG')
     test_single_scraping()
@@ -3,6 +3,7 @@ Test básico para verificar que los módulos funcionan correctamente
 """
 import sys
 import os
+import json
 from datetime import datetime
 
 # Agregar src al path
@@ -12,6 +13,8 @@ from src.airbnb_scraper import AirbnbScraper
 from src.booking_scraper import BookingScraper
 from src.data_manager import DataManager
 from src.visualizer import PriceVisualizer
+from src.scrape_cells import build_cells
+from src.progress import ProgressTracker
 
 
 def test_airbnb_scraper():
@@ -80,6 +83,78 @@ def test_visualizer():
     print("✓ Test Visualizer - inicialización: PASÓ")
 
 
+def test_build_cells():
+    """Test de la matriz de celdas fecha × noches × huéspedes"""
+    start = datetime(2025, 11, 10)
+    end = datetime(2025, 11, 12)
+    cells = build_cells(start, end, [1, 7], [2, 4])
+    
+    assert len(cells) == 3 * 2 * 2, f"Expected 12 cells, got {len(cells)}"
+    assert cells[0]['checkin'] == start, "La primera celda debe ser la fecha de inicio"
+    assert cells[1]['checkout'] == datetime(2025, 11, 11), "Checkout = checkin + noches"
+    assert build_cells(start, end, 2, 2) == build_cells(start, end, [2], [2]), "Acepta enteros o listas"
+    print("✓ Test Scrape cells - matriz: PASÓ")
+
+
+def test_checkpoint_resume():
+    """Test de reanudación de una ejecución interrumpida"""
+    dm = DataManager(data_dir='test_data')
+    cells = build_cells(datetime(2025, 11, 10), datetime(2025, 11, 12), [1], [2])
+    
+    checkpoint = dm.open_checkpoint('Test', cells[0]['checkin'], cells[-1]['checkin'], [1], [2], ['airbnb'])
+    checkpoint.record('Airbnb', cells[0], {'checkin': '2025-11-10', 'price_usd': 100.0})
+    
+    # Simular un rerun con la misma configuración
+    resumed = dm.open_checkpoint('Test', cells[0]['checkin'], cells[-1]['checkin'], [1], [2], ['airbnb'])
+    assert resumed.resumed, "Debe detectar la ejecución previa"
+    assert resumed.pending('Airbnb', cells) == cells[1:], "Debe retomar desde la primera celda incompleta"
+    assert len(resumed.results()) == 1, "Debe conservar los resultados previos"
+    
+    resumed.finish()
+    assert not os.path.exists(resumed.run_dir), "finish() debe limpiar el checkpoint"
+    print("✓ Test Checkpoint - reanudación: PASÓ")
+    
+    import shutil
+    shutil.rmtree('test_data', ignore_errors=True)
+
+
+def test_checkpoint_expires():
+    """Un checkpoint más viejo que max_age_hours no se reanuda"""
+    dm = DataManager(data_dir='test_data')
+    cells = build_cells(datetime(2025, 11, 10), datetime(2025, 11, 12), [1], [2])
+
+    checkpoint = dm.open_checkpoint('Test', cells[0]['checkin'], cells[-1]['checkin'], [1], [2], ['airbnb'])
+    checkpoint.record('Airbnb', cells[0], {'checkin': '2025-11-10', 'price_usd': 100.0})
+    checkpoint.manifest['created_at'] = '2025-01-01T00:00:00'
+    checkpoint._save_manifest()
+    with open(checkpoint.manifest_path, 'r', encoding='utf-8') as f:
+        assert json.load(f)['created_at'] == '2025-01-01T00:00:00', "El manifiesto guarda la fecha de creación"
+
+    stale = dm.open_checkpoint('Test', cells[0]['checkin'], cells[-1]['checkin'], [1], [2], ['airbnb'])
+    assert not stale.resumed, "Un checkpoint vencido no debe reanudarse"
+    assert stale.pending('Airbnb', cells) == cells, "Todas las celdas vuelven a estar pendientes"
+    assert stale.results() == [], "Los resultados viejos se descartan"
+    assert stale.manifest['created_at'] > '2025-01-01T00:00:00', "El checkpoint nuevo tiene su propia fecha"
+    print("✓ Test Checkpoint - vencimiento: PASÓ")
+
+    import shutil
+    shutil.rmtree('test_data', ignore_errors=True)
+
+
+def test_progress_tracker():
+    """Test del progreso por celda con ETA"""
+    states = []
+    tracker = ProgressTracker(4, callback=states.append)
+    
+    streamed = list(tracker.track(iter([{'price_usd': 1}, {'price_usd': 2}]), label='Airbnb'))
+    
+    assert len(streamed) == 2, "Debe entregar todos los resultados"
+    assert [s['done'] for s in states] == [1, 2], "Debe notificar después de cada celda"
+    assert states[-1]['fraction'] == 0.5, "Fracción incorrecta"
+    assert states[-1]['eta_seconds'] is not None, "Debe estimar el tiempo restante"
+    print("✓ Test Progress - callback por celda: PASÓ")
+
+
 def run_all_tests():
     """Ejecutar todos los tests"""
     print("\n🧪 Ejecutando tests...\n")
@@ -90,6 +165,10 @@ def run_all_tests():
         test_booking_scraper()
         test_data_manager()
         test_visualizer()
+        test_build_cells()
+        test_checkpoint_resume()
+        test_checkpoint_expires()
+        test_progress_tracker()
         
         print("=" * 50)
         print("\n✅ Todos los tests pasaron correctamente!\n")
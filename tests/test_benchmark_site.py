@@ -0,0 +1,75 @@
+"""
+Test del sitio local de benchmarks (latencia, fallas y disponibilidad)
+"""
+import sys
+import os
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.run import compare_with_baseline, summarize, unexpected_errors
+from benchmarks.standin_site import StandInSite
+from src.airbnb_scraper import AirbnbScraper, parse_html as parse_airbnb
+from src.booking_scraper import BookingScraper, parse_html as parse_booking
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read().decode('utf-8')
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def test_site_serves_listing_pages_for_scraper_urls():
+    """Las URLs de build_url() con base_url local devuelven páginas extraíbles"""
+    with StandInSite() as site:
+        airbnb = AirbnbScraper(base_url=site.base_url)
+        booking = BookingScraper(base_url=site.base_url)
+        checkin, checkout = datetime(2025, 12, 1), datetime(2025, 12, 3)
+
+        status, html = _get(airbnb.build_url('1000001', checkin, checkout, 2))
+        assert status == 200 and parse_airbnb(html)['price'] == 265.0, "Página de Airbnb con precio"
+        status, html = _get(booking.build_url('hosteria-de-prueba', checkin, checkout, 2))
+        assert status == 200 and parse_booking(html)['price'] == 310.0, "Página de Booking con precio"
+        assert _get(site.base_url + '/otra')[0] == 404, "Rutas desconocidas dan 404"
+        assert site.requests == 3, "Cuenta los pedidos"
+    print("✓ Test Sitio de benchmarks - páginas por plataforma: PASÓ")
+
+
+def test_site_failure_and_unavailable_injection():
+    """Fallas con semilla fija y celdas no disponibles determinísticas"""
+    with StandInSite(failure_rate=1.0, failure_mode='blocked') as site:
+        assert _get(site.base_url + '/rooms/1')[0] == 429, "Modo 'blocked' responde 429"
+    with StandInSite(unavailable_rate=1.0) as site:
+        status, html = _get(site.base_url + '/rooms/1?check_in=2025-12-01')
+        assert status == 200 and parse_airbnb(html)['unavailable'], "Debe mostrar la página de no disponible"
+    print("✓ Test Sitio de benchmarks - inyección de fallas: PASÓ")
+
+
+def test_summary_and_regression_check():
+    """Métricas por modo y detección de caída de throughput"""
+    results = [{'price_usd': 100.0, 'timings': {'total': 1.0}}, {'price_usd': None, 'timings': {'goto': 2.0, 'close': 1.0}}]
+    usage = {'cpu': 1.0, 'rss_mb': 50.0, 'children_rss_mb': 200.0}
+    row = summarize('pooled', results, 2.0, usage, dict(usage, cpu=2.5))
+    assert row['cells_per_s'] == 0.5 and row['errors'] == 1 and row['cpu_s'] == 1.5, f"Resumen: {row}"
+    assert row['p95_s'] == 3.0, "p95 a partir de los timings de cada celda"
+
+    baseline = {'modes': [dict(row, cells_per_s=1.0)]}
+    assert compare_with_baseline({'modes': [row]}, baseline, 0.2) == [('pooled', 1.0, 0.5)], "Debe detectar la regresión"
+    assert compare_with_baseline({'modes': [row]}, baseline, 0.6) == [], "Dentro de la tolerancia"
+
+    failing = summarize('pooled', [{'price_usd': None, 'error': 'sin navegador', 'timings': {}}] * 4, 1.0, usage, usage)
+    assert failing['cells_per_s'] == 0.0, "Celdas fallidas no cuentan como throughput"
+    assert unexpected_errors({'config': {}, 'modes': [failing]}) == [('pooled', 4)], "Errores sin fallas inyectadas"
+    assert unexpected_errors({'config': {'failure_rate': 0.3}, 'modes': [failing]}) == [], "Errores pedidos con --failure-rate"
+    print("✓ Test Sitio de benchmarks - resumen y regresiones: PASÓ")
+
+
+if __name__ == '__main__':
+    test_site_serves_listing_pages_for_scraper_urls()
+    test_site_failure_and_unavailable_injection()
+    test_summary_and_regression_check()
@@ -0,0 +1,67 @@
+"""
+Test del pool de contextos con health scoring
+"""
+import sys
+import os
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.browser_pool import FINGERPRINTS, ContextPool
+
+
+class FakeContext:
+    """Contexto falso de Playwright"""
+
+    def __init__(self, fingerprint, proxy):
+        self.fingerprint = fingerprint
+        self.proxy = proxy
+        self.closed = False
+
+    def new_page(self):
+        return object()
+
+    def close(self):
+        self.closed = True
+
+
+def fake_factory(browser, fingerprint, proxy):
+    return FakeContext(fingerprint, proxy)
+
+
+def test_pool_rotates_fingerprints():
+    """Los contextos del pool usan fingerprints y proxies distintos"""
+    proxies = [{'server': 'http://proxy-a:8080'}, {'server': 'http://proxy-b:8080'}]
+    pool = ContextPool(None, fake_factory, size=3, proxies=proxies)
+
+    user_agents = {ctx.fingerprint['user_agent'] for ctx in pool.contexts}
+    assert len(user_agents) == 3, "Cada contexto debe tener su propio fingerprint"
+    assert pool.contexts[0].proxy != pool.contexts[1].proxy, "Los proxies deben rotar"
+    print("✓ Test Browser pool - rotación de fingerprints: PASÓ")
+
+
+def test_pool_routes_to_healthy_and_retires_blocked():
+    """Las celdas van al contexto más sano y los bloqueados se reemplazan"""
+    pool = ContextPool(None, fake_factory, size=2, fingerprints=FINGERPRINTS[:2])
+    good, bad = pool.contexts
+
+    pool.release(good, ok=True, latency=5)
+    pool.release(bad, ok=False, latency=30)
+    assert pool.acquire() is good, "Debe elegir el contexto con mejor puntaje"
+
+    pool.release(bad, ok=False, latency=30, blocked=True)
+    assert bad.context.closed, "El contexto bloqueado debe cerrarse"
+    assert bad not in pool.contexts and len(pool.contexts) == 2, "Debe reemplazarse sin achicar el pool"
+    assert pool.retired == 1, "Debe contabilizar el retiro"
+
+    # Un contexto que falla sistemáticamente se retira al evaluar su puntaje
+    flaky = pool.contexts[1]
+    for _ in range(3):
+        pool.release(flaky, ok=False, latency=10)
+    assert flaky not in pool.contexts, "Un contexto con mal puntaje debe retirarse"
+    print("✓ Test Browser pool - health scoring: PASÓ")
+
+
+if __name__ == '__main__':
+    test_pool_rotates_fingerprints()
+    test_pool_routes_to_healthy_and_retires_blocked()
@@ -0,0 +1,42 @@
+"""
+Test del escritor asíncrono de artefactos de debug
+"""
+import sys
+import os
+import gzip
+import shutil
+import tempfile
+import time
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.debug_artifacts import DebugArtifactWriter
+
+
+def test_writer_compresses_and_caps_directory():
+    """El HTML se comprime y el directorio no supera el máximo de archivos"""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        writer = DebugArtifactWriter(tmp_dir, max_files=4, failure_sample_rate=0)
+        for i in range(5):
+            assert writer.submit(f'page_{i}', html=f'<html>{i}</html>', screenshot=b'png'), "Debe encolar"
+            writer.flush()
+            time.sleep(0.01)  # mtimes distintos para el orden de borrado
+
+        files = sorted(os.listdir(tmp_dir))
+        assert len(files) == 4, f"Debe conservar solo 4 archivos: {files}"
+        assert 'page_4.html.gz' in files and 'page_0.png' not in files, "Debe borrar los más viejos"
+        with gzip.open(os.path.join(tmp_dir, 'page_4.html.gz'), 'rb') as f:
+            assert f.read() == b'<html>4</html>', "El HTML debe guardarse comprimido e intacto"
+
+        assert writer.should_capture(forced=True), "Con debug explícito siempre se captura"
+        assert not writer.should_capture(), "Con muestreo 0 las fallas no se capturan"
+        assert writer.sampled_out == 1, "Debe contabilizar lo descartado por muestreo"
+        print("✓ Test Debug artifacts - compresión y límite: PASÓ")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    test_writer_compresses_and_caps_directory()
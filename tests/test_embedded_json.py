@@ -0,0 +1,89 @@
+"""
+Test de la extracción desde el JSON embebido en las páginas
+"""
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import airbnb_scraper, booking_scraper
+from src.data_manager import DataManager
+
+
+def _page(state, visible=''):
+    return (
+        '<html><head><script id="data-deferred-state-0" type="application/json">'
+        f'{json.dumps(state)}</script></head><body>{visible}</body></html>'
+    )
+
+
+AIRBNB_STATE = {
+    'niobeMinimalClientData': [['StaysPdpSections', {'data': {'sections': [{
+        'structuredDisplayPrice': {
+            'primaryLine': {'price': '$ 120 USD'},
+            'explanationData': {'priceDetails': [{'items': [
+                {'description': '$ 100 USD x 2 noches', 'priceString': '$ 200 USD'},
+                {'description': 'Tarifa de limpieza', 'priceString': '$ 30 USD'},
+                {'description': 'Total', 'priceString': '$ 230 USD'},
+            ]}]}
+        }
+    }]}}]]
+}
+
+BOOKING_STATE = {
+    'ROOT_QUERY': {'availability': {'priceDisplayInfoIrene': {'displayPrice': {
+        'amountPerStay': {'amountUnformatted': 250.5, 'amountRounded': 'US$ 251', 'currency': 'USD'},
+        'amountPerNight': {'amountRounded': 'US$ 125'}
+    }}}}
+}
+
+
+def test_airbnb_embedded_total_and_breakdown():
+    """El total y el desglose salen del JSON, sin recorrer el DOM"""
+    parsed = airbnb_scraper.parse_html(_page(AIRBNB_STATE, visible='<span aria-hidden="true">$ 999 USD</span>'))
+    assert parsed['price'] == 230.0, f"Debe tomar la línea Total del desglose: {parsed}"
+    assert parsed['selector'] == 'json:structuredDisplayPrice', "Debe venir del JSON embebido"
+    assert parsed['currency'] == 'USD' and len(parsed['nightly']) == 2, "Moneda y desglose por noche"
+    print("✓ Test JSON embebido - Airbnb: PASÓ")
+
+
+def test_booking_embedded_and_fallbacks():
+    """Booking usa el monto sin formato; otra moneda o JSON vacío caen al DOM"""
+    parsed = booking_scraper.parse_html(_page(BOOKING_STATE))
+    assert parsed['price'] == 250.5 and parsed['nightly'][0]['price_text'] == 'US$ 125', f"Precio de Booking: {parsed}"
+
+    ars_state = json.loads(json.dumps(BOOKING_STATE).replace('"USD"', '"ARS"'))
+    parsed = booking_scraper.parse_html(_page(ars_state, visible='<span>Precio total: US$ 300</span>'))
+    assert parsed['price'] == 300.0, "Con otra moneda debe usar la extracción por DOM"
+
+    parsed = booking_scraper.parse_html(_page({'soldOut': True}))
+    assert parsed['unavailable'] and parsed['price'] is None, "Agotado según el store embebido"
+    print("✓ Test JSON embebido - Booking y fallbacks: PASÓ")
+
+
+def test_currency_and_breakdown_reach_results():
+    """La moneda llega al resultado y al histórico; el desglose solo al resultado"""
+    scraper = airbnb_scraper.AirbnbScraper()
+    scraper.snapshot_store = None
+    scraper._navigate = lambda *args: None
+    scraper.extract = lambda page, html, timer: airbnb_scraper.parse_html(_page(AIRBNB_STATE))
+    result = scraper._scrape_page(None, 'https://www.airbnb.com.ar/rooms/1', datetime(2026, 1, 10), datetime(2026, 1, 12), 2)
+    assert result['price_usd'] == 230.0 and result['currency'] == 'USD', f"Resultado: {result}"
+    assert [n['price_text'] for n in result['nightly']] == ['$ 200 USD', '$ 30 USD'], "Desglose por noche"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dm = DataManager(data_dir=tmp)
+        dm.save_results([result], 'Competidor 1')
+        df = dm.load_data()
+        assert df['currency'].tolist() == ['USD'] and 'nightly' not in df.columns, f"Columnas: {list(df.columns)}"
+    print("✓ Test JSON embebido - moneda y desglose en el resultado: PASÓ")
+
+
+if __name__ == '__main__':
+    test_airbnb_embedded_total_and_breakdown()
+    test_booking_embedded_and_fallbacks()
+    test_currency_and_breakdown_reach_results()
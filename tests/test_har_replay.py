@@ -0,0 +1,78 @@
+"""
+Test de la grabación y reproducción de sesiones en HAR
+"""
+import sys
+import os
+import tempfile
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.airbnb_scraper import AirbnbScraper
+from src.har_replay import HarArchive, configure_scraper
+
+
+class FakeContext:
+    """Contexto falso que registra las rutas configuradas"""
+
+    def __init__(self):
+        self.calls = []
+
+    def route_from_har(self, har, **options):
+        self.calls.append(('har', har, options))
+
+    def route(self, url, handler):
+        self.calls.append(('route', url, None))
+
+
+def test_record_uses_one_har_per_context():
+    """Cada contexto graba su propio HAR dentro del directorio de la plataforma"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = HarArchive(tmp, 'record')
+        first, second = FakeContext(), FakeContext()
+        archive.attach(first, 'Airbnb')
+        archive.attach(second, 'Airbnb')
+
+        paths = [first.calls[0][1], second.calls[0][1]]
+        assert paths[0] != paths[1], "Los contextos del pool no deben pisarse"
+        assert all(os.path.dirname(path) == os.path.join(tmp, 'airbnb') for path in paths), "Un directorio por plataforma"
+        assert first.calls[0][2]['update'] is True, "En modo record Playwright actualiza el HAR"
+    print("✓ Test HAR - grabación por contexto: PASÓ")
+
+
+def test_replay_registers_archives_after_abort():
+    """Al reproducir, lo no grabado se aborta y los HAR más nuevos tienen prioridad"""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = HarArchive(tmp, 'replay')
+        try:
+            archive.attach(FakeContext(), 'Booking')
+            assert False, "Sin HAR grabados debe fallar"
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(os.path.join(tmp, 'booking'))
+        for name in ('20251201-1.har', '20251202-1.har'):
+            open(os.path.join(tmp, 'booking', name), 'w').close()
+        context = FakeContext()
+        archive.attach(context, 'Booking')
+
+        assert context.calls[0][:2] == ('route', '**/*'), "El aborto se registra primero (se evalúa último)"
+        hars = [os.path.basename(call[1]) for call in context.calls[1:]]
+        assert hars == ['20251201-1.har', '20251202-1.har'], f"Orden de registro: {hars}"
+        assert all(call[2]['not_found'] == 'fallback' for call in context.calls[1:]), "Cada HAR cede al siguiente"
+    print("✓ Test HAR - reproducción sin red: PASÓ")
+
+
+def test_configure_scraper_for_fast_replay():
+    """El replay rápido elimina las esperas de red y las cachés"""
+    scraper = configure_scraper(AirbnbScraper(), HarArchive(mode='replay'), fast=True)
+    assert scraper.settle_seconds == 0 and scraper.cell_delay == 0, "Sin esperas en replay rápido"
+    assert scraper.result_cache is None and scraper.unavailable_cache is None, "Todas las celdas pasan por el navegador"
+    assert scraper.har.mode == 'replay', "El scraper queda conectado al archivo HAR"
+    print("✓ Test HAR - configuración del scraper: PASÓ")
+
+
+if __name__ == '__main__':
+    test_record_uses_one_har_per_context()
+    test_replay_registers_archives_after_abort()
+    test_configure_scraper_for_fast_replay()
@@ -0,0 +1,62 @@
+"""
+Test de los timeouts adaptativos a partir de las latencias observadas
+"""
+import sys
+import os
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.latency import LatencyTracker, percentile
+from src.scraper_engine import ScraperEngine
+
+
+class RecordingPage:
+    """Página falsa que registra los timeouts recibidos"""
+
+    def __init__(self):
+        self.timeouts = []
+
+    def goto(self, url, wait_until=None, timeout=None):
+        self.timeouts.append(timeout)
+        return None
+
+
+class ExampleScraper(ScraperEngine):
+    platform = 'Despegar'
+    settle_seconds = 0
+    nav_timeout_ms = 90000
+    nav_timeout_floor_ms = 5000
+
+
+def test_timeout_from_percentile_with_floor_and_cap():
+    """El timeout sale del p99 × factor, acotado entre el piso y el tope"""
+    tracker = LatencyTracker(quantile=0.99, factor=2, min_samples=10)
+    assert tracker.timeout_ms('Airbnb:goto', 90000, 5000) == 90000, "Sin muestras suficientes se usa el tope"
+
+    for seconds in [3.0] * 98 + [6.0, 8.0]:
+        tracker.record('Airbnb:goto', seconds)
+    assert percentile(tracker.samples('Airbnb:goto'), 0.99) == 6.0, "p99 por rango más cercano"
+    assert tracker.timeout_ms('Airbnb:goto', 90000, 5000) == 12000, "p99 (6 s) × 2"
+    assert tracker.timeout_ms('Airbnb:goto', 10000, 5000) == 10000, "Nunca supera el tope"
+    assert tracker.timeout_ms('Airbnb:goto', 90000, 20000) == 20000, "Nunca baja del piso"
+    assert tracker.stats()['Airbnb:goto']['count'] == 100, "Resumen por operación"
+    print("✓ Test Latencias - percentil, piso y tope: PASÓ")
+
+
+def test_retry_uses_fixed_timeout():
+    """El primer intento usa el timeout adaptativo y el reintento el fijo"""
+    scraper = ExampleScraper()
+    scraper.latency = LatencyTracker(min_samples=1, factor=1.5)
+    scraper.latency.record('Despegar:goto', 4.0)
+    page = RecordingPage()
+
+    scraper._navigate(page, 'https://example.com/hotel/1', attempt=1)
+    scraper._navigate(page, 'https://example.com/hotel/1', attempt=2)
+    assert page.timeouts == [6000, 90000], f"Timeouts por intento: {page.timeouts}"
+    print("✓ Test Latencias - reintento con timeout fijo: PASÓ")
+
+
+if __name__ == '__main__':
+    test_timeout_from_percentile_with_floor_and_cap()
+    test_retry_uses_fixed_timeout()
@@ -0,0 +1,251 @@
+"""
+Test del gobernador de memoria de Chromium y el reciclado por uso
+"""
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import scraper_engine
+from src.airbnb_scraper import AirbnbScraper
+from src.browser_pool import ContextPool
+from src.memory_governor import MemoryGovernor, chromium_trees, load_memory_config
+from src.scraper_engine import ScraperEngine
+
+MB = 2**20
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    """Contexto falso que entrega páginas nuevas"""
+
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    def new_page(self):
+        self.pages.append(FakePage())
+        return self.pages[-1]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeGovernor(MemoryGovernor):
+    """Gobernador con la memoria de cada navegador fijada a mano"""
+
+    def __init__(self, rss_mb, **kwargs):
+        super().__init__(total_rss_mb=None, **kwargs)
+        self.rss_mb = rss_mb
+
+    def launch(self, launch_fn):
+        browser = launch_fn()
+        self._pids[id(browser)] = 100
+        return browser
+
+    def sample(self):
+        return {'browsers': {100: self.rss_mb}, 'total_mb': self.rss_mb, 'allowed': self.allowed}
+
+
+class ExampleScraper(ScraperEngine):
+    platform = 'Despegar'
+
+    def _launch_browser(self, p, proxies=None):
+        return self.memory_governor.launch(FakeBrowser)
+
+    def _new_context(self, browser, fingerprint=None, proxy=None):
+        return FakeContext()
+
+
+class SearchModeScraper(AirbnbScraper):
+    """Airbnb en modo búsqueda sin navegador: registra las cargas que ve el gobernador"""
+
+    def __init__(self):
+        super().__init__()
+        self.metrics = None
+        self.memory_governor = None
+        self.result_cache = None
+        self.unavailable_cache = None
+        self.cell_delay = 0
+        self.search_mode = True
+        self.search_config = {'card_selector': 'div'}
+        self.governed_loads = []
+
+    def _launch_browser(self, p, proxies=None):
+        return FakeBrowser()
+
+    def _new_context(self, browser, fingerprint=None, proxy=None):
+        return FakeContext()
+
+    def _govern_memory(self, p, proxies, browser, pool, loads):
+        self.governed_loads.append(loads)
+        return browser, pool, loads
+
+    def _scrape_search_page(self, pool, area, checkin, checkout, guests, budget):
+        return {'111': 100.0, '222': 120.0, '444': 90.0}
+
+    def _scrape_cell(self, pool, search_url, checkin, checkout, guests, debug, property_name, budget):
+        return self._build_result(checkin, checkout, guests, search_url, price=150.0)
+
+
+@contextmanager
+def fake_playwright():
+    yield None
+
+
+def test_chromium_trees_from_process_table():
+    """Cada navegador suma su proceso principal y sus renderers"""
+    pid = os.getpid()
+    table = {
+        pid: (1, 'python', 50 * MB),
+        200: (pid, 'node', 80 * MB),                  # driver de Playwright
+        300: (200, 'headless_shell', 100 * MB),       # navegador 1
+        301: (300, 'headless_shell', 250 * MB),       # renderer
+        302: (301, 'headless_shell', 50 * MB),
+        400: (200, 'chrome', 120 * MB),               # navegador 2
+        401: (400, 'chrome', 30 * MB),
+        500: (1, 'chrome', 999 * MB),                 # Chromium de otro proceso
+    }
+    assert chromium_trees(table) == {300: 400.0, 400: 150.0}, f"Árboles: {chromium_trees(table)}"
+    print("✓ Test Memoria - árbol de procesos: PASÓ")
+
+
+def test_pool_recycles_pages_and_contexts_by_use():
+    """La página se recicla tras max_page_uses y el contexto tras max_context_uses"""
+    pool = ContextPool(None, lambda browser, fingerprint, proxy: FakeContext(), size=1,
+                       max_page_uses=2, max_context_uses=5)
+    pooled = pool.contexts[0]
+    first_page = pooled.page
+    pool.release(pooled, ok=True, latency=1)
+    assert pooled.page is first_page, "Antes del límite se conserva la página"
+    pool.release(pooled, ok=True, latency=1)
+    assert first_page.closed and pooled.page is not first_page, "Al llegar al límite se recicla la página"
+    assert pooled.page_uses == 0 and pool.recycled_pages == 1, "El contador de la página se reinicia"
+
+    for _ in range(3):
+        pool.release(pooled, ok=True, latency=1)
+    assert pooled.context.closed and pool.contexts[0] is not pooled, "Tras max_context_uses se retira el contexto"
+    assert pool.retired == 1, "El retiro se contabiliza"
+    print("✓ Test Memoria - reciclado por uso: PASÓ")
+
+
+def test_engine_recycles_context_then_browser():
+    """Sobre context_rss_mb se retira el contexto más usado; sobre browser_rss_mb se relanza"""
+    scraper = ExampleScraper()
+    scraper.metrics = None
+    scraper.memory_governor = FakeGovernor(rss_mb=500, context_rss_mb=900, browser_rss_mb=1400, browser_max_loads=10)
+    browser = scraper._launch_browser(None)
+    pool = scraper._new_pool(browser, None)
+    busy = pool.contexts[1]
+    busy.record(True, 1)
+
+    assert scraper._govern_memory(None, None, browser, pool, 3) == (browser, pool, 3), "Bajo los umbrales no se recicla"
+
+    scraper.memory_governor.rss_mb = 1000
+    scraper._govern_memory(None, None, browser, pool, 3)
+    assert busy.context.closed and busy not in pool.contexts, "Se retira el contexto más usado"
+
+    scraper.memory_governor.rss_mb = 1500
+    new_browser, new_pool, loads = scraper._govern_memory(None, None, browser, pool, 3)
+    assert browser.closed and new_browser is not browser, "Sobre el tope se relanza el navegador"
+    assert new_pool is not pool and loads == 0, "El navegador nuevo arranca con pool y contador nuevos"
+
+    scraper.memory_governor.rss_mb = 100
+    assert scraper.memory_governor.browser_action(new_browser, 10) == 'loads', "También se relanza por cantidad de cargas"
+    print("✓ Test Memoria - reciclado en el motor: PASÓ")
+
+
+def test_concurrency_capped_by_total_memory():
+    """Con el tope total alcanzado, las cargas simultáneas se limitan"""
+    governor = MemoryGovernor(total_rss_mb=1000, max_concurrency=4, sample_interval=60)
+    assert governor._allowed({1: 300.0, 2: 300.0}, 600.0) == 3, "1000 MB / 300 MB por navegador"
+    assert governor._allowed({1: 1200.0}, 1200.0) == 1, "Siempre se permite al menos una carga"
+
+    governor.sample()
+    governor.allowed = 1
+    governor._sampled_at = time.monotonic()
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def load():
+        with governor.slot(timeout=0.05):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert peak[0] == 1, f"Con un lugar, una carga a la vez (pico: {peak[0]})"
+    print("✓ Test Memoria - concurrencia limitada: PASÓ")
+
+
+def test_memory_config_can_disable_governor():
+    """config/memory.json ajusta los umbrales o desactiva el gobernador"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'memory.json')
+        assert load_memory_config(path) == {}, "Sin archivo se usan los valores por defecto"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'total_rss_mb': 3000, 'max_concurrency': 2, 'desconocido': 1}, f)
+        assert load_memory_config(path) == {'total_rss_mb': 3000, 'max_concurrency': 2}, "Solo argumentos de MemoryGovernor"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'enabled': False}, f)
+        assert load_memory_config(path) is None, "enabled=false desactiva el gobernador"
+    print("✓ Test Memoria - configuración: PASÓ")
+
+
+def test_search_mode_counts_only_real_loads():
+    """Las celdas servidas por una página de resultados ya cargada no suman cargas"""
+    original = scraper_engine.sync_playwright
+    scraper_engine.sync_playwright = fake_playwright
+    try:
+        scraper = SearchModeScraper()
+        checkin, checkout = datetime(2026, 1, 10), datetime(2026, 1, 12)
+        cells = [
+            {'checkin': checkin, 'checkout': checkout, 'nights': 2, 'guests': 2, 'area': 'Cerro',
+             'url': f'https://www.airbnb.com.ar/rooms/{listing_id}'}
+            for listing_id in ('111', '222', '333', '444')
+        ]
+        results = list(scraper.iter_cells(None, cells))
+    finally:
+        scraper_engine.sync_playwright = original
+    assert [r['price_usd'] for r in results] == [100.0, 120.0, 150.0, 90.0], f"Resultados: {results}"
+    # Una página de resultados y una carga individual (333 no figura en la búsqueda)
+    assert scraper.governed_loads == [0, 1, 1, 2], f"Cargas vistas por el gobernador: {scraper.governed_loads}"
+    print("✓ Test Memoria - cargas en modo búsqueda: PASÓ")
+
+
+if __name__ == '__main__':
+    test_chromium_trees_from_process_table()
+    test_pool_recycles_pages_and_contexts_by_use()
+    test_engine_recycles_context_then_browser()
+    test_concurrency_capped_by_total_memory()
+    test_memory_config_can_disable_governor()
+    test_search_mode_counts_only_real_loads()
@@ -0,0 +1,102 @@
+"""
+Test de las métricas en formato Prometheus y JSON
+"""
+import sys
+import os
+import json
+import tempfile
+import urllib.request
+from datetime import datetime
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.metrics import MetricsRegistry, serve_metrics
+from src.scraper_engine import UNAVAILABLE_ERROR, ScraperEngine
+
+
+class ExampleScraper(ScraperEngine):
+    platform = 'Despegar'
+
+
+class FakePlaywright:
+    """Playwright falso: launch() devuelve un navegador vacío"""
+
+    class chromium:
+        @staticmethod
+        def launch(**kwargs):
+            return object()
+
+
+def test_prometheus_text_format():
+    """Contadores e histogramas salen con HELP/TYPE, etiquetas y buckets acumulados"""
+    registry = MetricsRegistry(buckets=(1, 5))
+    registry.inc('scraper_cells_total', platform='Airbnb', outcome='success', source='page')
+    registry.inc('scraper_cells_total', platform='Airbnb', outcome='success', source='page')
+    registry.observe('scraper_page_seconds', 0.5, platform='Airbnb')
+    registry.observe('scraper_page_seconds', 3.0, platform='Airbnb')
+    text = registry.render_prometheus()
+
+    assert '# TYPE scraper_cells_total counter' in text, "Debe declarar el tipo del contador"
+    assert 'scraper_cells_total{outcome="success",platform="Airbnb",source="page"} 2' in text, text
+    assert '# TYPE scraper_page_seconds histogram' in text, "Debe declarar el histograma"
+    assert 'scraper_page_seconds_bucket{platform="Airbnb",le="1"} 1' in text, text
+    assert 'scraper_page_seconds_bucket{platform="Airbnb",le="5"} 2' in text, "Los buckets son acumulados"
+    assert 'scraper_page_seconds_bucket{platform="Airbnb",le="+Inf"} 2' in text, text
+    assert 'scraper_page_seconds_count{platform="Airbnb"} 2' in text, text
+    assert 'scraper_result_cache_hit_ratio' in text, "Debe incluir la tasa de aciertos de la caché"
+    print("✓ Test Métricas - formato Prometheus: PASÓ")
+
+
+def test_engine_counts_outcomes_and_launches():
+    """El motor cuenta celdas por resultado y navegadores lanzados; el snapshot da las tasas"""
+    scraper = ExampleScraper()
+    scraper.metrics = MetricsRegistry()
+    checkin, checkout = datetime(2026, 1, 10), datetime(2026, 1, 12)
+    scraper._count_cell(scraper._build_result(checkin, checkout, 2, 'u', price=100.0), 'page')
+    scraper._count_cell(scraper._build_result(checkin, checkout, 2, 'u', price=120.0), 'cache')
+    scraper._count_cell(scraper._build_result(checkin, checkout, 2, 'u', error=UNAVAILABLE_ERROR), 'page')
+    scraper._count_cell(scraper._build_result(checkin, checkout, 2, 'u', error='Timeout'), 'page')
+    scraper._launch_browser(FakePlaywright)
+
+    metrics = scraper.metrics
+    assert metrics.counter_value('scraper_browser_launches_total', platform='Despegar') == 1, "Un lanzamiento"
+    assert metrics.counter_value('scraper_cells_total', platform='Despegar', outcome='success', source='cache') == 1
+    rates = metrics.snapshot()['rates']['Despegar']
+    assert rates == {'success': 0.5, 'unavailable': 0.25, 'error': 0.25}, f"Tasas por plataforma: {rates}"
+
+    scraper.metrics = None
+    scraper._launch_browser(FakePlaywright)
+    print("✓ Test Métricas - conteo en el motor: PASÓ")
+
+
+def test_snapshot_file_and_http_endpoint():
+    """El snapshot se guarda en JSON y el endpoint sirve ambos formatos"""
+    registry = MetricsRegistry()
+    registry.inc('scraper_blocked_total', platform='Booking')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'metrics.json')
+        assert registry.write_snapshot(path), "Debe guardar el snapshot"
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    assert saved['counters'][0]['name'] == 'scraper_blocked_total', f"Snapshot: {saved['counters']}"
+
+    server = serve_metrics(0, registry=registry)
+    try:
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+        with urllib.request.urlopen(f'{base_url}/metrics', timeout=5) as response:
+            text = response.read().decode('utf-8')
+        with urllib.request.urlopen(f'{base_url}/metrics.json', timeout=5) as response:
+            data = json.loads(response.read().decode('utf-8'))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'scraper_blocked_total{platform="Booking"} 1' in text, text
+    assert data['counters'][0]['value'] == 1, "El JSON refleja el contador"
+    print("✓ Test Métricas - snapshot y endpoint: PASÓ")
+
+
+if __name__ == '__main__':
+    test_prometheus_text_format()
+    test_engine_counts_outcomes_and_launches()
+    test_snapshot_file_and_http_endpoint()
@@ -0,0 +1,55 @@
+"""
+Test del consumo en paralelo de los generadores de cada plataforma
+"""
+import sys
+import os
+import time
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.parallel_streams import iter_parallel
+
+
+def slow_stream(name, count, delay):
+    for index in range(count):
+        time.sleep(delay)
+        yield f'{name}-{index}'
+
+
+def failing_stream():
+    yield 'ok'
+    raise RuntimeError("Navegador caído")
+
+
+def test_streams_run_concurrently_in_order():
+    """El tiempo total es el del más lento y cada flujo conserva su orden"""
+    started = time.monotonic()
+    events = list(iter_parallel({
+        'airbnb': slow_stream('a', 3, 0.1),
+        'booking': slow_stream('b', 3, 0.1),
+    }))
+    elapsed = time.monotonic() - started
+
+    by_key = {}
+    for key, result, error in events:
+        assert error is None, f"No debe haber errores: {error}"
+        by_key.setdefault(key, []).append(result)
+    assert by_key == {'airbnb': ['a-0', 'a-1', 'a-2'], 'booking': ['b-0', 'b-1', 'b-2']}, f"Orden por flujo: {by_key}"
+    assert elapsed < 0.5, f"Los flujos deben correr en paralelo ({elapsed:.2f}s)"
+    print("✓ Test Flujos en paralelo - concurrencia y orden: PASÓ")
+
+
+def test_failing_stream_does_not_stop_others():
+    """Un flujo que falla se reporta sin cortar a los demás"""
+    events = list(iter_parallel({'airbnb': failing_stream(), 'booking': slow_stream('b', 2, 0.01)}))
+    errors = [(key, error) for key, result, error in events if error is not None]
+    results = [result for key, result, error in events if error is None]
+    assert len(errors) == 1 and errors[0][0] == 'airbnb', f"Debe reportar el error de airbnb: {errors}"
+    assert sorted(results) == ['b-0', 'b-1', 'ok'], f"Resultados de ambos flujos: {results}"
+    print("✓ Test Flujos en paralelo - error aislado: PASÓ")
+
+
+if __name__ == '__main__':
+    test_streams_run_concurrently_in_order()
+    test_failing_stream_does_not_stop_others()
@@ -0,0 +1,62 @@
+"""
+Test del perfil de reruns de la app (render, DataManager y gráficos)
+"""
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data_manager import DataManager
+from src.timing import current_profile, get_phase_stats, profile_rerun, timed
+
+
+@timed('UI:render_prueba', profile_only=True)
+def render_prueba(dm):
+    """Render falso: lee datos y arma una figura"""
+    dm.load_data()
+    dm.load_data()
+    with timed('Plotly:figura_prueba', profile_only=True):
+        time.sleep(0.01)
+
+
+def test_profile_breakdown_with_nesting():
+    """El perfil acumula render, DataManager y figuras con su anidamiento"""
+    with tempfile.TemporaryDirectory() as tmp:
+        dm = DataManager(tmp)
+        with profile_rerun() as profile:
+            render_prueba(dm)
+    assert current_profile() is None, "El perfil se desactiva al terminar el rerun"
+
+    rows = {row['operación'].strip(): row for row in profile.rows()}
+    assert list(rows) == ['UI:render_prueba', 'DataManager:load_data', 'Plotly:figura_prueba'], f"Orden: {list(rows)}"
+    assert rows['DataManager:load_data']['llamadas'] == 2, "Las llamadas repetidas se suman"
+    assert profile.rows()[1]['operación'].startswith('  '), "Los bloques anidados se sangran"
+    assert rows['UI:render_prueba']['ms'] >= rows['Plotly:figura_prueba']['ms'] >= 10, f"Duraciones: {rows}"
+    assert profile.total * 1000 >= rows['UI:render_prueba']['ms'], "El total cubre todo el rerun"
+    print("✓ Test Perfil - desglose del rerun: PASÓ")
+
+
+def test_profile_is_opt_in_and_per_thread():
+    """Sin activar no se perfila, y otros hilos no contaminan el perfil del rerun"""
+    with profile_rerun(False) as profile:
+        render_prueba(DataManager(tempfile.mkdtemp()))
+    assert profile is None, "Desactivado no hay perfil"
+
+    with profile_rerun() as profile:
+        worker = threading.Thread(target=lambda: timed('Airbnb:otro_hilo').__enter__().__exit__())
+        worker.start()
+        worker.join()
+    assert profile.rows() == [], "Los hilos de scraping no entran en el perfil del rerun"
+    stats = get_phase_stats().stats()
+    assert 'UI:render_prueba' not in stats and 'Plotly:figura_prueba' not in stats, "La UI no entra en las estadísticas"
+    assert 'DataManager:load_data' in stats, "El DataManager sí se registra siempre"
+    print("✓ Test Perfil - opcional y por hilo: PASÓ")
+
+
+if __name__ == '__main__':
+    test_profile_breakdown_with_nesting()
+    test_profile_is_opt_in_and_per_thread()
@@ -0,0 +1,127 @@
+"""
+Test de la caché de resultados con TTL
+"""
+import sys
+import os
+import json
+import tempfile
+import time
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime
+
+from src.airbnb_scraper import AirbnbScraper
+from src.data_manager import DataManager
+from src.result_cache import ResultCache, load_cache_config, normalize_url
+from src.scrape_cells import build_cells
+
+
+def test_normalize_url():
+    """El orden de parámetros y el host no cambian la clave"""
+    a = "https://www.Airbnb.com.ar/rooms/123?check_in=2025-11-10&check_out=2025-11-11&guests=2"
+    b = "https://www.airbnb.com.ar/rooms/123/?guests=2&check_out=2025-11-11&check_in=2025-11-10#photos"
+    assert normalize_url(a) == normalize_url(b), "Deben tener la misma clave"
+    print("✓ Test Caché - normalización de URL: PASÓ")
+
+
+def test_cache_ttl_and_eviction():
+    """Los resultados vencen, se desalojan por tamaño y conservan scraped_at"""
+    cache = ResultCache(ttl_seconds=0.05, max_entries=2)
+    result = {'price_usd': 100.0, 'scraped_at': '2025-11-01T10:00:00'}
+
+    cache.put('https://x/rooms/1?a=1', result)
+    hit = cache.get('https://x/rooms/1?a=1')
+    assert hit == result and hit is not result, "Debe devolver una copia del resultado original"
+    assert cache.get('https://x/rooms/2') is None, "URL desconocida es un fallo"
+
+    cache.put('https://x/rooms/2', result)
+    cache.put('https://x/rooms/3', result)
+    assert cache.get('https://x/rooms/1?a=1') is None, "Debe desalojar la entrada menos usada"
+
+    time.sleep(0.06)
+    assert cache.get('https://x/rooms/3') is None, "Debe vencer por TTL"
+
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 3, f"Contadores incorrectos: {stats}"
+    print("✓ Test Caché - TTL y desalojo: PASÓ")
+
+
+def test_scraper_serves_cached_cells():
+    """Con todas las celdas en caché no se abre el navegador"""
+    scraper = AirbnbScraper()
+    scraper.result_cache = ResultCache()
+    cells = build_cells(datetime(2025, 11, 10), datetime(2025, 11, 11), [1], [2])
+    url = 'https://www.airbnb.com.ar/rooms/123'
+    for cell in cells:
+        search_url = scraper.build_url('123', cell['checkin'], cell['checkout'], cell['guests'])
+        scraper.result_cache.put(search_url, {'platform': 'Airbnb', 'price_usd': 90.0, 'scraped_at': 'antes'})
+
+    results = list(scraper.iter_cells(url, cells))
+    assert len(results) == 2 and all(r['scraped_at'] == 'antes' for r in results), "Debe servir los resultados en caché"
+
+    scraper.bypass_cache = True
+    assert scraper._cached_results([(cells[0], '123')]) == {}, "Forzar ejecución ignora la caché"
+    print("✓ Test Caché - celdas servidas por el scraper: PASÓ")
+
+
+def test_cached_hits_not_saved_again():
+    """Un rerun dentro del TTL muestra los precios en caché sin duplicarlos en el histórico"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = AirbnbScraper()
+        scraper.result_cache = ResultCache()
+        scraper.unavailable_cache = None
+        dm = DataManager(data_dir=tmp)
+        cells = build_cells(datetime(2025, 11, 10), datetime(2025, 11, 11), [1], [2])
+        fresh = []
+        for cell in cells:
+            search_url = scraper.build_url('123', cell['checkin'], cell['checkout'], cell['guests'])
+            result = scraper._build_result(cell['checkin'], cell['checkout'], cell['guests'], search_url, price=90.0)
+            scraper.result_cache.put(search_url, result)
+            fresh.append(result)
+        dm.save_results(fresh, 'Competidor 1')
+
+        results = list(scraper.iter_cells('https://www.airbnb.com.ar/rooms/123', cells))
+        assert [r['price_usd'] for r in results] == [90.0, 90.0], "Los precios en caché se entregan"
+        dm.save_results(results, 'Competidor 1')
+        assert len(dm.load_data()) == 2, f"Sin filas repetidas: {len(dm.load_data())}"
+        assert scraper.result_cache.get(scraper.build_url('123', cells[0]['checkin'], cells[0]['checkout'], 2)).get('from_cache') is None, \
+            "La marca no se guarda en la caché"
+    print("✓ Test Caché - aciertos sin duplicar el histórico: PASÓ")
+
+
+def test_cache_config_from_file_and_env():
+    """TTL y tamaño desde config/result_cache.json, el entorno tiene prioridad y TTL 0 la desactiva"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'result_cache.json')
+        previous = {key: os.environ.pop(key, None) for key in ('PRICE_MONITOR_RESULT_CACHE_TTL', 'PRICE_MONITOR_RESULT_CACHE_SIZE')}
+        try:
+            assert load_cache_config(path) == {}, "Sin configuración se usan los valores por defecto"
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'ttl_seconds': 600, 'max_entries': 50}, f)
+            assert load_cache_config(path) == {'ttl_seconds': 600, 'max_entries': 50}, "Lee el archivo"
+
+            os.environ['PRICE_MONITOR_RESULT_CACHE_TTL'] = '120'
+            assert load_cache_config(path)['ttl_seconds'] == 120.0, "El entorno tiene prioridad"
+            os.environ['PRICE_MONITOR_RESULT_CACHE_TTL'] = '0'
+            assert load_cache_config(path) is None, "TTL 0 desactiva la caché"
+            del os.environ['PRICE_MONITOR_RESULT_CACHE_TTL']
+
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'enabled': False}, f)
+            assert load_cache_config(path) is None, "enabled=false desactiva la caché"
+        finally:
+            for key, value in previous.items():
+                os.environ.pop(key, None)
+                if value is not None:
+                    os.environ[key] = value
+    print("✓ Test Caché - configuración: PASÓ")
+
+
+if __name__ == '__main__':
+    test_normalize_url()
+    test_cache_ttl_and_eviction()
+    test_scraper_serves_cached_cells()
+    test_cached_hits_not_saved_again()
+    test_cache_config_from_file_and_env()
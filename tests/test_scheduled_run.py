@@ -0,0 +1,144 @@
+"""
+Test de la ejecución programada con presupuesto de tiempo
+"""
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import scheduled_run
+from src.data_manager import DataManager
+from src.run_budget import RunBudget
+from src.scrape_cells import build_cells, cell_key, prioritize_cells
+
+
+class SlowFakeScraper:
+    """Scraper falso que tarda 50 ms por celda y respeta el presupuesto"""
+
+    def extract_listing_id(self, url):
+        return url
+
+    def iter_cells(self, url, cells, debug_first=False, property_name='unknown', checkpoint=None, budget=None):
+        for cell in cells:
+            if budget is not None and budget.exhausted():
+                return
+            time.sleep(0.05)
+            yield {'platform': cell['platform'], 'checkin': cell['checkin'].strftime('%Y-%m-%d'), 'price_usd': 1.0}
+
+
+class SyncSessionFakeScraper:
+    """
+    Scraper falso que, como sync_playwright(), admite una sola sesión activa
+    por hilo: si otra está abierta en el mismo hilo, sus celdas fallan
+    """
+
+    sessions = threading.local()
+
+    def extract_listing_id(self, url):
+        return url
+
+    def iter_cells(self, url, cells, debug_first=False, property_name='unknown', checkpoint=None, budget=None):
+        nested = getattr(self.sessions, 'active', False)
+        self.sessions.active = True
+        try:
+            for cell in cells:
+                result = {'platform': cell['platform'], 'checkin': cell['checkin'].strftime('%Y-%m-%d'), 'price_usd': 1.0}
+                if nested:
+                    result.update(price_usd=None, error="Playwright Sync API inside the asyncio loop")
+                yield result
+        finally:
+            if not nested:
+                self.sessions.active = False
+
+
+def test_prioritize_cells():
+    """Primero lo salteado, luego las fechas cercanas y los competidores importantes"""
+    cells = build_cells(datetime(2025, 11, 10), datetime(2025, 11, 12), [1], [2])
+    for cell in cells:
+        cell.update(platform='airbnb', property_name='A')
+    vip = dict(cells[0], property_name='VIP', priority=10)
+    carried = cells[2]
+
+    ordered = prioritize_cells(cells + [vip], carried_over=[cell_key(carried)])
+    assert ordered[0] is carried, "La celda salteada en el ciclo anterior va primero"
+    assert ordered[1] is vip, "Mismo día: el competidor con mayor prioridad primero"
+    assert ordered[2] is cells[0] and ordered[3] is cells[1], "Luego por fecha"
+    print("✓ Test Scheduling - prioridad de celdas: PASÓ")
+
+
+def test_run_budget():
+    """El presupuesto acota timeouts y se agota"""
+    budget = RunBudget(0.05)
+    assert not budget.exhausted(), "Recién creado no está agotado"
+    assert budget.clamp_ms(90000) <= 50, "El timeout se acota al tiempo restante"
+    time.sleep(0.06)
+    assert budget.exhausted(), "Debe agotarse"
+    assert budget.clamp_ms(90000) == 1, "Nunca devuelve 0 (sin timeout en Playwright)"
+    assert RunBudget().clamp_ms(90000) == 90000, "Sin límite no modifica el timeout"
+    print("✓ Test Scheduling - presupuesto: PASÓ")
+
+
+def test_run_scheduled_reports_skipped():
+    """La ejecución se corta al agotar el tiempo y registra lo salteado"""
+    tmp_dir = tempfile.mkdtemp()
+    original = dict(scheduled_run.SCRAPERS)
+    try:
+        scheduled_run.SCRAPERS.clear()
+        scheduled_run.SCRAPERS['airbnb'] = SlowFakeScraper
+        properties = [{'name': 'A', 'platforms': {'airbnb': 'a'}}, {'name': 'B', 'priority': 5, 'platforms': {'airbnb': 'b'}}]
+        dm = DataManager(data_dir=tmp_dir)
+
+        report = scheduled_run.run_scheduled(
+            properties, datetime(2025, 11, 10), datetime(2025, 11, 19), [1], [2],
+            budget_seconds=0.2, data_manager=dm
+        )
+        assert report['completed'], "Debe scrapear algunas celdas"
+        assert report['skipped'], "Debe saltear celdas al agotar el tiempo"
+        assert len(report['completed']) + len(report['skipped']) == 20, "Todas las celdas quedan contabilizadas"
+        assert report['completed'][0]['property_name'] == 'B', "El competidor prioritario va primero"
+        assert len(dm.load_skipped_cells()) == len(report['skipped']), "Lo salteado queda registrado"
+        print("✓ Test Scheduling - deadline y salteadas: PASÓ")
+    finally:
+        scheduled_run.SCRAPERS.clear()
+        scheduled_run.SCRAPERS.update(original)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+
+def test_run_scheduled_two_platforms():
+    """Cada plataforma usa su propia sesión del navegador: ninguna celda falla por anidarlas"""
+    tmp_dir = tempfile.mkdtemp()
+    original = dict(scheduled_run.SCRAPERS)
+    try:
+        scheduled_run.SCRAPERS.clear()
+        scheduled_run.SCRAPERS['airbnb'] = SyncSessionFakeScraper
+        scheduled_run.SCRAPERS['booking'] = SyncSessionFakeScraper
+        properties = [{'name': 'A', 'platforms': {'airbnb': 'a', 'booking': 'b'}}]
+        dm = DataManager(data_dir=tmp_dir)
+
+        report = scheduled_run.run_scheduled(
+            properties, datetime(2025, 11, 10), datetime(2025, 11, 14), [1], [2], data_manager=dm
+        )
+        results = report['results']['A']
+        assert len(results) == 10 and not report['skipped'], "Todas las celdas de ambas plataformas se scrapean"
+        assert all(result['price_usd'] == 1.0 for result in results), f"Ninguna celda con error: {results}"
+        for cell in report['completed']:
+            assert cell['platform'] in ('airbnb', 'booking'), "Cada resultado se asocia a una celda"
+        print("✓ Test Scheduling - dos plataformas: PASÓ")
+    finally:
+        scheduled_run.SCRAPERS.clear()
+        scheduled_run.SCRAPERS.update(original)
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    test_prioritize_cells()
+    test_run_budget()
+    test_run_scheduled_reports_skipped()
+    test_run_scheduled_two_platforms()
@@ -0,0 +1,88 @@
+"""
+Test del motor de scraping común con una plataforma de ejemplo
+"""
+import sys
+import os
+from datetime import datetime
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.browser_pool import ContextPool
+from src.scraper_engine import ScraperEngine
+from src.text_classifier import TextClassifier
+
+
+class FakeResponse:
+    status = 200
+
+
+class FakePage:
+    """Página falsa: la primera navegación puede fallar"""
+
+    def __init__(self, fail_first):
+        self.fail_first = fail_first
+        self.visits = 0
+
+    def goto(self, url, wait_until=None, timeout=None):
+        self.visits += 1
+        if self.fail_first:
+            raise TimeoutError("Timeout de navegación")
+        return FakeResponse()
+
+    def content(self):
+        return "<html></html>"
+
+    def evaluate(self, script, config):
+        return {'price_text': 'US$ 1.500', 'selector': config['selectors'][0]}
+
+
+class FakeContext:
+    def __init__(self, page):
+        self.page = page
+
+    def new_page(self):
+        return self.page
+
+    def close(self):
+        pass
+
+
+class ExampleScraper(ScraperEngine):
+    """Plataforma nueva: solo URL y extracción"""
+    platform = 'Despegar'
+    base_url = 'https://www.despegar.com.ar'
+    settle_seconds = 0
+    extraction_config = {'selectors': ['span.price'], 'currency_markers': ['$'], 'require_digit': True}
+    text_classifier = TextClassifier(['Sin disponibilidad'])
+
+    def extract_listing_id(self, url):
+        return url.rsplit('/', 1)[-1] or None
+
+    def build_url(self, listing_id, checkin, checkout, guests):
+        return f"{self.base_url}/hoteles/{listing_id}?in={checkin:%Y-%m-%d}&out={checkout:%Y-%m-%d}&adults={guests}"
+
+
+def test_engine_retries_on_another_context():
+    """Una celda que falla se reintenta en otro contexto y arma el resultado común"""
+    pages = [FakePage(fail_first=True), FakePage(fail_first=False), FakePage(fail_first=False)]
+    factory_pages = iter(pages)
+    pool = ContextPool(None, lambda browser, fingerprint, proxy: FakeContext(next(factory_pages)), size=2)
+
+    scraper = ExampleScraper()
+    scraper.snapshot_store = None
+    scraper.result_cache = None
+    scraper.storage_state = None
+    checkin, checkout = datetime(2025, 11, 10), datetime(2025, 11, 11)
+    url = scraper.build_url('123', checkin, checkout, 2)
+
+    result = scraper._scrape_cell(pool, url, checkin, checkout, 2, False, 'Hotel', None)
+    assert pages[0].visits == 1, "El primer contexto debe fallar una vez"
+    assert result['price_usd'] == 1500.0, f"Debe obtener el precio en el reintento: {result}"
+    assert result['platform'] == 'Despegar' and result['guests'] == 2, "Formato de resultado común"
+    assert pool.retired == 1, "El contexto que falló debe reemplazarse"
+    print("✓ Test Motor de scraping - reintento en otro contexto: PASÓ")
+
+
+if __name__ == '__main__':
+    test_engine_retries_on_another_context()
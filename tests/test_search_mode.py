@@ -0,0 +1,85 @@
+"""
+Test del modo búsqueda: varios competidores desde una página de resultados
+"""
+import sys
+import os
+from datetime import datetime
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.airbnb_scraper import SEARCH_CONFIG as AIRBNB_SEARCH_CONFIG, AirbnbScraper
+from src.booking_scraper import SEARCH_CONFIG as BOOKING_SEARCH_CONFIG, BookingScraper
+from src.html_parsing import search_cards_from_html
+from src.scheduled_run import plan_cells
+
+
+AIRBNB_RESULTS = """
+<html><body>
+<div itemprop="itemListElement">
+  <a href="/rooms/39250879?check_in=2025-11-10">Cerro Eléctrico</a>
+  <div data-testid="price-availability-row">
+    <span>$ 120 USD por noche</span><span>$ 240 USD en total</span>
+  </div>
+</div>
+<div itemprop="itemListElement">
+  <a href="/rooms/555?check_in=2025-11-10">Otro alojamiento</a>
+  <div data-testid="price-availability-row"><span>$ 90 USD en total</span></div>
+</div>
+<div itemprop="itemListElement">
+  <a href="/rooms/777">Sin precio</a>
+</div>
+</body></html>
+"""
+
+BOOKING_RESULTS = """
+<html><body>
+<div data-testid="property-card">
+  <a data-testid="title-link" href="https://www.booking.com/hotel/ar/cerro-electrico.es.html?checkin=2025-11-10">Cerro</a>
+  <span data-testid="price-and-discounted-price">US$ 1.250</span>
+</div>
+<div data-testid="property-card">
+  <a data-testid="title-link" href="/hotel/ar/cerro-electrico.es.html">Duplicado</a>
+  <span data-testid="price-and-discounted-price">US$ 999</span>
+</div>
+</body></html>
+"""
+
+
+def test_airbnb_cards_matched_by_room_id():
+    """Las tarjetas se asocian por ID de room y se prefiere el precio total"""
+    cards = search_cards_from_html(AIRBNB_RESULTS, AIRBNB_SEARCH_CONFIG)
+    assert len(cards) == 3, f"Debe encontrar las tres tarjetas: {cards}"
+    prices = AirbnbScraper().match_search_cards(cards)
+    assert prices == {'39250879': 240.0, '555': 90.0}, f"Precio total por room, sin tarjetas vacías: {prices}"
+    print("✓ Test Modo búsqueda - Airbnb por room: PASÓ")
+
+
+def test_booking_cards_matched_by_slug_and_urls():
+    """Booking empareja por slug (gana la primera tarjeta) y arma la URL del área"""
+    cards = search_cards_from_html(BOOKING_RESULTS, BOOKING_SEARCH_CONFIG)
+    scraper = BookingScraper()
+    prices = scraper.match_search_cards(cards)
+    assert prices == {'cerro-electrico': 1250.0}, f"Debe emparejar por slug: {prices}"
+
+    url = scraper.build_search_url('El Chaltén, Santa Cruz', datetime(2025, 11, 10), datetime(2025, 11, 12), 2)
+    assert 'ss=El+Chalt%C3%A9n%2C+Santa+Cruz' in url and 'group_adults=2' in url, f"URL de búsqueda: {url}"
+    print("✓ Test Modo búsqueda - Booking por slug: PASÓ")
+
+
+def test_plan_cells_carries_area():
+    """Las celdas llevan el área de la propiedad solo si está configurada"""
+    properties = [
+        {'name': 'Con área', 'area': 'El Chaltén', 'platforms': {'airbnb': 'https://www.airbnb.com.ar/rooms/1'}},
+        {'name': 'Sin área', 'platforms': {'airbnb': 'https://www.airbnb.com.ar/rooms/2'}},
+    ]
+    cells = plan_cells(properties, datetime(2025, 11, 10), datetime(2025, 11, 10), [1], [2])
+    areas = {cell['property_name']: cell.get('area') for cell in cells}
+    assert areas == {'Con área': 'El Chaltén', 'Sin área': None}, f"Área por celda: {areas}"
+    print("✓ Test Modo búsqueda - área en las celdas: PASÓ")
+
+
+if __name__ == '__main__':
+    test_airbnb_cards_matched_by_room_id()
+    test_booking_cards_matched_by_slug_and_urls()
+    test_plan_cells_carries_area()
@@ -0,0 +1,102 @@
+"""
+Test del parseo desacoplado y la re-extracción offline de snapshots
+"""
+import sys
+import os
+import shutil
+import tempfile
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import airbnb_scraper, booking_scraper
+from src.reextract import reextract
+from src.scraper_engine import UNAVAILABLE_ERROR
+from src.snapshots import SnapshotStore, snapshot_store_from_env
+
+
+AIRBNB_HTML = """
+<html><body>
+  <div data-section-id="BOOK_IT_SIDEBAR"><span class="_14y1gc9">$ 1.234 USD total</span></div>
+  <script>var price = "$ 999 USD";</script>
+</body></html>
+"""
+
+AIRBNB_UNAVAILABLE_HTML = """
+<html><body><h2>These dates are unavailable</h2></body></html>
+"""
+
+BOOKING_HTML = """
+<html><body>
+  <script>window.tracking = "US$ 999";</script>
+  <div class="hprt-table"><span>Precio total: US$ 250</span></div>
+</body></html>
+"""
+
+
+def test_parse_html():
+    """Los parsers puros extraen precio o disponibilidad sin navegador"""
+    parsed = airbnb_scraper.parse_html(AIRBNB_HTML)
+    assert parsed['price'] == 1234.0, f"Precio de Airbnb incorrecto: {parsed}"
+    assert not parsed['unavailable'], "Con precio no debe marcarse como no disponible"
+
+    parsed = airbnb_scraper.parse_html(AIRBNB_UNAVAILABLE_HTML)
+    assert parsed['price'] is None and parsed['unavailable'], "Debe detectar fechas no disponibles"
+
+    parsed = booking_scraper.parse_html(BOOKING_HTML)
+    assert parsed['price'] == 250.0, f"Precio de Booking incorrecto: {parsed}"
+    assert parsed['selector'].startswith('text=/'), "Debe usar el selector de texto ignorando scripts"
+    print("✓ Test Snapshots - parseo puro: PASÓ")
+
+
+def test_reextract_from_store():
+    """Los snapshots se deduplican y se re-extraen con el formato de resultados"""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = SnapshotStore(tmp_dir)
+        meta = {'url': 'https://www.airbnb.com/rooms/1', 'checkout': '2025-11-11', 'guests': 2, 'property_name': 'A'}
+        first = store.put(AIRBNB_HTML, platform='Airbnb', checkin='2025-11-10', **meta)
+        second = store.put(AIRBNB_HTML, platform='Airbnb', checkin='2025-11-10', **meta)
+        store.put(AIRBNB_UNAVAILABLE_HTML, platform='Airbnb', checkin='2025-11-11', **meta)
+        store.put(BOOKING_HTML, platform='Booking', checkin='2025-11-10', checkout='2025-11-11', adults=2, property_name='A')
+
+        assert first == second, "El mismo HTML debe tener el mismo digest"
+        assert store.get(first) == AIRBNB_HTML, "El snapshot debe recuperarse intacto"
+
+        results = reextract(store, platform='Airbnb', processes=1)
+        assert len(results) == 3, "Debe re-extraer cada fetch del índice"
+        assert results[0]['price_usd'] == 1234.0 and results[0]['guests'] == 2, "Formato de resultado incorrecto"
+        assert results[2]['error'] == UNAVAILABLE_ERROR, "Debe conservar el error de no disponible"
+
+        results = reextract(store, processes=2)
+        assert [r['platform'] for r in results] == ['Airbnb'] * 3 + ['Booking'], "Debe respetar el orden del índice"
+        assert results[3]['price_usd'] == 250.0 and results[3]['adults'] == 2, "Booking usa la clave adults"
+        print("✓ Test Snapshots - re-extracción offline: PASÓ")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_snapshots_opt_in():
+    """Sin PRICE_MONITOR_SNAPSHOTS los scrapers no guardan HTML"""
+    tmp_dir = tempfile.mkdtemp()
+    previous = os.environ.pop('PRICE_MONITOR_SNAPSHOTS', None)
+    try:
+        assert snapshot_store_from_env() is None, "Desactivado por defecto"
+        assert airbnb_scraper.AirbnbScraper().snapshot_store is None, "El scraper no crea el almacén"
+        os.environ['PRICE_MONITOR_SNAPSHOTS'] = '0'
+        assert snapshot_store_from_env() is None, "'0' también lo desactiva"
+        os.environ['PRICE_MONITOR_SNAPSHOTS'] = tmp_dir
+        store = snapshot_store_from_env()
+        assert store is not None and store.root == tmp_dir, "Otro valor es el directorio del almacén"
+        print("✓ Test Snapshots - opcional: PASÓ")
+    finally:
+        os.environ.pop('PRICE_MONITOR_SNAPSHOTS', None)
+        if previous is not None:
+            os.environ['PRICE_MONITOR_SNAPSHOTS'] = previous
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    test_parse_html()
+    test_reextract_from_store()
+    test_snapshots_opt_in()
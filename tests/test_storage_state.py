@@ -0,0 +1,48 @@
+"""
+Test de la persistencia del storage_state por plataforma
+"""
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.storage_state import StorageStateStore
+
+
+class FakeContext:
+    """Contexto falso que exporta cookies como Playwright"""
+
+    def storage_state(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'cookies': [{'name': 'consent', 'value': 'yes'}], 'origins': []}, f)
+
+
+def test_storage_state_save_refresh_and_discard():
+    """El estado se guarda, vence y se descarta por plataforma"""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        store = StorageStateStore(tmp_dir, max_age_hours=1)
+        assert store.load('Airbnb') is None and store.needs_refresh('Airbnb'), "Sin estado hay que guardarlo"
+
+        assert store.save(FakeContext(), 'Airbnb'), "Debe guardar el estado"
+        assert store.load('Airbnb') == os.path.join(tmp_dir, 'airbnb.json'), "Un archivo por plataforma"
+        assert not store.needs_refresh('Airbnb'), "Recién guardado no se refresca"
+        assert store.load('Booking') is None, "Las plataformas no comparten estado"
+
+        store.max_age_seconds = 0
+        assert store.needs_refresh('Airbnb'), "Vencido debe refrescarse"
+        assert store.load('Airbnb') is not None, "Un estado vencido se sigue usando hasta refrescarlo"
+
+        store.discard('Airbnb')
+        assert store.load('Airbnb') is None, "Debe descartarse tras un bloqueo"
+        print("✓ Test Storage state - guardado, refresco y descarte: PASÓ")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    test_storage_state_save_refresh_and_discard()
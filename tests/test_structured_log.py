@@ -0,0 +1,104 @@
+"""
+Test de los logs estructurados con cola y niveles por componente
+"""
+import sys
+import os
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.parallel_streams import iter_parallel
+from src.structured_log import JsonFormatter, get_logger, parse_levels, set_run_id
+from src.scraper_engine import ScraperEngine
+
+
+class ExampleScraper(ScraperEngine):
+    platform = 'Despegar'
+
+
+def capture(component):
+    """Conecta un QueueHandler al logger del componente y devuelve la cola"""
+    records = queue.SimpleQueue()
+    logger = logging.getLogger(f'price_monitor.{component}')
+    logger.handlers = [logging.handlers.QueueHandler(records)]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return records
+
+
+def test_json_line_has_context_fields():
+    """Cada línea lleva run_id, propiedad, plataforma, check-in y fase"""
+    records = capture('scraper.despegar')
+    set_run_id('run-prueba')
+    scraper = ExampleScraper()
+    scraper.log.info("Precio encontrado", property='Competidor', checkin=datetime(2026, 1, 10), phase='extract', price_usd=120.0)
+
+    entry = json.loads(JsonFormatter().format(records.get_nowait()))
+    assert entry['component'] == 'scraper.despegar', f"Componente: {entry}"
+    assert entry['msg'] == 'Precio encontrado', "El mensaje se conserva"
+    expected = {'run_id': 'run-prueba', 'property': 'Competidor', 'platform': 'Despegar',
+                'checkin': '2026-01-10', 'phase': 'extract', 'price_usd': 120.0}
+    for key, value in expected.items():
+        assert entry[key] == value, f"{key}: {entry.get(key)} != {value}"
+    print("✓ Test Logs - campos de contexto: PASÓ")
+
+
+def test_levels_per_component():
+    """El nivel se controla por componente; los registros filtrados no se encolan"""
+    default, levels = parse_levels('WARNING, scraper.booking=debug,data_manager=INFO')
+    assert default == 'WARNING', "El valor sin '=' es el nivel general"
+    assert levels == {'scraper.booking': 'DEBUG', 'data_manager': 'INFO'}, f"Niveles: {levels}"
+
+    records = capture('prueba_niveles')
+    logging.getLogger('price_monitor.prueba_niveles').setLevel(logging.WARNING)
+    log = get_logger('prueba_niveles')
+    log.info("descartado")
+    log.warning("registrado")
+    assert records.get_nowait().getMessage() == 'registrado', "Solo pasa el nivel configurado"
+    assert records.empty(), "Lo filtrado no llega a la cola"
+    print("✓ Test Logs - niveles por componente: PASÓ")
+
+
+def test_run_id_per_context():
+    """Cada sesión tiene su run_id y los hilos de iter_parallel lo heredan"""
+    records = capture('prueba_run_id')
+    log = get_logger('prueba_run_id')
+
+    def session(run_id):
+        set_run_id(run_id)
+        log.info("inicio")
+
+        def stream():
+            log.info("celda")
+            yield run_id
+
+        for _ in iter_parallel({'airbnb': stream(), 'booking': stream()}):
+            pass
+
+    threads = [threading.Thread(target=session, args=(f'run-{i}',)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    entries = []
+    while not records.empty():
+        entries.append(json.loads(JsonFormatter().format(records.get_nowait())))
+    by_run = {}
+    for entry in entries:
+        by_run.setdefault(entry.get('run_id'), []).append(entry['msg'])
+    assert sorted(by_run) == ['run-0', 'run-1'], f"Cada sesión conserva su run_id: {by_run}"
+    assert all(sorted(msgs) == ['celda', 'celda', 'inicio'] for msgs in by_run.values()), f"Mensajes: {by_run}"
+    print("✓ Test Logs - run_id por contexto: PASÓ")
+
+
+if __name__ == '__main__':
+    test_json_line_has_context_fields()
+    test_levels_per_component()
+    test_run_id_per_context()
@@ -0,0 +1,53 @@
+"""
+Test de la medición por fases del scraping y de la E/S de datos
+"""
+import sys
+import os
+import tempfile
+import time
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+
+from src.data_manager import DataManager
+from src.timing import PhaseTimer, get_phase_stats, phase_rows, record_phases, timed
+
+
+def test_phase_timer_accumulates():
+    """Las fases repetidas suman y se agregan por plataforma"""
+    timer = PhaseTimer()
+    with timer.phase('goto'):
+        time.sleep(0.01)
+    with timer.phase('goto'):
+        time.sleep(0.01)
+    timer.add('settle', 0.5)
+    phases = timer.as_dict()
+    assert phases['goto'] >= 0.02 and phases['settle'] == 0.5, f"Fases acumuladas: {phases}"
+
+    record_phases('PruebaTiming', phases)
+    rows = phase_rows('PruebaTiming')
+    assert [row['operación'] for row in rows] == ['PruebaTiming:goto', 'PruebaTiming:settle'], f"Filas: {rows}"
+    print("✓ Test Timing - fases por celda: PASÓ")
+
+
+def test_data_manager_io_is_timed():
+    """La E/S del DataManager se registra y las duraciones no llegan al CSV"""
+    before = {key: stats['count'] for key, stats in get_phase_stats().stats().items()}
+    with tempfile.TemporaryDirectory() as tmp:
+        dm = DataManager(tmp)
+        dm.save_results([{'platform': 'Airbnb', 'price_usd': 100.0, 'timings': {'goto': 1.2}}], 'Test')
+        with timed('PruebaTiming:bloque'):
+            saved = pd.read_csv(dm.csv_path)
+    assert 'timings' not in saved.columns, "Las duraciones no se guardan en el histórico"
+
+    after = get_phase_stats().stats()
+    for key in ('DataManager:save_results', 'DataManager:write_csv', 'PruebaTiming:bloque'):
+        assert after[key]['count'] == before.get(key, 0) + 1, f"Debe registrar {key}"
+    print("✓ Test Timing - E/S del DataManager: PASÓ")
+
+
+if __name__ == '__main__':
+    test_phase_timer_accumulates()
+    test_data_manager_io_is_timed()
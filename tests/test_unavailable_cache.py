@@ -0,0 +1,125 @@
+"""
+Test de la caché negativa de celdas no disponibles
+"""
+import sys
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.airbnb_scraper import AirbnbScraper
+from src.data_manager import DataManager
+from src.scraper_engine import UNAVAILABLE_ERROR
+from src.timing import PhaseTimer
+from src.scrape_cells import build_cells
+from src.unavailable_cache import UnavailableCache, ttl_hours_for
+
+
+def test_ttl_by_lead_time():
+    """Cuanto más cerca el check-in, antes vence el "no disponible" """
+    now = datetime(2025, 11, 1, 12, 0)
+    assert ttl_hours_for(now + timedelta(days=1), now) == 6, "Próximos días: TTL corto"
+    assert ttl_hours_for(now + timedelta(days=10), now) == 24, "Dos semanas: un día"
+    assert ttl_hours_for(now + timedelta(days=45), now) == 72, "Dos meses: tres días"
+    assert ttl_hours_for(now + timedelta(days=120), now) == 168, "Más allá: una semana"
+    print("✓ Test Caché negativa - TTL por anticipación: PASÓ")
+
+
+def test_scraper_skips_known_unavailable_cells():
+    """Las celdas ocupadas se sirven desde la caché persistida hasta que tienen precio"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'unavailable_cells.json')
+        scraper = AirbnbScraper()
+        scraper.result_cache = None
+        scraper.unavailable_cache = UnavailableCache(path)
+
+        checkin = datetime.now() + timedelta(days=5)
+        cells = build_cells(checkin, checkin, [2], [2])
+        search_url = scraper.build_url('123', cells[0]['checkin'], cells[0]['checkout'], 2)
+        unavailable = scraper._build_result(cells[0]['checkin'], cells[0]['checkout'], 2, search_url, error=UNAVAILABLE_ERROR)
+        scraper._remember_availability(search_url, cells[0]['checkin'], cells[0]['checkout'], 2, unavailable)
+
+        scraper.unavailable_cache = UnavailableCache(path)
+        cached = scraper._cached_results([(cells[0], '123')])
+        assert cached[0]['error'] == UNAVAILABLE_ERROR, "Debe recordarse entre ejecuciones"
+        results = list(scraper.iter_cells('https://www.airbnb.com.ar/rooms/123', cells))
+        assert len(results) == 1 and results[0]['scraped_at'] == unavailable['scraped_at'], "Sin abrir el navegador"
+
+        priced = dict(unavailable, price_usd=150.0)
+        del priced['error']
+        scraper._remember_availability(search_url, cells[0]['checkin'], cells[0]['checkout'], 2, priced)
+        assert scraper._cached_results([(cells[0], '123')]) == {}, "Con precio sale de la caché negativa"
+        assert len(UnavailableCache(path)) == 0, "El archivo también se actualiza"
+    print("✓ Test Caché negativa - celdas salteadas: PASÓ")
+
+
+def test_negative_cache_hits_not_saved_again():
+    """Una ejecución servida entera desde la caché negativa no agrega filas al histórico"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = AirbnbScraper()
+        scraper.result_cache = None
+        scraper.unavailable_cache = UnavailableCache(os.path.join(tmp, 'unavailable_cells.json'))
+        dm = DataManager(data_dir=tmp)
+
+        checkin = datetime.now() + timedelta(days=5)
+        cells = build_cells(checkin, checkin + timedelta(days=1), [1], [2])
+        fresh = []
+        for cell in cells:
+            search_url = scraper.build_url('123', cell['checkin'], cell['checkout'], 2)
+            result = scraper._build_result(cell['checkin'], cell['checkout'], 2, search_url, error=UNAVAILABLE_ERROR)
+            scraper._remember_availability(search_url, cell['checkin'], cell['checkout'], 2, result)
+            fresh.append(result)
+        dm.save_results(fresh, 'Competidor 1')
+
+        checkpoint = dm.open_checkpoint('Competidor 1', cells[0]['checkin'], cells[-1]['checkin'], [1], [2], ['airbnb'])
+        results = list(scraper.iter_cells('https://www.airbnb.com.ar/rooms/123', cells, checkpoint=checkpoint))
+        assert len(results) == 2 and all(r['from_cache'] for r in results), "Las celdas se entregan marcadas"
+        dm.save_results(checkpoint.results(), 'Competidor 1')
+        assert len(dm.load_data()) == 2, f"Sin filas nuevas en el histórico: {len(dm.load_data())}"
+        assert 'from_cache' not in dm.load_data().columns, "La marca no llega al CSV"
+    print("✓ Test Caché negativa - sin filas repetidas: PASÓ")
+
+
+class RecordingPool:
+    """Pool de un solo contexto que registra cada release"""
+
+    def __init__(self):
+        self.pooled = type('Pooled', (), {'page': None, 'context': None})()
+        self.releases = []
+
+    def acquire(self):
+        return self.pooled
+
+    def release(self, pooled, ok, latency, blocked=False, discard=False):
+        self.releases.append((ok, discard))
+
+
+def test_date_checkins_release_context_once():
+    """Con fechas date (st.date_input) la celda se marca y el contexto se libera una sola vez"""
+    today = date.today()
+    assert ttl_hours_for(today + timedelta(days=1), datetime.now()) == 6, "date y datetime se comparan por día"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = AirbnbScraper()
+        scraper.result_cache = None
+        scraper.storage_state = None
+        scraper.unavailable_cache = UnavailableCache(os.path.join(tmp, 'unavailable_cells.json'))
+        checkin, checkout = today + timedelta(days=5), today + timedelta(days=7)
+        search_url = scraper.build_url('123', checkin, checkout, 2)
+        scraper._scrape_page = lambda page, url, ci, co, guests, *args: scraper._build_result(ci, co, guests, url, error=UNAVAILABLE_ERROR)
+
+        pool = RecordingPool()
+        result = scraper._scrape_cell_attempts(pool, search_url, checkin, checkout, 2, False, 'Competidor 1', None, PhaseTimer())
+        assert result['error'] == UNAVAILABLE_ERROR, f"Resultado: {result}"
+        assert pool.releases == [(True, False)], f"Un solo release como celda sana: {pool.releases}"
+        assert scraper.unavailable_cache.get('Airbnb', '123', checkin, 2, 2) is not None, "La celda queda en la caché negativa"
+    print("✓ Test Caché negativa - check-in como date: PASÓ")
+
+
+if __name__ == '__main__':
+    test_ttl_by_lead_time()
+    test_scraper_skips_known_unavailable_cells()
+    test_negative_cache_hits_not_saved_again()
+    test_date_checkins_release_context_once()
@@ -0,0 +1,128 @@
+"""
+Test de la cola de trabajo distribuida y del worker
+"""
+import sys
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+# Agregar src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import worker
+from src.data_manager import DataManager
+from src.work_queue import SQLiteWorkQueue
+
+
+class FakeScraper:
+    """Scraper falso: devuelve un precio fijo por celda sin abrir navegador"""
+
+    instances = 0
+
+    def __init__(self):
+        FakeScraper.instances += 1
+
+    def iter_cells(self, url, cells, debug_first=False, property_name='unknown', checkpoint=None):
+        for cell in cells:
+            yield {
+                'platform': 'Airbnb',
+                'checkin': cell['checkin'].strftime('%Y-%m-%d'),
+                'checkout': cell['checkout'].strftime('%Y-%m-%d'),
+                'price_usd': 100.0,
+                'guests': cell['guests'],
+                'scraped_at': datetime.now().isoformat(),
+                'url': url
+            }
+
+
+class FlakyScraper(FakeScraper):
+    """Falla la primera vez que ve cada celda con 2 huéspedes y la celda con 4 nunca tiene precio"""
+
+    seen = set()
+
+    def iter_cells(self, url, cells, debug_first=False, property_name='unknown', checkpoint=None):
+        for cell, result in zip(cells, super().iter_cells(url, cells)):
+            key = (result['checkin'], cell['guests'])
+            if cell['guests'] == 4 or key not in self.seen:
+                self.seen.add(key)
+                result = dict(result, price_usd=None, error='Timeout')
+            yield result
+
+
+def test_lease_visibility_timeout():
+    """Una celda con lease vencido vuelve a estar disponible para otro worker"""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        queue = SQLiteWorkQueue(os.path.join(tmp_dir, 'queue.db'), visibility_timeout=0.1)
+        queue.enqueue_run('Test', {'airbnb': 'https://www.airbnb.com.ar/rooms/1'},
+                          datetime(2025, 11, 10), datetime(2025, 11, 11), [1], [2])
+
+        leased = queue.lease('w1', limit=1)
+        assert len(leased) == 1, "Debe tomar una celda"
+        assert queue.lease('w2', limit=5)[0]['id'] != leased[0]['id'], "Una celda con lease no se entrega dos veces"
+
+        time.sleep(0.2)
+        retaken = queue.lease('w3', limit=5)
+        assert leased[0]['id'] in [t['id'] for t in retaken], "El lease vencido debe liberarse"
+        assert not queue.ack(leased[0]['id'], 'w1', {}), "El worker original ya no puede confirmar"
+        print("✓ Test Work queue - timeout de visibilidad: PASÓ")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_worker_and_merge():
+    """El worker confirma cada celda y el coordinador las fusiona con DataManager"""
+    tmp_dir = tempfile.mkdtemp()
+    original = dict(worker.SCRAPERS)
+    try:
+        worker.SCRAPERS['airbnb'] = FakeScraper
+        FakeScraper.instances = 0
+        queue = SQLiteWorkQueue(os.path.join(tmp_dir, 'queue.db'))
+        run_id = queue.enqueue_run('Test', {'airbnb': 'https://www.airbnb.com.ar/rooms/1'},
+                                   datetime(2025, 11, 10), datetime(2025, 11, 12), [1, 2], [2])
+
+        processed = worker.run_worker(queue, worker_id='w1', batch_size=4)
+        assert processed == 6, f"Expected 6 cells, got {processed}"
+        assert FakeScraper.instances == 1, f"Un scraper para todos los lotes, got {FakeScraper.instances}"
+        assert queue.stats(run_id) == {'done': 6}, "Todas las celdas deben quedar confirmadas"
+
+        dm = DataManager(data_dir=os.path.join(tmp_dir, 'data'))
+        assert worker.merge_results(queue, dm, run_id) == 6, "Debe fusionar todas las celdas"
+        assert worker.merge_results(queue, dm, run_id) == 0, "No debe fusionar dos veces"
+        assert len(dm.load_data()) == 6, "El histórico debe tener las 6 filas"
+        print("✓ Test Worker - procesamiento y fusión: PASÓ")
+    finally:
+        worker.SCRAPERS.clear()
+        worker.SCRAPERS.update(original)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_worker_retries_failed_cells():
+    """Las celdas con error vuelven a la cola y se marcan fallidas al agotar los intentos"""
+    tmp_dir = tempfile.mkdtemp()
+    original = dict(worker.SCRAPERS)
+    try:
+        FlakyScraper.seen = set()
+        worker.SCRAPERS['airbnb'] = FlakyScraper
+        queue = SQLiteWorkQueue(os.path.join(tmp_dir, 'queue.db'), max_attempts=3)
+        run_id = queue.enqueue_run('Test', {'airbnb': 'https://www.airbnb.com.ar/rooms/1'},
+                                   datetime(2025, 11, 10), datetime(2025, 11, 11), [1], [2, 4])
+
+        processed = worker.run_worker(queue, worker_id='w1', batch_size=4)
+        assert processed == 2, f"Solo se confirman las celdas con precio, got {processed}"
+        assert queue.stats(run_id) == {'done': 2, 'failed': 2}, f"Estados: {queue.stats(run_id)}"
+        results = [result for _, _, result in queue.collect_results(run_id)]
+        assert all(result['price_usd'] == 100.0 for result in results), "Ningún error se confirma como resultado"
+        print("✓ Test Worker - reintento de celdas con error: PASÓ")
+    finally:
+        worker.SCRAPERS.clear()
+        worker.SCRAPERS.update(original)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    test_lease_visibility_timeout()
+    test_worker_and_merge()
+    test_worker_retries_failed_cells()